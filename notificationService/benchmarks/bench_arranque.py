@@ -0,0 +1,116 @@
+"""
+Benchmark de arranque del worker: tiempo de import de la app, tiempo hasta la
+primera respuesta (arranque en frío) y desglose de `python -X importtime`.
+
+Cada medición corre en un proceso nuevo, como un worker de gunicorn recién
+creado o una instancia nueva del autoscaler.
+
+Uso:
+    python -m notificationService.benchmarks.bench_arranque --repeticiones 5 --top 20
+    python -m notificationService.benchmarks.bench_arranque --lifespan   # incluye el lifespan (requiere BD)
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+RAIZ = Path(__file__).resolve().parents[2]
+MODULO_APP = "notificationService.src.main"
+
+_SCRIPT_ARRANQUE = """
+import time
+inicio = time.perf_counter()
+from {modulo} import app
+importado = time.perf_counter()
+from fastapi.testclient import TestClient
+if {lifespan}:
+    with TestClient(app) as client:
+        client.get("/")
+else:
+    TestClient(app).get("/")
+fin = time.perf_counter()
+print(importado - inicio, fin - inicio)
+"""
+
+
+def _entorno() -> Dict[str, str]:
+    entorno = dict(os.environ)
+    # Sin jobs periódicos durante la medición
+    entorno.setdefault("ROLLUP_INTERVALO_SEGUNDOS", "0")
+    return entorno
+
+
+def medir_arranque(repeticiones: int, lifespan: bool) -> Tuple[List[float], List[float]]:
+    """(segundos de import, segundos hasta la primera respuesta) por repetición"""
+    script = _SCRIPT_ARRANQUE.format(modulo=MODULO_APP, lifespan=lifespan)
+    imports, primeras = [], []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=RAIZ, env=_entorno(), capture_output=True, text=True, check=True
+        )
+        importado, primera = map(float, salida.stdout.split()[-2:])
+        imports.append(importado)
+        primeras.append(primera)
+    return imports, primeras
+
+
+def desglose_importtime() -> List[Tuple[str, int, int]]:
+    """[(módulo, self µs, acumulado µs)] de `python -X importtime` para la app"""
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULO_APP}"],
+        cwd=RAIZ, env=_entorno(), capture_output=True, text=True, check=True
+    )
+    modulos = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, modulo = linea[len("import time:"):].split("|")
+        modulos.append((modulo.strip(), int(propio), int(acumulado)))
+    return modulos
+
+
+def _por_paquete(modulos: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Tiempo propio agregado por paquete raíz (notificationService se separa por subpaquete)"""
+    totales: Dict[str, int] = defaultdict(int)
+    for modulo, propio, _ in modulos:
+        partes = modulo.split(".")
+        clave = ".".join(partes[:3]) if partes[0] == "notificationService" else partes[0]
+        totales[clave] += propio
+    return totales
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--lifespan", action="store_true",
+                        help="Ejecutar también el lifespan (crea engines, carga el catálogo)")
+    args = parser.parse_args()
+
+    imports, primeras = medir_arranque(args.repeticiones, args.lifespan)
+    print(f"Arranque en frío ({args.repeticiones} procesos, {'con' if args.lifespan else 'sin'} lifespan):")
+    print(f"  import de la app:      mediana {statistics.median(imports) * 1000:8.1f} ms  "
+          f"(min {min(imports) * 1000:.1f}, max {max(imports) * 1000:.1f})")
+    print(f"  primera respuesta:     mediana {statistics.median(primeras) * 1000:8.1f} ms  "
+          f"(min {min(primeras) * 1000:.1f}, max {max(primeras) * 1000:.1f})")
+
+    modulos = desglose_importtime()
+    total = max(acumulado for _, _, acumulado in modulos)
+    print(f"\n-X importtime: {len(modulos)} módulos, {total / 1000:.1f} ms en total")
+
+    print(f"\nPaquetes por tiempo propio (top {args.top}):")
+    for paquete, propio in sorted(_por_paquete(modulos).items(), key=lambda p: -p[1])[:args.top]:
+        print(f"  {propio / 1000:8.1f} ms  {paquete}")
+
+    print(f"\nMódulos por tiempo acumulado (top {args.top}):")
+    for modulo, propio, acumulado in sorted(modulos, key=lambda m: -m[2])[:args.top]:
+        print(f"  {acumulado / 1000:8.1f} ms  (propio {propio / 1000:6.1f})  {modulo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Prueba de carga del API HTTP: levanta la app (uvicorn o gunicorn) contra una
+base SQLite sembrada y reproduce una mezcla de tráfico realista con clientes
+asyncio + httpx en lazo cerrado. Reporta throughput, latencias (p50/p90/p99) y
+tasa de errores por endpoint para cada combinación de workers, hilos del
+threadpool y concurrencia de clientes.
+
+La saturación se ve al subir la concurrencia: el throughput deja de crecer
+mientras el p99 sigue subiendo. Los disparadores de procesamiento no entran en
+el lazo cerrado: los lanza una sola tarea, como el scheduler en producción.
+Los errores del calentamiento se reportan aparte.
+
+SQLite (en modo WAL) hace de primaria y de Synapse (DB_URL / SYNAPSE_URL); sus
+escrituras se serializan, así que los números de escritura son un piso y no
+representan Azure SQL. El rate limiter se desactiva para medir la app.
+
+Uso:
+    python -m notificationService.benchmarks.bench_carga --workers 1,2 --hilos 40 --concurrencia 8,32,64
+    python -m notificationService.benchmarks.bench_carga --servidor gunicorn --duracion 30 --json carga.json
+    python -m notificationService.benchmarks.bench_carga --url http://127.0.0.1:8000   # servidor ya levantado
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine, insert
+
+from ..src.models import Notificacion
+# Modelos fuera de models/__init__: se importan para que create_all cree sus tablas
+from ..src.models.oferta_notificada import OfertaNotificada  # noqa: F401
+from ..src.models.perfil_features import PerfilFeatures  # noqa: F401
+
+RAIZ = Path(__file__).resolve().parents[2]
+MODULO_APP = "notificationService.src.main:app"
+
+# Peso de cada operación en la mezcla (se puede cambiar con --mezcla nombre=peso,...)
+MEZCLA_POR_DEFECTO: Dict[str, int] = {
+    "bandeja": 40,
+    "bandeja_campos": 10,
+    "no_leidas": 25,
+    "bandeja_empresa": 5,
+    "marcar_leidas": 10,
+    "analytics_volumenes": 4,
+    "analytics_lectura": 3,
+    "notificar_postulaciones": 2,
+    "notificar_compatibles": 1,
+}
+
+# Disparadores de procesamiento: en producción los llama un scheduler, nunca dos
+# a la vez. Los lanza una sola tarea cada --intervalo-disparadores segundos (su
+# peso en la mezcla solo reparte los turnos entre ellos), no los clientes virtuales
+DISPARADORES = frozenset({"notificar_postulaciones", "notificar_compatibles"})
+
+
+class Escenario:
+    """Tamaño de la base sembrada; de acá salen los ids que usan las operaciones"""
+
+    def __init__(self, usuarios: int, empresas: int, por_usuario: int, convocatorias: int, ofertas: int):
+        self.usuarios = usuarios
+        self.empresas = empresas
+        self.por_usuario = por_usuario
+        self.convocatorias = convocatorias
+        self.ofertas = ofertas
+
+    @property
+    def total_notificaciones(self) -> int:
+        return self.usuarios * self.por_usuario
+
+
+# Operación: (método, ruta, cuerpo JSON o None)
+Peticion = Tuple[str, str, Optional[Any]]
+
+
+def _operaciones(escenario: Escenario) -> Dict[str, Callable[[random.Random], Peticion]]:
+    def usuario(r: random.Random) -> str:
+        return f"usuario-{r.randrange(escenario.usuarios)}"
+
+    def empresa(r: random.Random) -> str:
+        return f"empresa-{r.randrange(escenario.empresas)}"
+
+    return {
+        "bandeja": lambda r: ("GET", f"/notificaciones/{usuario(r)}/user/all", None),
+        "bandeja_campos": lambda r: (
+            "GET", f"/notificaciones/{usuario(r)}/user/all?fields=asunto,leida,fecha_creacion", None
+        ),
+        "no_leidas": lambda r: ("GET", f"/notificaciones/{usuario(r)}/user/no-leidas", None),
+        "bandeja_empresa": lambda r: ("GET", f"/notificaciones/{empresa(r)}/company/all", None),
+        "marcar_leidas": lambda r: (
+            "PATCH", "/notificaciones/marcar-leidas",
+            {"ids": [r.randint(1, escenario.total_notificaciones) for _ in range(3)]}
+        ),
+        "analytics_volumenes": lambda r: ("GET", "/analytics/notificaciones/volumenes", None),
+        "analytics_lectura": lambda r: ("GET", "/analytics/notificaciones/lectura", None),
+        "notificar_postulaciones": lambda r: ("POST", "/procesamiento/notificar-postulaciones", None),
+        # Sin llamar al API de perfiles (externo): extracción de skills y lectura de ofertas
+        "notificar_compatibles": lambda r: (
+            "POST", "/procesamiento-ofertas/notificar-compatibles?solo_analizar=true", None
+        ),
+    }
+
+
+# SIEMBRA
+
+def sembrar(ruta_db: Path, escenario: Escenario, semilla: int) -> None:
+    """Crea el esquema de la app y las tablas de Synapse en un archivo SQLite"""
+    r = random.Random(semilla)
+    engine = create_engine(f"sqlite:///{ruta_db}")
+    with engine.begin() as conexion:
+        conexion.execute(text("PRAGMA journal_mode=WAL"))
+    SQLModel.metadata.create_all(engine)
+
+    ahora = datetime.utcnow()
+    tipos = ["NUEVA_OFERTA_COMPATIBLE", "NUEVAS_POSTULACIONES", "RECORDATORIO"]
+    filas = []
+    for u in range(escenario.usuarios):
+        for i in range(escenario.por_usuario):
+            creada = ahora - timedelta(minutes=r.randrange(60 * 24 * 20))
+            leida = r.random() < 0.6
+            filas.append({
+                "id_usuario": f"usuario-{u}",
+                "id_empresa": f"empresa-{r.randrange(escenario.empresas)}",
+                "tipo_notificacion": r.choice(tipos),
+                "asunto": f"Nueva oferta {u}-{i}",
+                "mensaje": "Hay una nueva oferta que coincide con tu perfil en Bogotá. " * 3,
+                "id_oferta": r.randrange(1, escenario.ofertas + 1),
+                "prioridad": r.choice([1, 2, 3]),
+                "datos_adicionales": "modalidad:Remoto&ubicacion:Bogotá",
+                "leida": leida,
+                "fecha_lectura": creada + timedelta(minutes=r.randrange(1, 600)) if leida else None,
+                "fecha_creacion": creada,
+            })
+
+    with engine.begin() as conexion:
+        for inicio in range(0, len(filas), 5000):
+            conexion.execute(insert(Notificacion), filas[inicio:inicio + 5000])
+
+        # Vistas de Synapse que leen los disparadores de procesamiento
+        conexion.execute(text(
+            "CREATE TABLE postulados_por_convocatoria_python "
+            "(id_empresa TEXT, id_convocatoria INTEGER, titulo TEXT, total INTEGER)"
+        ))
+        conexion.execute(
+            text("INSERT INTO postulados_por_convocatoria_python VALUES (:e, :c, :t, :n)"),
+            [
+                {"e": f"empresa-{c % escenario.empresas}", "c": c, "t": f"Convocatoria {c}", "n": r.randrange(1, 200)}
+                for c in range(1, escenario.convocatorias + 1)
+            ]
+        )
+        conexion.execute(text(
+            "CREATE TABLE ofertas_python (id INTEGER PRIMARY KEY, title TEXT, subtitle TEXT, description TEXT, "
+            "modality TEXT, salary INTEGER, requeriments TEXT, benefits TEXT, years_experience INTEGER, "
+            "location TEXT, journey TEXT, schedule TEXT, available_places INTEGER, status TEXT, "
+            "contract_type TEXT, payment_type TEXT, publication_date TIMESTAMP, closing_date TIMESTAMP, "
+            "company_id INTEGER, category_id INTEGER)"
+        ))
+        conexion.execute(
+            text(
+                "INSERT INTO ofertas_python VALUES (:i, :t, 's', 'd', 'Remoto', 3000000, :req, 'b', 2, "
+                "'Bogotá', 'j', 's', 1, :p, 'c', 'p', :f, NULL, 7, 1)"
+            ),
+            [
+                {
+                    "i": i, "t": f"Oferta {i}", "p": r.choice(["ALTA", "MEDIA", "BAJA"]),
+                    "f": (ahora - timedelta(days=r.randrange(7))).strftime("%Y-%m-%d %H:%M:%S"),
+                    "req": "Se requiere SQL, Docker y Programación en Python con experiencia en Azure",
+                }
+                for i in range(1, escenario.ofertas + 1)
+            ]
+        )
+    engine.dispose()
+
+
+# SERVIDOR
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _comando_servidor(servidor: str, workers: int, puerto: int) -> List[str]:
+    if servidor == "gunicorn":
+        return [
+            sys.executable, "-m", "gunicorn", MODULO_APP,
+            "-k", "uvicorn.workers.UvicornWorker", "-w", str(workers),
+            "-b", f"127.0.0.1:{puerto}", "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", MODULO_APP,
+        "--host", "127.0.0.1", "--port", str(puerto), "--workers", str(workers),
+        "--no-access-log", "--log-level", "warning",
+    ]
+
+
+def levantar_servidor(
+        servidor: str,
+        workers: int,
+        hilos: int,
+        ruta_db: Path,
+        log: Path
+) -> Tuple[subprocess.Popen, str]:
+    """Levanta el servidor en un puerto libre; su salida (tracebacks incluidos) va a `log`"""
+    puerto = _puerto_libre()
+    url_db = f"sqlite:///{ruta_db}?timeout=30"
+    entorno = {
+        **os.environ,
+        "DB_URL": url_db,
+        "SYNAPSE_URL": url_db,
+        "THREADPOOL_HILOS": str(hilos),
+        "LIMITES_HABILITADOS": "false",
+        "ROLLUP_INTERVALO_SEGUNDOS": "0",
+    }
+    with open(log, "wb") as salida:
+        proceso = subprocess.Popen(
+            _comando_servidor(servidor, workers, puerto),
+            cwd=RAIZ, env=entorno, stdout=salida, stderr=subprocess.STDOUT
+        )
+    return proceso, f"http://127.0.0.1:{puerto}"
+
+
+def detener_servidor(proceso: subprocess.Popen) -> None:
+    proceso.terminate()
+    try:
+        proceso.wait(30)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+
+def resumir_log(log: Path) -> Optional[str]:
+    """Cantidad de tracebacks del servidor y la última excepción, o None si no hubo"""
+    lineas = log.read_text(errors="replace").splitlines()
+    tracebacks = sum(1 for linea in lineas if linea.startswith("Traceback"))
+    if not tracebacks:
+        return None
+    excepciones = [linea for linea in lineas if linea and not linea[0].isspace() and "Error" in linea.split(":")[0]]
+    ultima = excepciones[-1] if excepciones else ""
+    return f"{tracebacks} tracebacks en el servidor (última: {ultima[:200]}) -> {log}"
+
+
+async def _esperar_listo(url: str, timeout: float = 60.0) -> None:
+    limite = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as cliente:
+        while time.monotonic() < limite:
+            try:
+                if (await cliente.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {timeout:.0f} s ({url})")
+
+
+# CARGA
+
+def _sorteo(mezcla: Dict[str, int], disparadores: bool) -> Tuple[List[str], List[int]]:
+    """Nombres y pesos de la mezcla, solo disparadores o solo el resto"""
+    nombres = [n for n in mezcla if (n in DISPARADORES) == disparadores]
+    return nombres, [mezcla[n] for n in nombres]
+
+
+async def correr_carga(
+    url: str,
+    operaciones: Dict[str, Callable[[random.Random], Peticion]],
+    mezcla: Dict[str, int],
+    concurrencia: int,
+    duracion: float,
+    calentamiento: float,
+    semilla: int,
+    intervalo_disparadores: float = 5.0
+) -> Dict[str, Any]:
+    """
+    `concurrencia` clientes en lazo cerrado con la mezcla sin disparadores, más una
+    tarea que lanza los disparadores de a uno, durante `duracion` s. Lo que arranca
+    en los primeros `calentamiento` s no entra en las métricas; sus estados se
+    reportan aparte para no perder los errores de arranque.
+    """
+    latencias: Dict[str, List[float]] = defaultdict(list)
+    estados: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    estados_calentamiento: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    inicio = time.monotonic()
+    inicio_medicion = inicio + calentamiento
+    fin = inicio_medicion + duracion
+
+    async def ejecutar(nombre: str, r: random.Random, cliente: httpx.AsyncClient) -> bool:
+        """Hace una petición de `nombre`; False si ya terminó el tiempo"""
+        metodo, ruta, cuerpo = operaciones[nombre](r)
+        t0 = time.monotonic()
+        if t0 >= fin:
+            return False
+        try:
+            respuesta = await cliente.request(metodo, ruta, json=cuerpo)
+            estado = str(respuesta.status_code)
+        except httpx.HTTPError as e:
+            estado = type(e).__name__
+        if t0 >= inicio_medicion:
+            latencias[nombre].append(time.monotonic() - t0)
+            estados[nombre][estado] += 1
+        else:
+            estados_calentamiento[nombre][estado] += 1
+        return True
+
+    async def cliente_virtual(indice: int, cliente: httpx.AsyncClient) -> None:
+        nombres, pesos = _sorteo(mezcla, disparadores=False)
+        r = random.Random(semilla * 1000 + indice)
+        while nombres and await ejecutar(r.choices(nombres, pesos)[0], r, cliente):
+            pass
+
+    async def programador(cliente: httpx.AsyncClient) -> None:
+        nombres, pesos = _sorteo(mezcla, disparadores=True)
+        r = random.Random(semilla * 1000 - 1)
+        # El primero sale al terminar el calentamiento, para que entre en las métricas
+        await asyncio.sleep(calentamiento)
+        while nombres and await ejecutar(r.choices(nombres, pesos)[0], r, cliente):
+            await asyncio.sleep(max(0.0, min(intervalo_disparadores, fin - time.monotonic())))
+
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+    # El programador abre una conexión por disparador, como un scheduler: reusar una conexión
+    # ociosa por --intervalo-disparadores s compite con el keep-alive del servidor (5 s en uvicorn)
+    sin_keepalive = httpx.Limits(max_connections=1, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60.0) as cliente, \
+            httpx.AsyncClient(base_url=url, limits=sin_keepalive, timeout=120.0) as cliente_programador:
+        await asyncio.gather(
+            programador(cliente_programador), *(cliente_virtual(i, cliente) for i in range(concurrencia))
+        )
+
+    resultado = _resumen(latencias, estados, duracion)
+    resultado["calentamiento"] = _resumen_calentamiento(estados_calentamiento)
+    return resultado
+
+
+def _percentil(ordenadas: List[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))]
+
+
+def _es_error(estado: str) -> bool:
+    return not estado.isdigit() or int(estado) >= 500
+
+
+def _resumen(latencias: Dict[str, List[float]], estados: Dict[str, Dict[str, int]], duracion: float) -> Dict[str, Any]:
+    endpoints = {}
+    for nombre in sorted(latencias, key=lambda n: -len(latencias[n])):
+        ordenadas = sorted(latencias[nombre])
+        errores = sum(n for estado, n in estados[nombre].items() if _es_error(estado))
+        endpoints[nombre] = {
+            "peticiones": len(ordenadas),
+            "por_segundo": round(len(ordenadas) / duracion, 1),
+            "p50_ms": round(_percentil(ordenadas, 50) * 1000, 1),
+            "p90_ms": round(_percentil(ordenadas, 90) * 1000, 1),
+            "p99_ms": round(_percentil(ordenadas, 99) * 1000, 1),
+            "max_ms": round(ordenadas[-1] * 1000, 1) if ordenadas else 0.0,
+            "media_ms": round(statistics.fmean(ordenadas) * 1000, 1) if ordenadas else 0.0,
+            "errores_pct": round(100 * errores / len(ordenadas), 2) if ordenadas else 0.0,
+            "estados": dict(estados[nombre]),
+        }
+    todas = sorted(latencia for valores in latencias.values() for latencia in valores)
+    errores_total = sum(
+        n for por_estado in estados.values() for estado, n in por_estado.items() if _es_error(estado)
+    )
+    return {
+        "total": {
+            "peticiones": len(todas),
+            "por_segundo": round(len(todas) / duracion, 1),
+            "p50_ms": round(_percentil(todas, 50) * 1000, 1),
+            "p99_ms": round(_percentil(todas, 99) * 1000, 1),
+            "errores_pct": round(100 * errores_total / len(todas), 2) if todas else 0.0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def _resumen_calentamiento(estados: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    errores = {
+        nombre: {estado: n for estado, n in por_estado.items() if _es_error(estado)}
+        for nombre, por_estado in estados.items()
+    }
+    return {
+        "peticiones": sum(n for por_estado in estados.values() for n in por_estado.values()),
+        "errores": sum(n for por_nombre in errores.values() for n in por_nombre.values()),
+        "errores_por_endpoint": {nombre: e for nombre, e in errores.items() if e},
+    }
+
+
+# REPORTE
+
+def _imprimir(config: Dict[str, Any], resultado: Dict[str, Any]) -> None:
+    total = resultado["total"]
+    print(
+        f"\n== workers={config['workers']} hilos={config['hilos']} concurrencia={config['concurrencia']}: "
+        f"{total['por_segundo']:.1f} req/s, p50 {total['p50_ms']} ms, p99 {total['p99_ms']} ms, "
+        f"errores {total['errores_pct']}%"
+    )
+    print(f"  {'endpoint':<26}{'req':>7}{'req/s':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'err%':>7}  estados")
+    for nombre, e in resultado["endpoints"].items():
+        print(
+            f"  {nombre:<26}{e['peticiones']:>7}{e['por_segundo']:>9.1f}{e['p50_ms']:>9.1f}"
+            f"{e['p90_ms']:>9.1f}{e['p99_ms']:>9.1f}{e['max_ms']:>9.1f}{e['errores_pct']:>7.2f}  {e['estados']}"
+        )
+    calentamiento = resultado["calentamiento"]
+    if calentamiento["errores"]:
+        print(
+            f"  ⚠️  calentamiento (no medido): {calentamiento['errores']} errores en "
+            f"{calentamiento['peticiones']} peticiones {calentamiento['errores_por_endpoint']}"
+        )
+
+
+def _imprimir_capacidad(corridas: List[Dict[str, Any]]) -> None:
+    print("\nCapacidad (lecturas de bandeja = bandeja + bandeja_campos + no_leidas):")
+    print(f"  {'workers':>7}{'hilos':>7}{'conc':>6}{'req/s':>9}{'bandeja/s':>11}{'p99 ms':>9}{'err%':>7}")
+    for corrida in corridas:
+        c, t, e = corrida["config"], corrida["resultado"]["total"], corrida["resultado"]["endpoints"]
+        bandeja = sum(e.get(n, {}).get("por_segundo", 0.0) for n in ("bandeja", "bandeja_campos", "no_leidas"))
+        print(
+            f"  {c['workers']:>7}{c['hilos']:>7}{c['concurrencia']:>6}{t['por_segundo']:>9.1f}"
+            f"{bandeja:>11.1f}{t['p99_ms']:>9.1f}{t['errores_pct']:>7.2f}"
+        )
+
+
+def _parsear_mezcla(valor: Optional[str]) -> Dict[str, int]:
+    if not valor:
+        return dict(MEZCLA_POR_DEFECTO)
+    mezcla = {}
+    for parte in valor.split(","):
+        nombre, _, peso = parte.partition("=")
+        if nombre.strip() not in MEZCLA_POR_DEFECTO:
+            raise SystemExit(f"Operación desconocida '{nombre}'. Disponibles: {', '.join(MEZCLA_POR_DEFECTO)}")
+        mezcla[nombre.strip()] = int(peso or 1)
+    return {n: p for n, p in mezcla.items() if p > 0}
+
+
+def _enteros(valor: str) -> List[int]:
+    return [int(v) for v in valor.split(",") if v.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servidor", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--workers", type=_enteros, default=[1], help="Lista, p. ej. 1,2,4")
+    parser.add_argument("--hilos", type=_enteros, default=[40], help="Hilos del threadpool por worker, p. ej. 20,40,80")
+    parser.add_argument("--concurrencia", type=_enteros, default=[8, 32], help="Clientes simultáneos, p. ej. 8,32,64")
+    parser.add_argument("--duracion", type=float, default=15.0, help="Segundos medidos por combinación")
+    parser.add_argument("--calentamiento", type=float, default=3.0,
+                        help="Segundos iniciales fuera de las métricas (sus errores se reportan aparte)")
+    parser.add_argument("--intervalo-disparadores", type=float, default=5.0,
+                        help="Segundos entre disparadores de procesamiento (los lanza una sola tarea)")
+    parser.add_argument("--mezcla", help="nombre=peso,... (por defecto MEZCLA_POR_DEFECTO)")
+    parser.add_argument("--usuarios", type=int, default=500)
+    parser.add_argument("--empresas", type=int, default=50)
+    parser.add_argument("--por-usuario", type=int, default=40, help="Notificaciones sembradas por usuario")
+    parser.add_argument("--convocatorias", type=int, default=200)
+    parser.add_argument("--ofertas", type=int, default=100)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--url", help="Usar un servidor ya levantado (no siembra ni levanta workers)")
+    parser.add_argument("--json", type=Path, help="Guardar todas las corridas en este archivo")
+    parser.add_argument("--logs", type=Path, default=Path(tempfile.gettempdir()) / "bench_carga",
+                        help="Directorio para la salida de cada servidor levantado")
+    args = parser.parse_args()
+
+    escenario = Escenario(args.usuarios, args.empresas, args.por_usuario, args.convocatorias, args.ofertas)
+    operaciones = _operaciones(escenario)
+    mezcla = _parsear_mezcla(args.mezcla)
+    corridas: List[Dict[str, Any]] = []
+
+    def medir(url: str, workers: Any, hilos: Any) -> None:
+        for concurrencia in args.concurrencia:
+            resultado = asyncio.run(correr_carga(
+                url, operaciones, mezcla, concurrencia, args.duracion, args.calentamiento, args.semilla,
+                args.intervalo_disparadores
+            ))
+            config = {"servidor": args.servidor, "workers": workers, "hilos": hilos, "concurrencia": concurrencia}
+            _imprimir(config, resultado)
+            corridas.append({"config": config, "resultado": resultado})
+
+    if args.url:
+        medir(args.url, "-", "-")
+    else:
+        with tempfile.TemporaryDirectory(prefix="bench_carga_") as directorio:
+            ruta_db = Path(directorio) / "notificaciones.db"
+            inicio = time.perf_counter()
+            sembrar(ruta_db, escenario, args.semilla)
+            print(f"Base sembrada: {escenario.total_notificaciones:,} notificaciones, "
+                  f"{escenario.usuarios} usuarios, {escenario.empresas} empresas "
+                  f"({time.perf_counter() - inicio:.1f} s)")
+            args.logs.mkdir(parents=True, exist_ok=True)
+            for workers in args.workers:
+                for hilos in args.hilos:
+                    log = args.logs / f"{args.servidor}-w{workers}-h{hilos}.log"
+                    proceso, url = levantar_servidor(args.servidor, workers, hilos, ruta_db, log)
+                    try:
+                        asyncio.run(_esperar_listo(url))
+                        # Rollups al día para que los endpoints de analytics tengan datos
+                        httpx.post(f"{url}/analytics/notificaciones/rollup/actualizar", timeout=120.0)
+                        medir(url, workers, hilos)
+                    finally:
+                        detener_servidor(proceso)
+                    aviso = resumir_log(log)
+                    if aviso:
+                        print(f"  ⚠️  {aviso}")
+
+    _imprimir_capacidad(corridas)
+    if args.json:
+        args.json.write_text(json.dumps({"mezcla": mezcla, "corridas": corridas}, indent=2, ensure_ascii=False))
+        print(f"\nResultados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
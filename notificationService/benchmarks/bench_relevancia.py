@@ -0,0 +1,74 @@
+"""
+Benchmark del motor de relevancia local sobre perfiles sintéticos.
+
+Uso:
+    python -m notificationService.benchmarks.bench_relevancia --perfiles 100000
+"""
+import argparse
+import random
+import time
+
+from ..src.services.motor_relevancia import MotorRelevancia
+from ..src.services.extraccion_skills import SKILLS_CONOCIDAS
+
+MODALIDADES = ["Presencial", "Remoto", "Híbrido"]
+CIUDADES = ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga", "Pereira"]
+
+
+def _perfiles(cantidad: int, rng: random.Random):
+    for i in range(cantidad):
+        yield {
+            "id_usuario": f"usuario-{i}",
+            "skills": "|".join(rng.sample(SKILLS_CONOCIDAS, rng.randint(3, 15))),
+            "modalidad": rng.choice(MODALIDADES),
+            "ubicacion": rng.choice(CIUDADES),
+            "anios_experiencia": rng.randint(0, 15),
+            "salario_esperado": rng.randrange(1_500_000, 9_000_000, 100_000),
+        }
+
+
+def _oferta(rng: random.Random):
+    return {
+        "modality": rng.choice(MODALIDADES),
+        "location": rng.choice(CIUDADES),
+        "years_experience": rng.randint(0, 8),
+        "salary": rng.randrange(2_000_000, 8_000_000, 100_000),
+    }, rng.sample(SKILLS_CONOCIDAS, rng.randint(3, 12))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--perfiles", type=int, default=100_000)
+    parser.add_argument("--ofertas", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+
+    inicio = time.perf_counter()
+    motor = MotorRelevancia(list(_perfiles(args.perfiles, rng)))
+    construccion = time.perf_counter() - inicio
+    print(f"Motor con {len(motor):,} perfiles y {len(motor.columnas)} skills construido en {construccion:.2f} s")
+
+    ofertas = [_oferta(rng) for _ in range(args.ofertas)]
+    candidatos = 0
+    tiempos = []
+    for oferta, skills in ofertas:
+        inicio = time.perf_counter()
+        resultado = motor.puntuar(oferta, skills, top_k=args.top_k)
+        tiempos.append(time.perf_counter() - inicio)
+        candidatos += len(resultado)
+
+    tiempos.sort()
+    p50 = tiempos[len(tiempos) // 2]
+    p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+    print(f"{args.ofertas} ofertas puntuadas (top {args.top_k}): p50={p50 * 1000:.1f} ms  p95={p95 * 1000:.1f} ms")
+    print(f"Notificaciones resultantes: {candidatos:,} (vs. audiencia booleana completa)")
+
+    umbral = [len(motor.puntuar(o, s, umbral=0.7)) for o, s in ofertas]
+    booleana = [len(motor.puntuar(o, s)) for o, s in ofertas]
+    print(f"Audiencia media: booleana={sum(booleana) / len(booleana):,.0f}  umbral 0.7={sum(umbral) / len(umbral):,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark del listado de notificaciones: ruta anterior (ORM + model_validate +
+response_model + JSON estándar) contra la ruta de filas planas + pydantic-core,
+y memoria retenida por fila según la representación (ORM, mapping, Row).
+
+Uso:
+    python -m notificationService.benchmarks.bench_serializacion --filas 10000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from ..src.models.notificacion import Notificacion
+from ..src.dto.notificacion_dto import NotificacionResponseDTO, CAMPOS_RESPUESTA, filas_a_json
+from ..src.repositories.notificacion_repo import NotificacionRepository, COLUMNAS_RESPUESTA
+
+
+def _sembrar(session: Session, filas: int) -> None:
+    ahora = datetime.utcnow()
+    session.add_all([
+        Notificacion(
+            id_usuario="usuario-bench",
+            id_empresa=f"empresa-{i % 50}",
+            tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+            asunto=f"Nueva oferta {i}",
+            mensaje=f"Hay una nueva oferta que coincide con tu perfil: 'Oferta {i}' en Bogotá.&Salario: $3000000",
+            id_oferta=i,
+            datos_adicionales="modalidad:Remoto&ubicacion:Bogotá",
+            leida=i % 3 == 0,
+            fecha_lectura=ahora if i % 3 == 0 else None,
+            fecha_creacion=ahora - timedelta(minutes=i),
+        )
+        for i in range(filas)
+    ])
+    session.commit()
+
+
+def _ruta_anterior(session: Session) -> bytes:
+    # Equivale a: ORM -> model_validate por fila -> revalidación con
+    # response_model=List[NotificacionResponseDTO] -> JSONResponse (json.dumps)
+    entidades = session.exec(
+        select(Notificacion).where(Notificacion.id_usuario == "usuario-bench")
+    ).all()
+    dtos = [NotificacionResponseDTO.model_validate(e) for e in entidades]
+    adapter = TypeAdapter(List[NotificacionResponseDTO])
+    contenido = adapter.dump_python(adapter.validate_python(dtos), mode="json")
+    return json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _ruta_filas(session: Session) -> bytes:
+    repo = NotificacionRepository(session)
+    return filas_a_json(repo.get_by_id_usuario(session, "usuario-bench"))
+
+
+def _medir(nombre: str, engine, fn, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        with Session(engine) as session:
+            inicio = time.perf_counter()
+            cuerpo = fn(session)
+            tiempos.append(time.perf_counter() - inicio)
+    mejor = min(tiempos)
+    print(f"{nombre:<16} mejor={mejor * 1000:8.1f} ms  bytes={len(cuerpo):,}")
+    return mejor
+
+
+def _memoria_por_fila(nombre: str, engine, fn, acceso, filas: int) -> None:
+    with Session(engine) as session:
+        fn(session)  # Calienta el cache de sentencias compiladas: no se cuenta como memoria por fila
+    with Session(engine) as session:
+        tracemalloc.start()
+        resultado = fn(session)
+        retenida, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Lectura de un campo de cada fila, como al armar la respuesta
+        inicio = time.perf_counter()
+        for fila in resultado:
+            acceso(fila)
+        duracion = time.perf_counter() - inicio
+    print(f"{nombre:<16} {retenida / filas:8.0f} B/fila  acceso={duracion * 1e9 / filas:6.0f} ns/fila")
+
+
+def _consulta():
+    return select(*COLUMNAS_RESPUESTA).where(Notificacion.id_usuario == "usuario-bench")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        _sembrar(session, args.filas)
+
+    print(f"Listado de {args.filas:,} notificaciones ({args.repeticiones} repeticiones)")
+    anterior = _medir("ORM + DTO", engine, _ruta_anterior, args.repeticiones)
+    filas = _medir("filas + to_json", engine, _ruta_filas, args.repeticiones)
+    print(f"Aceleración: x{anterior / filas:.2f} ({args.filas / filas:,.0f} filas/s)")
+
+    print("\nMemoria retenida por el resultado del listado")
+    _memoria_por_fila("ORM", engine, lambda s: s.exec(
+        select(Notificacion).where(Notificacion.id_usuario == "usuario-bench")
+    ).all(), lambda f: f.leida, args.filas)
+    _memoria_por_fila("RowMapping", engine, lambda s: s.exec(_consulta()).mappings().all(),
+                      lambda f: f["leida"], args.filas)
+    # Los listados leen las Row por posición (ver fila_a_dict)
+    indice_leida = CAMPOS_RESPUESTA.index("leida")
+    _memoria_por_fila("Row", engine, lambda s: s.exec(_consulta()).all(), lambda f: f[indice_leida], args.filas)
+
+
+if __name__ == "__main__":
+    main()
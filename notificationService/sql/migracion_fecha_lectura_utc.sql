@@ -0,0 +1,36 @@
+/*
+ * Pasa `fecha_lectura` de la hora local del servidor a UTC (Azure SQL).
+ *
+ * Hasta ahora las lecturas se registraban con la hora local del proceso
+ * (datetime.now()) y las creaciones en UTC; desde esta versión ambas van en
+ * UTC. Correr una sola vez, con la app detenida o justo al desplegar.
+ *
+ * @desfase_minutos = desfase UTC de la zona horaria en que corría la app
+ * (p. ej. -300 para America/Bogota). En App Service sin WEBSITE_TIME_ZONE la
+ * hora local ya era UTC: con 0 el script solo reconstruye el rollup de lecturas.
+ */
+
+DECLARE @desfase_minutos int = 0;
+
+BEGIN TRANSACTION;
+
+-- 1. Lecturas existentes: local -> UTC
+IF @desfase_minutos <> 0
+BEGIN
+    UPDATE dbo.notificaciones
+    SET fecha_lectura = DATEADD(minute, -@desfase_minutos, fecha_lectura)
+    WHERE fecha_lectura IS NOT NULL;
+
+    UPDATE dbo.notificaciones_archivo
+    SET fecha_lectura = DATEADD(minute, -@desfase_minutos, fecha_lectura)
+    WHERE fecha_lectura IS NOT NULL;
+END
+
+-- 2. El histograma de tiempo hasta la lectura se calculó mezclando zonas:
+--    se descarta y el próximo ciclo de rollup lo recalcula desde cero
+DELETE FROM dbo.notificaciones_rollup_lectura;
+UPDATE dbo.notificaciones_rollup_hora SET leidas = 0;
+DELETE FROM dbo.rollup_watermarks WHERE nombre = 'rollup_lecturas';
+
+COMMIT TRANSACTION;
+GO
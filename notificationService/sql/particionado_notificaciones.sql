@@ -0,0 +1,57 @@
+/*
+ * Layout opcional de particionado por fecha para `notificaciones` (Azure SQL).
+ *
+ * Particiona la tabla por mes de `fecha_creacion`. Las consultas de bandeja
+ * (por usuario/empresa y no leídas) filtran por índices alineados, y la política
+ * de retención puede vaciar particiones completas con TRUNCATE ... WITH (PARTITIONS)
+ * o SWITCH hacia `notificaciones_archivo` en lugar de borrar fila a fila.
+ *
+ * Ejecutar en una ventana de mantenimiento: reconstruye el índice clúster.
+ */
+
+-- 1. Función y esquema de partición mensual (ajustar el rango inicial)
+CREATE PARTITION FUNCTION pf_notificaciones_mes (datetime2)
+AS RANGE RIGHT FOR VALUES (
+    '2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01', '2025-05-01', '2025-06-01',
+    '2025-07-01', '2025-08-01', '2025-09-01', '2025-10-01', '2025-11-01', '2025-12-01',
+    '2026-01-01', '2026-02-01', '2026-03-01', '2026-04-01', '2026-05-01', '2026-06-01',
+    '2026-07-01', '2026-08-01', '2026-09-01', '2026-10-01', '2026-11-01', '2026-12-01'
+);
+GO
+
+CREATE PARTITION SCHEME ps_notificaciones_mes
+AS PARTITION pf_notificaciones_mes ALL TO ([PRIMARY]);
+GO
+
+-- 2. La clave de partición debe formar parte de la clave primaria clúster
+DECLARE @pk sysname = (
+    SELECT name FROM sys.key_constraints
+    WHERE parent_object_id = OBJECT_ID('dbo.notificaciones') AND type = 'PK'
+);
+EXEC('ALTER TABLE dbo.notificaciones DROP CONSTRAINT ' + @pk);
+GO
+
+ALTER TABLE dbo.notificaciones
+ADD CONSTRAINT pk_notificaciones
+PRIMARY KEY CLUSTERED (id_notificacion, fecha_creacion)
+ON ps_notificaciones_mes (fecha_creacion);
+GO
+
+-- 3. Índices alineados para las consultas calientes
+CREATE NONCLUSTERED INDEX ix_notificaciones_usuario_leida
+ON dbo.notificaciones (id_usuario, leida, fecha_creacion DESC)
+ON ps_notificaciones_mes (fecha_creacion);
+GO
+
+CREATE NONCLUSTERED INDEX ix_notificaciones_empresa_leida
+ON dbo.notificaciones (id_empresa, leida, fecha_creacion DESC)
+ON ps_notificaciones_mes (fecha_creacion);
+GO
+
+-- 4. Mantenimiento mensual (ventana deslizante): abrir la partición del mes siguiente
+--    ALTER PARTITION SCHEME ps_notificaciones_mes NEXT USED [PRIMARY];
+--    ALTER PARTITION FUNCTION pf_notificaciones_mes() SPLIT RANGE ('2027-01-01');
+--
+--    y, una vez archivado su contenido, vaciar la partición más antigua:
+--    TRUNCATE TABLE dbo.notificaciones WITH (PARTITIONS (1));
+--    ALTER PARTITION FUNCTION pf_notificaciones_mes() MERGE RANGE ('2025-01-01');
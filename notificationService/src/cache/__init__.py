@@ -0,0 +1,9 @@
+from .backends import CacheBackend, MemoriaLRUCache, RedisCache
+from .lectura_cache import CacheLectura, get_cache, clave_notificacion, NOTIFICACION, NO_LEIDAS_USUARIO
+from .escrituras_recientes import EscriturasRecientes, get_escrituras_recientes
+
+__all__ = [
+    "CacheBackend", "MemoriaLRUCache", "RedisCache",
+    "CacheLectura", "get_cache", "clave_notificacion", "NOTIFICACION", "NO_LEIDAS_USUARIO",
+    "EscriturasRecientes", "get_escrituras_recientes",
+]
@@ -0,0 +1,74 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Protocol, Any
+
+
+class CacheBackend(Protocol):
+    """
+    Interfaz mínima de almacenamiento (compatible con un cliente Redis).
+    Los valores son bytes ya serializados.
+    """
+
+    def get(self, clave: str) -> Optional[bytes]: ...
+
+    def set(self, clave: str, valor: bytes, ttl: int) -> None: ...
+
+    def delete(self, *claves: str) -> None: ...
+
+
+class MemoriaLRUCache:
+    """Cache en proceso: LRU acotado por número de entradas con expiración por TTL"""
+
+    def __init__(self, max_entradas: int = 10_000):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave: str) -> Optional[bytes]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave: str, valor: bytes, ttl: int) -> None:
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def delete(self, *claves: str) -> None:
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class RedisCache:
+    """
+    Adaptador sobre un cliente tipo Redis (redis.Redis o un fake con la misma API:
+    get(name), set(name, value, ex=segundos), delete(*names)).
+    """
+
+    def __init__(self, cliente: Any, prefijo: str = "notif:"):
+        self.cliente = cliente
+        self.prefijo = prefijo
+
+    def get(self, clave: str) -> Optional[bytes]:
+        return self.cliente.get(self.prefijo + clave)
+
+    def set(self, clave: str, valor: bytes, ttl: int) -> None:
+        self.cliente.set(self.prefijo + clave, valor, ex=ttl)
+
+    def delete(self, *claves: str) -> None:
+        if claves:
+            self.cliente.delete(*[self.prefijo + c for c in claves])
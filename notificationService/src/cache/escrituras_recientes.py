@@ -0,0 +1,67 @@
+import os
+from typing import Iterable, Optional
+from ..config.db import hay_replica
+from ..config.entorno import cargar_entorno
+
+from .backends import CacheBackend
+from .lectura_cache import get_cache
+
+cargar_entorno()
+
+# Keyspace
+ESCRITURA_RECIENTE = "escritura_reciente"
+
+
+class EscriturasRecientes:
+    """
+    Read-your-writes con réplica de lectura: marca por `ventana` segundos las
+    claves (usuario, empresa, notificación) recién escritas, para que sus
+    lecturas vayan a la primaria mientras la réplica se pone al día.
+
+    Usa el backend del cache, así que con Redis la marca la ven todos los workers.
+    Sin réplica configurada no hace nada.
+    """
+
+    def __init__(self, backend: CacheBackend, ventana: int = 10, activo: bool = True):
+        self.backend = backend
+        self.ventana = ventana
+        self.activo = activo
+
+    @staticmethod
+    def clave(tipo: str, valor) -> str:
+        return f"{ESCRITURA_RECIENTE}:{tipo}:{str(valor).lower()}"
+
+    def registrar(self, tipo: str, valores: Iterable) -> None:
+        if not self.activo:
+            return
+        try:
+            for valor in set(valores):
+                self.backend.set(self.clave(tipo, valor), b"1", self.ventana)
+        except Exception as e:
+            print(f"⚠️  Cache no disponible al registrar escrituras de {tipo}: {e}")
+
+    def alguna(self, claves: Iterable[str]) -> bool:
+        """¿Alguna de las claves (ya formadas con `clave`) se escribió dentro de la ventana?"""
+        if not self.activo:
+            return False
+        try:
+            return any(self.backend.get(c) is not None for c in claves)
+        except Exception as e:
+            # Ante la duda se lee de la primaria
+            print(f"⚠️  Cache no disponible al consultar escrituras recientes: {e}")
+            return True
+
+
+_escrituras: Optional[EscriturasRecientes] = None
+
+
+def get_escrituras_recientes() -> EscriturasRecientes:
+    """Registro compartido, con ventana REPLICA_VENTANA_CONSISTENCIA_SEGUNDOS"""
+    global _escrituras
+    if _escrituras is None:
+        _escrituras = EscriturasRecientes(
+            get_cache().backend,
+            ventana=int(os.getenv("REPLICA_VENTANA_CONSISTENCIA_SEGUNDOS", "10")),
+            activo=hay_replica
+        )
+    return _escrituras
@@ -0,0 +1,162 @@
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+from ..config.entorno import cargar_entorno
+from pydantic_core import to_json, from_json
+
+from .backends import CacheBackend, MemoriaLRUCache, RedisCache
+
+cargar_entorno()
+
+# Keyspaces
+NOTIFICACION = "notificacion"
+NO_LEIDAS_USUARIO = "no_leidas_usuario"
+
+
+def clave_notificacion(id_notificacion: int) -> str:
+    """Clave de una notificación en el keyspace NOTIFICACION (la misma al leer y al invalidar)"""
+    return str(int(id_notificacion))
+
+
+class _Carga:
+    """Carga en vuelo de una clave: evento para los que esperan y si se invalidó mientras tanto"""
+    __slots__ = ("evento", "invalidada")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.invalidada = False
+
+
+class CacheLectura:
+    """
+    Cache read-through con protección contra estampidas (single-flight por clave):
+    si varias peticiones piden la misma clave ausente, solo una consulta la BD
+    y las demás esperan su resultado.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = 30, espera_max: float = 5.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.espera_max = espera_max
+        self._lock = threading.Lock()
+        # Solo las claves con una carga en curso: se limpian al terminarla
+        self._en_vuelo: Dict[str, _Carga] = {}
+        self._metricas: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "esperas": 0, "invalidaciones": 0, "errores": 0}
+        )
+
+    @staticmethod
+    def _clave(keyspace: str, clave: str) -> str:
+        return f"{keyspace}:{clave}"
+
+    def _leer(self, clave: str) -> Optional[bytes]:
+        try:
+            return self.backend.get(clave)
+        except Exception as e:
+            print(f"⚠️  Cache no disponible al leer {clave}: {e}")
+            return None
+
+    def obtener(self, keyspace: str, clave: str, cargar: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor cacheado o lo carga con `cargar()` y lo guarda.
+        Los resultados None no se cachean.
+        """
+        k = self._clave(keyspace, clave)
+        metricas = self._metricas[keyspace]
+
+        crudo = self._leer(k)
+        if crudo is not None:
+            metricas["hits"] += 1
+            return from_json(crudo)
+
+        with self._lock:
+            carga = self._en_vuelo.get(k)
+            lider = carga is None
+            if lider:
+                carga = self._en_vuelo[k] = _Carga()
+
+        if not lider:
+            metricas["esperas"] += 1
+            carga.evento.wait(self.espera_max)  # type: ignore
+            crudo = self._leer(k)
+            if crudo is not None:
+                metricas["hits"] += 1
+                return from_json(crudo)
+            metricas["misses"] += 1
+            return cargar()
+
+        metricas["misses"] += 1
+        try:
+            valor = cargar()
+            # Si hubo una invalidación durante la carga, el valor puede estar desactualizado
+            if valor is not None and not carga.invalidada:  # type: ignore
+                try:
+                    self.backend.set(k, to_json(valor), self.ttl)
+                except Exception as e:
+                    metricas["errores"] += 1
+                    print(f"⚠️  Cache no disponible al escribir {k}: {e}")
+            return valor
+        finally:
+            with self._lock:
+                self._en_vuelo.pop(k, None)
+            carga.evento.set()  # type: ignore
+
+    def invalidar(self, keyspace: str, *claves: str) -> None:
+        """Elimina claves tras una escritura en la BD"""
+        if not claves:
+            return
+        ks = [self._clave(keyspace, c) for c in claves]
+        with self._lock:
+            for k in ks:
+                carga = self._en_vuelo.get(k)
+                if carga is not None:
+                    carga.invalidada = True
+        self._metricas[keyspace]["invalidaciones"] += len(ks)
+        try:
+            self.backend.delete(*ks)
+        except Exception as e:
+            self._metricas[keyspace]["errores"] += 1
+            print(f"⚠️  Cache no disponible al invalidar {keyspace}: {e}")
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """Hits/misses por keyspace"""
+        resultado = {}
+        for keyspace, m in self._metricas.items():
+            consultas = m["hits"] + m["misses"]
+            resultado[keyspace] = {
+                **m,
+                "hit_ratio": round(m["hits"] / consultas, 4) if consultas else 0.0
+            }
+        return resultado
+
+
+def _crear_backend() -> CacheBackend:
+    tipo = os.getenv("CACHE_BACKEND", "memoria").lower()
+
+    if tipo == "redis":
+        try:
+            import redis  # dependencia opcional
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requiere el paquete 'redis'") from e
+        cliente = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        return RedisCache(cliente, prefijo=os.getenv("CACHE_PREFIJO", "notif:"))
+
+    return MemoriaLRUCache(max_entradas=int(os.getenv("CACHE_MAX_ENTRADAS", "10000")))
+
+
+_cache: Optional[CacheLectura] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheLectura:
+    """Cache compartido del proceso (se crea en el primer uso)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheLectura(
+                    _crear_backend(),
+                    ttl=int(os.getenv("CACHE_TTL_SEGUNDOS", "30"))
+                )
+    return _cache
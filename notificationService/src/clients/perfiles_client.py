@@ -0,0 +1,373 @@
+import os
+import json
+import time
+import base64
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+from urllib.parse import urlencode
+
+import httpx
+from httpx import QueryParams
+from ..config.entorno import cargar_entorno
+
+try:
+    import fcntl  # Solo POSIX: lock entre workers de gunicorn
+except ImportError:  # pragma: no cover - Windows en desarrollo
+    fcntl = None  # type: ignore
+
+cargar_entorno()
+
+
+def _expiracion_jwt(token: str) -> Optional[float]:
+    """Lee el claim `exp` de un JWT sin verificar la firma (solo para planificar el refresh)"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+def _reintentable(error: Exception) -> bool:
+    """Errores de red y respuestas 429/5xx: pueden resolverse al reintentar"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def _describir_error(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"{error.response.status_code} {error.request.url.path}"
+    return str(error) or type(error).__name__
+
+
+class TokenStore(Protocol):
+    """Almacén compartido de token entre procesos"""
+
+    def leer(self) -> Optional[str]: ...
+
+    def guardar(self, token: str) -> None: ...
+
+
+class ArchivoTokenStore:
+    """
+    Guarda el token en un archivo local para que los workers de un mismo host lo
+    reutilicen. La escritura es atómica (archivo temporal + os.replace) y el login
+    se serializa entre procesos con un lock de archivo cuando está disponible.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+
+    def leer(self) -> Optional[str]:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def guardar(self, token: str) -> None:
+        directorio = os.path.dirname(os.path.abspath(self.ruta))
+        fd, tmp = tempfile.mkstemp(dir=directorio, prefix=".token-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(token)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.ruta)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def lock_login(self):
+        """Context manager de exclusión entre procesos durante el login"""
+        return _LockArchivo(self.ruta + ".lock")
+
+
+class _LockArchivo:
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._f = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._f = open(self.ruta, "a")
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._f is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)  # type: ignore
+            self._f.close()
+            self._f = None
+
+
+class TokenCache:
+    """
+    Token compartido por todo el proceso. Se renueva antes de expirar (según `exp`
+    del JWT) y un lock single-flight evita logins concurrentes.
+    """
+
+    def __init__(
+        self,
+        login: Callable[[], str],
+        store: Optional[TokenStore] = None,
+        margen_segundos: int = 60,
+        ttl_por_defecto: int = 900
+    ):
+        self._login = login
+        self.store = store
+        self.margen_segundos = margen_segundos
+        self.ttl_por_defecto = ttl_por_defecto
+        self._token: Optional[str] = None
+        self._expira: float = 0.0
+        self._lock = threading.Lock()
+
+    def _vigente(self, expira: float) -> bool:
+        return expira - self.margen_segundos > time.time()
+
+    def _adoptar(self, token: str) -> bool:
+        expira = _expiracion_jwt(token) or (time.time() + self.ttl_por_defecto)
+        if not self._vigente(expira):
+            return False
+        self._token, self._expira = token, expira
+        return True
+
+    def obtener(self) -> str:
+        token = self._token
+        if token and self._vigente(self._expira):
+            return token
+
+        with self._lock:
+            # Otro hilo pudo renovarlo mientras esperábamos el lock
+            if self._token and self._vigente(self._expira):
+                return self._token
+
+            if self.store is not None:
+                compartido = self.store.leer()
+                if compartido and compartido != self._token and self._adoptar(compartido):
+                    return compartido
+
+            lock_procesos = getattr(self.store, "lock_login", None)
+            if lock_procesos is None:
+                return self._renovar()
+
+            with lock_procesos():
+                # Otro worker pudo haber hecho login mientras esperábamos
+                compartido = self.store.leer()  # type: ignore
+                if compartido and compartido != self._token and self._adoptar(compartido):
+                    return compartido
+                return self._renovar()
+
+    def _renovar(self) -> str:
+        token = self._login()
+        expira = _expiracion_jwt(token) or (time.time() + self.ttl_por_defecto)
+        self._token, self._expira = token, expira
+        if self.store is not None:
+            try:
+                self.store.guardar(token)
+            except OSError as e:
+                print(f"⚠️  No se pudo compartir el token de perfiles: {e}")
+        print("🔐 Nuevo token obtenido por login.")
+        return token
+
+    def invalidar(self, token_rechazado: str) -> None:
+        """Descarta el token si el API lo rechazó (solo si nadie lo renovó ya)"""
+        with self._lock:
+            if self._token == token_rechazado:
+                self._token, self._expira = None, 0.0
+
+
+class PerfilesClient:
+    """
+    Cliente del API de perfiles reutilizable entre requests: conexión HTTP con
+    pool compartido y token cacheado por proceso (y opcionalmente entre workers).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        auth_url: str,
+        usuario: str,
+        password: str,
+        store: Optional[TokenStore] = None,
+        timeout: float = 60.0,
+        skills_por_lote: int = 10,
+        max_longitud_query: int = 1500,
+        max_concurrencia: int = 8,
+        reintentos: int = 2,
+        espera_reintento: float = 0.5
+    ):
+        self.base_url = base_url
+        self.auth_url = auth_url
+        self._usuario = usuario
+        self._password = password
+        self.skills_por_lote = skills_por_lote
+        self.max_longitud_query = max_longitud_query
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self._http = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrencia * 2)
+        )
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrencia, thread_name_prefix="perfiles")
+        self.tokens = TokenCache(self._login, store)
+
+    def _login(self) -> str:
+        response = self._http.post(
+            f"{self.auth_url}/login",
+            json={"email": self._usuario, "password": self._password},
+            timeout=30.0
+        )
+        response.raise_for_status()
+
+        token = response.json().get("token")
+        if not token:
+            raise Exception("Login exitoso pero no llegó token.")
+        return token
+
+    def _get(self, url: str, params: QueryParams) -> httpx.Response:
+        token = self.tokens.obtener()
+        response = self._http.get(url, params=params, headers={"Authorization": f"Bearer {token}"})
+
+        if response.status_code in (401, 403):
+            print("🔄 Token rechazado por el API de perfiles. Renovando...")
+            self.tokens.invalidar(token)
+            token = self.tokens.obtener()
+            response = self._http.get(url, params=params, headers={"Authorization": f"Bearer {token}"})
+
+        return response
+
+    def lotes_skills(self, skills: List[str]) -> List[List[str]]:
+        """
+        Divide las skills en lotes que respetan tanto el máximo de skills por
+        consulta como la longitud máxima de la query string codificada.
+        """
+        lotes: List[List[str]] = []
+        actual: List[str] = []
+        longitud = 0
+
+        for skill in dict.fromkeys(skills):
+            costo = len(urlencode({"names": skill})) + 1
+            if actual and (len(actual) >= self.skills_por_lote or longitud + costo > self.max_longitud_query):
+                lotes.append(actual)
+                actual, longitud = [], 0
+            actual.append(skill)
+            longitud += costo
+
+        if actual:
+            lotes.append(actual)
+        return lotes
+
+    def _consultar_lote(self, skills: List[str]) -> List[Dict]:
+        """
+        Consulta un lote de skills. Los errores de red y las respuestas 429/5xx se
+        reintentan hasta `reintentos` veces; si persisten, la excepción se propaga:
+        sin ese lote la audiencia quedaría incompleta y la oferta se marcaría
+        como notificada igual.
+        """
+        # params como tuplas repetidas: [("names", "SQL"), ("names", "Docker")]
+        params = QueryParams([("names", s) for s in skills])
+
+        intento = 0
+        while True:
+            try:
+                return self._leer_perfiles(self._get(f"{self.base_url}/skill", params))
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if intento >= self.reintentos or not _reintentable(e):
+                    print(f"❌ Error del API de perfiles tras {intento + 1} intentos: {_describir_error(e)}")
+                    raise
+                intento += 1
+                time.sleep(self.espera_reintento * intento)
+
+    @staticmethod
+    def _leer_perfiles(response: httpx.Response) -> List[Dict]:
+        response.raise_for_status()
+        data = response.json()
+
+        if isinstance(data, list):
+            return [x for x in data if x.get("id")]
+
+        if isinstance(data, dict) and "profiles" in data:
+            return [x for x in data["profiles"] if x.get("id")]
+
+        raise ValueError(f"Formato inesperado del API de perfiles: {type(data).__name__}")
+
+    @staticmethod
+    def _coincidencias(perfil: Dict, skills_lote: List[str]) -> int:
+        """
+        Skills del lote que tiene el perfil. Si el API no devuelve las skills del
+        perfil, se cuenta 1 (sabemos que tiene al menos una del lote).
+        """
+        skills_perfil = perfil.get("skills")
+        if not isinstance(skills_perfil, list):
+            return 1
+        nombres = {
+            ((s.get("name") or s.get("nombre") or "") if isinstance(s, dict) else str(s or "")).lower()
+            for s in skills_perfil
+        }
+        return max(1, sum(1 for s in skills_lote if s.lower() in nombres))
+
+    def buscar_audiencia(self, skills: List[str], min_coincidencias: int = 1) -> List[Tuple[str, int]]:
+        """
+        Resuelve la audiencia de un conjunto de skills sin truncarlo: consulta los
+        lotes en paralelo y une los resultados. Si un lote falla (agotados sus
+        reintentos) se propaga el error en lugar de devolver una audiencia parcial.
+
+        Returns:
+            (id_usuario, skills coincidentes) ordenados de mayor a menor coincidencia,
+            solo los que alcanzan `min_coincidencias`
+        """
+        if not skills:
+            return []
+
+        lotes = self.lotes_skills(skills)
+        if len(lotes) == 1:
+            respuestas = [self._consultar_lote(lotes[0])]
+        else:
+            respuestas = list(self._pool.map(self._consultar_lote, lotes))
+
+        conteo: Counter = Counter()
+        for lote, perfiles in zip(lotes, respuestas):
+            vistos = set()
+            for perfil in perfiles:
+                id_usuario = perfil["id"]
+                if id_usuario not in vistos:
+                    vistos.add(id_usuario)
+                    conteo[id_usuario] += self._coincidencias(perfil, lote)
+
+        audiencia = [(u, n) for u, n in conteo.most_common() if n >= min_coincidencias]
+        print(f"✅ API de perfiles: {len(audiencia)} usuarios en {len(lotes)} consultas ({len(skills)} skills)")
+        return audiencia
+
+    def buscar_por_skills(self, skills: List[str]) -> List[str]:
+        """Devuelve los IDs de usuario cuyos perfiles tienen alguna de las skills"""
+        return [u for u, _ in self.buscar_audiencia(skills)]
+
+
+_cliente: Optional[PerfilesClient] = None
+_cliente_lock = threading.Lock()
+
+
+def get_perfiles_client() -> PerfilesClient:
+    """Cliente compartido del proceso (se crea en el primer uso)"""
+    global _cliente
+    if _cliente is None:
+        with _cliente_lock:
+            if _cliente is None:
+                ruta_token = os.getenv("PROFILE_TOKEN_STORE")
+                _cliente = PerfilesClient(
+                    base_url=os.getenv("PROFILE_URL") or "",
+                    auth_url=os.getenv("PROFILE_AUTH") or "",
+                    usuario=str(os.getenv("PROFILE_USER")),
+                    password=str(os.getenv("PROFILE_PASS")),
+                    store=ArchivoTokenStore(ruta_token) if ruta_token else None,
+                    skills_por_lote=int(os.getenv("PROFILE_SKILLS_POR_LOTE", "10")),
+                    max_longitud_query=int(os.getenv("PROFILE_MAX_LONGITUD_QUERY", "1500")),
+                    max_concurrencia=int(os.getenv("PROFILE_MAX_CONCURRENCIA", "8")),
+                    reintentos=int(os.getenv("PROFILE_REINTENTOS", "2"))
+                )
+    return _cliente
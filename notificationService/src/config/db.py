@@ -1,9 +1,11 @@
 import os
+import threading
+from typing import Optional
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine
-from dotenv import load_dotenv
+from .entorno import cargar_entorno
 
-dotenv_path = os.path.join(os.path.dirname(__file__), '../../.env')
-load_dotenv(dotenv_path)
+cargar_entorno()
 
 SQLAZURE_SERVER = os.getenv("AZURESQL_SERVER")
 SQLAZURE_PORT = os.getenv("AZURESQL_PORT")
@@ -12,7 +14,57 @@ SQLAZURE_USER = os.getenv("AZURESQL_USER")
 SQLAZURE_PASSWORD = os.getenv("AZURESQL_PASSWORD")
 SQLAZURE_DRIVER = os.getenv("AZURESQL_DRIVER") or ""
 
-db_connection_url = f"mssql+pyodbc://{SQLAZURE_USER}:{SQLAZURE_PASSWORD}@{SQLAZURE_SERVER}:{SQLAZURE_PORT}/{SQLAZURE_DB}?driver={SQLAZURE_DRIVER.replace(' ', '+')}"
+db_connection_url = os.getenv("DB_URL") or (
+    f"mssql+pyodbc://{SQLAZURE_USER}:{SQLAZURE_PASSWORD}@{SQLAZURE_SERVER}:{SQLAZURE_PORT}/{SQLAZURE_DB}"
+    f"?driver={SQLAZURE_DRIVER.replace(' ', '+')}"
+)
 
-engine = create_engine(db_connection_url)
+# Réplica de lectura opcional: DB_REPLICA_URL explícita o, con AZURESQL_LECTURA_REPLICA=true,
+# la réplica de escalado de lectura de Azure SQL (misma conexión con ApplicationIntent=ReadOnly)
+db_replica_url = os.getenv("DB_REPLICA_URL")
+if not db_replica_url and os.getenv("AZURESQL_LECTURA_REPLICA", "false").lower() == "true" and not os.getenv("DB_URL"):
+    db_replica_url = f"{db_connection_url}&ApplicationIntent=ReadOnly"
 
+hay_replica = bool(db_replica_url)
+
+# Los engines se crean en el lifespan de la app (o en el primer uso fuera de ella):
+# importar este módulo no carga el driver ODBC ni el dialecto
+_engine: Optional[Engine] = None
+_engine_lectura: Optional[Engine] = None
+_engines_lock = threading.Lock()
+
+
+def crear_engines() -> None:
+    global _engine, _engine_lectura
+    if _engine is not None:
+        return
+    with _engines_lock:
+        if _engine is None:
+            engine = create_engine(db_connection_url)
+            _engine_lectura = create_engine(db_replica_url) if db_replica_url else engine
+            _engine = engine
+
+
+def get_engine() -> Engine:
+    """Engine de la base primaria (escrituras y lecturas consistentes)"""
+    if _engine is None:
+        crear_engines()
+    return _engine  # type: ignore
+
+
+def get_engine_lectura() -> Engine:
+    """Engine de la réplica de lectura; la primaria si no hay réplica"""
+    if _engine_lectura is None:
+        crear_engines()
+    return _engine_lectura  # type: ignore
+
+
+def cerrar_engines() -> None:
+    """Cierra los pools de conexiones (apagado del servidor)"""
+    global _engine, _engine_lectura
+    with _engines_lock:
+        if _engine_lectura is not None and _engine_lectura is not _engine:
+            _engine_lectura.dispose()
+        if _engine is not None:
+            _engine.dispose()
+        _engine = _engine_lectura = None
@@ -1,10 +1,12 @@
 import os
+import threading
+from typing import Optional
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine
-from dotenv import load_dotenv
+from .entorno import cargar_entorno
 from urllib.parse import quote_plus
 
-dotenv_path = os.path.join(os.path.dirname(__file__), '../../.env')
-load_dotenv(dotenv_path)
+cargar_entorno()
 
 # Configuración de Azure Synapse Analytics
 SYNAPSE_SERVER = os.getenv("SYNAPSE_SERVER")
@@ -28,15 +30,38 @@ synapse_connection_url = (
     f"&Encrypt=yes&TrustServerCertificate=no&Connection+Timeout=30"
 )
 
-# Motor de Synapse con configuración optimizada
-synapse_engine = create_engine(
-    synapse_connection_url,
-    echo=False,  # Cambiar a True para debug
-    pool_pre_ping=True,  # Verifica la conexión antes de usar
-    pool_size=10,  # Tamaño del pool de conexiones
-    max_overflow=20,  # Conexiones adicionales permitidas
-    pool_recycle=3600,  # Reciclar conexiones cada hora
-    connect_args={
-        "autocommit": True  # Importante para evitar problemas con transacciones en Synapse
-    }
-)
\ No newline at end of file
+# SYNAPSE_URL reemplaza la conexión completa (p. ej. una base SQLite en pruebas de carga)
+synapse_url_directa = os.getenv("SYNAPSE_URL")
+
+# Motor de Synapse con configuración optimizada; se crea en el lifespan o en el primer uso
+_synapse_engine: Optional[Engine] = None
+_synapse_lock = threading.Lock()
+
+
+def get_synapse_engine() -> Engine:
+    global _synapse_engine
+    if _synapse_engine is None:
+        with _synapse_lock:
+            if _synapse_engine is None and synapse_url_directa:
+                _synapse_engine = create_engine(synapse_url_directa, pool_pre_ping=True)
+            elif _synapse_engine is None:
+                _synapse_engine = create_engine(
+                    synapse_connection_url,
+                    echo=False,  # Cambiar a True para debug
+                    pool_pre_ping=True,  # Verifica la conexión antes de usar
+                    pool_size=10,  # Tamaño del pool de conexiones
+                    max_overflow=20,  # Conexiones adicionales permitidas
+                    pool_recycle=3600,  # Reciclar conexiones cada hora
+                    connect_args={
+                        "autocommit": True  # Importante para evitar problemas con transacciones en Synapse
+                    }
+                )
+    return _synapse_engine
+
+
+def cerrar_synapse_engine() -> None:
+    global _synapse_engine
+    with _synapse_lock:
+        if _synapse_engine is not None:
+            _synapse_engine.dispose()
+            _synapse_engine = None
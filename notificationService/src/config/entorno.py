@@ -0,0 +1,24 @@
+"""
+Variables de entorno desde notificationService/.env.
+
+El archivo se lee una sola vez por proceso: los módulos llaman a
+cargar_entorno() al importarse y las llamadas siguientes no hacen nada.
+"""
+import os
+import threading
+
+dotenv_path = os.path.join(os.path.dirname(__file__), '../../.env')
+
+_cargado = False
+_lock = threading.Lock()
+
+
+def cargar_entorno() -> None:
+    global _cargado
+    if _cargado:
+        return
+    with _lock:
+        if not _cargado:
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path)
+            _cargado = True
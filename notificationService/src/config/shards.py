@@ -0,0 +1,290 @@
+"""
+Sharding opcional por id_empresa.
+
+Con SHARDS="a=<url>,b=<url>,..." las tablas por empresa (notificaciones,
+convocatoria_snapshots, ofertas_notificadas) se reparten entre varias bases:
+cada id_empresa va al shard que le asigna un anillo de hashing consistente
+(agregar o quitar un shard solo mueve ~1/N de las empresas). Las filas de
+usuario se encuentran con el directorio `usuarios_shards` de la base primaria.
+Sin SHARDS todo sigue en la base primaria y los repositorios no cambian de camino.
+"""
+import bisect
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, create_engine, select, insert, col
+
+from .db import get_engine
+from .entorno import cargar_entorno
+from ..models.notificacion import Notificacion
+from ..models.usuario_shard import UsuarioShard
+from ..exception.no_soportado_con_shards import NoSoportadoConShards
+
+cargar_entorno()
+
+T = TypeVar("T")
+
+# SQL Server admite 2100 parámetros por sentencia; se deja margen
+MAX_PARAMETROS_SQL = 2000
+
+# Rango de identidades de notificaciones por shard: los ids no se repiten entre shards.
+# id_notificacion es INT: 100M por shard deja lugar para 21 shards
+TAMANO_RANGO_IDS = 100_000_000
+
+
+def _hash(clave: str) -> int:
+    return int.from_bytes(hashlib.md5(clave.encode("utf-8")).digest()[:8], "big")
+
+
+class ShardRouter:
+    """
+    Asigna empresas a shards con un anillo de hashing consistente (`vnodes`
+    puntos por shard) y ofrece sesiones por shard y scatter-gather en paralelo.
+
+    El anillo se arma con los nombres de los shards, no con sus URLs: cambiar
+    la cadena de conexión de un shard no mueve empresas.
+    """
+
+    def __init__(
+        self,
+        engines: Dict[str, Engine],
+        directorio: Engine,
+        vnodes: int = 64,
+        max_usuarios_registrados: int = 100_000
+    ):
+        """
+        Args:
+            engines: {nombre del shard: engine}
+            directorio: Engine de la base con `usuarios_shards` (la primaria)
+            vnodes: Puntos del anillo por shard (más puntos, reparto más parejo)
+            max_usuarios_registrados: Pares (usuario, shard) ya registrados que se
+                recuerdan (LRU) para no consultar el directorio en cada escritura
+        """
+        if not engines:
+            raise ValueError("ShardRouter requiere al menos un shard")
+        self.engines = dict(engines)
+        self.directorio = directorio
+        self.nombres: List[str] = sorted(engines)
+
+        anillo = sorted(
+            (_hash(f"{nombre}#{i}"), nombre)
+            for nombre in self.nombres
+            for i in range(vnodes)
+        )
+        self._puntos = [punto for punto, _ in anillo]
+        self._shards_anillo = [nombre for _, nombre in anillo]
+
+        self._pool = ThreadPoolExecutor(max_workers=len(self.nombres), thread_name_prefix="shard")
+        self.max_usuarios_registrados = max_usuarios_registrados
+        self._usuarios_registrados: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # RUTEO
+
+    def shard_de_empresa(self, id_empresa: str) -> str:
+        indice = bisect.bisect(self._puntos, _hash(str(id_empresa))) % len(self._puntos)
+        return self._shards_anillo[indice]
+
+    def agrupar_por_shard(self, items: Iterable[T], id_empresa: Callable[[T], str]) -> Dict[str, List[T]]:
+        """Agrupa items por el shard de su empresa, conservando el orden dentro de cada grupo"""
+        grupos: Dict[str, List[T]] = {}
+        for item in items:
+            grupos.setdefault(self.shard_de_empresa(id_empresa(item)), []).append(item)
+        return grupos
+
+    @contextmanager
+    def sesion(self, shard: str) -> Iterator[Session]:
+        # Sin expirar al confirmar: los objetos se siguen leyendo después de cerrar la sesión
+        with Session(self.engines[shard], expire_on_commit=False) as session:
+            yield session
+
+    def en_shard(self, shard: str, fn: Callable[[Session], T]) -> T:
+        with self.sesion(shard) as session:
+            return fn(session)
+
+    def en_empresa(self, id_empresa: str, fn: Callable[[Session], T]) -> T:
+        return self.en_shard(self.shard_de_empresa(id_empresa), fn)
+
+    def scatter(self, fn: Callable[[Session], T], shards: Optional[Iterable[str]] = None) -> List[T]:
+        """
+        Ejecuta `fn` con una sesión en cada shard (todos por defecto), en paralelo.
+        Devuelve los resultados en el orden de los shards; un error en cualquier
+        shard se propaga.
+        """
+        shards = self.nombres if shards is None else list(shards)
+        if len(shards) == 1:
+            return [self.en_shard(shards[0], fn)]
+        futuros = [self._pool.submit(self.en_shard, shard, fn) for shard in shards]
+        return [futuro.result() for futuro in futuros]
+
+    # DIRECTORIO DE USUARIOS
+
+    def registrar_usuarios(self, pares: Iterable[Tuple[str, str]]) -> None:
+        """
+        Registra (id_usuario, shard) en el directorio. Se llama antes de escribir
+        en el shard: un lector puede ver un shard de más, nunca uno de menos.
+        """
+        nuevos = self._no_recordados(pares)
+        if not nuevos:
+            return
+        with Session(self.directorio) as session:
+            existentes: Set[Tuple[str, str]] = set()
+            usuarios = sorted({u for u, _ in nuevos})
+            for inicio in range(0, len(usuarios), MAX_PARAMETROS_SQL):
+                existentes.update(session.exec(
+                    select(UsuarioShard.id_usuario, UsuarioShard.shard)
+                    .where(col(UsuarioShard.id_usuario).in_(usuarios[inicio:inicio + MAX_PARAMETROS_SQL]))
+                ).all())
+            faltantes = [{"id_usuario": u, "shard": s} for u, s in nuevos - existentes]
+            if faltantes:
+                self._insertar_en_directorio(session, faltantes)
+        self._recordar(nuevos)
+
+    @staticmethod
+    def _insertar_en_directorio(session: Session, filas: List[Dict[str, str]]) -> None:
+        try:
+            session.execute(insert(UsuarioShard), filas)
+            session.commit()
+        except IntegrityError:
+            # Otro worker registró alguno a la vez: se insertan de a uno
+            session.rollback()
+            for fila in filas:
+                try:
+                    session.execute(insert(UsuarioShard), [fila])
+                    session.commit()
+                except IntegrityError:
+                    session.rollback()
+
+    def _no_recordados(self, pares: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        nuevos: Set[Tuple[str, str]] = set()
+        with self._lock:
+            for par in set(pares):
+                if par in self._usuarios_registrados:
+                    self._usuarios_registrados.move_to_end(par)
+                else:
+                    nuevos.add(par)
+        return nuevos
+
+    def _recordar(self, pares: Set[Tuple[str, str]]) -> None:
+        with self._lock:
+            for par in pares:
+                self._usuarios_registrados[par] = None
+            while len(self._usuarios_registrados) > self.max_usuarios_registrados:
+                self._usuarios_registrados.popitem(last=False)
+
+    def shards_de_usuario(self, id_usuario: str) -> List[str]:
+        with Session(self.directorio) as session:
+            shards = set(session.exec(
+                select(col(UsuarioShard.shard)).where(col(UsuarioShard.id_usuario) == id_usuario)
+            ).all())
+        return [nombre for nombre in self.nombres if nombre in shards]
+
+    def reconstruir_directorio(self) -> int:
+        """Registra los usuarios que ya tienen filas en cada shard (datos previos al directorio)"""
+        por_shard = self.scatter(lambda s: list(s.exec(select(Notificacion.id_usuario).distinct()).all()))
+        pares = {(u, shard) for shard, usuarios in zip(self.nombres, por_shard) for u in usuarios}
+        self.registrar_usuarios(pares)
+        return len(pares)
+
+    # IDENTIDADES
+
+    def preparar_identidades(self, tamano_rango: int = TAMANO_RANGO_IDS) -> None:
+        """
+        Hace que cada shard genere ids de notificación en su propio rango
+        (shard i: desde i * tamano_rango), así un id identifica una sola fila
+        entre todos los shards. Idempotente: no toca shards que ya están en su rango.
+        """
+        for indice, nombre in enumerate(self.nombres):
+            inicio = indice * tamano_rango
+            if not inicio:
+                continue
+            with self.engines[nombre].begin() as conexion:
+                actual = conexion.execute(text("SELECT MAX(id_notificacion) FROM notificaciones")).scalar() or 0
+                if actual >= inicio:
+                    continue
+                dialecto = conexion.dialect.name
+                if dialecto == "mssql":
+                    conexion.execute(text(f"DBCC CHECKIDENT ('notificaciones', RESEED, {inicio})"))
+                elif dialecto == "sqlite":
+                    # Requiere la tabla con AUTOINCREMENT (ver Notificacion.__table_args__)
+                    actualizadas = conexion.execute(
+                        text("UPDATE sqlite_sequence SET seq = :inicio WHERE name = 'notificaciones'"),
+                        {"inicio": inicio}
+                    ).rowcount
+                    if not actualizadas:
+                        conexion.execute(
+                            text("INSERT INTO sqlite_sequence (name, seq) VALUES ('notificaciones', :inicio)"),
+                            {"inicio": inicio}
+                        )
+                else:
+                    raise RuntimeError(
+                        f"Shard {nombre}: no se sabe fijar la identidad de notificaciones en {dialecto}; "
+                        f"fijarla manualmente en {inicio} o usar mssql/sqlite"
+                    )
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=False)
+        for engine in self.engines.values():
+            engine.dispose()
+
+
+def parsear_shards(valor: str) -> Dict[str, str]:
+    """'a=url1,b=url2' -> {'a': 'url1', 'b': 'url2'}"""
+    shards: Dict[str, str] = {}
+    for parte in filter(None, (p.strip() for p in valor.split(","))):
+        nombre, separador, url = parte.partition("=")
+        if not separador or not nombre.strip() or not url.strip():
+            raise ValueError(f"SHARDS: se esperaba 'nombre=url', se recibió '{parte}'")
+        shards[nombre.strip()] = url.strip()
+    return shards
+
+
+_router: Optional[ShardRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_shard_router() -> Optional[ShardRouter]:
+    """Router compartido del proceso, o None si SHARDS no está configurado"""
+    global _router
+    if _router is None and os.getenv("SHARDS"):
+        with _router_lock:
+            if _router is None:
+                _router = ShardRouter(
+                    {nombre: create_engine(url) for nombre, url in parsear_shards(os.environ["SHARDS"]).items()},
+                    directorio=get_engine(),
+                    vnodes=int(os.getenv("SHARDS_VNODES", "64")),
+                    max_usuarios_registrados=int(os.getenv("SHARDS_MAX_USUARIOS_REGISTRADOS", "100000"))
+                )
+    return _router
+
+
+def exigir_sin_shards(operacion: str) -> None:
+    """
+    Para las operaciones que todavía recorren las tablas por empresa en la base
+    primaria (retención, rollups, exportaciones, reconstrucción de estadísticas):
+    con SHARDS esas tablas están vacías y el resultado sería incorrecto.
+    """
+    if get_shard_router() is not None:
+        raise NoSoportadoConShards(f"{operacion} no está disponible con SHARDS configurado")
+
+
+def instalar_shard_router(router: Optional[ShardRouter]) -> None:
+    """Reemplaza el router compartido (pruebas locales con varias bases SQLite)"""
+    global _router
+    _router = router
+
+
+def cerrar_shard_router() -> None:
+    global _router
+    with _router_lock:
+        if _router is not None:
+            _router.cerrar()
+            _router = None
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Iterable, Mapping, Sequence, Union, Any, List, Dict, Tuple
 from pydantic import BaseModel, Field
+from pydantic_core import to_json
 
 
 class NotificacionCreateDTO(BaseModel):
@@ -29,4 +30,80 @@ class NotificacionResponseDTO(BaseModel):
     fecha_lectura: Optional[datetime] = None
     fecha_creacion: datetime
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True, "coerce_numbers_to_str": True}
+
+
+class ErrorItemDTO(BaseModel):
+    """Error de un elemento concreto dentro de una operación en lote"""
+    indice: int
+    errores: List[Dict[str, Any]]
+
+
+class NotificacionBulkResultadoDTO(BaseModel):
+    creadas: int
+    ids: List[str]  # En el mismo orden que los elementos válidos del lote
+    errores: List[ErrorItemDTO] = []
+
+
+class IdsNotificacionesDTO(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
+class ResultadoIdDTO(BaseModel):
+    id_notificacion: str
+    resultado: str
+
+
+class OperacionBulkResultadoDTO(BaseModel):
+    procesadas: int  # Notificaciones efectivamente modificadas/eliminadas
+    resultados: List[ResultadoIdDTO]
+
+
+# Orden de las columnas de los listados (ver COLUMNAS_RESPUESTA en notificacion_repo)
+CAMPOS_RESPUESTA = tuple(NotificacionResponseDTO.model_fields)
+
+
+def parsear_campos(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Campos pedidos con `fields=asunto,leida` (sparse fieldset), en el orden de
+    CAMPOS_RESPUESTA. id_notificacion se incluye siempre; sin `fields`, todos.
+    """
+    if not fields or not fields.strip():
+        return CAMPOS_RESPUESTA
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    desconocidos = pedidos.difference(CAMPOS_RESPUESTA)
+    if desconocidos:
+        raise ValueError(
+            f"Campos desconocidos: {', '.join(sorted(desconocidos))}. "
+            f"Disponibles: {', '.join(CAMPOS_RESPUESTA)}"
+        )
+    pedidos.add("id_notificacion")
+    return tuple(campo for campo in CAMPOS_RESPUESTA if campo in pedidos)
+
+
+def fila_a_dict(
+        fila: Union[Sequence[Any], Mapping[str, Any]],
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+) -> Dict[str, Any]:
+    """
+    Dict con la forma de NotificacionResponseDTO (o solo `campos`) a partir de
+    una fila Row con esas columnas al principio, o de un mapping completo
+    """
+    if isinstance(fila, Mapping):
+        datos = dict(fila) if campos is CAMPOS_RESPUESTA else {campo: fila[campo] for campo in campos}
+    else:
+        datos = dict(zip(campos, fila))
+    datos["id_notificacion"] = str(datos["id_notificacion"])
+    return datos
+
+
+def filas_a_json(
+        filas: Iterable[Union[Sequence[Any], Mapping[str, Any]]],
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+) -> bytes:
+    """
+    Serializa filas de notificaciones (ya tipadas por la BD) con la misma forma
+    que NotificacionResponseDTO, sin volver a validarlas fila por fila. Acepta
+    filas Row en el orden de `campos` o mappings (p. ej. las cacheadas).
+    """
+    return to_json([fila_a_dict(fila, campos) for fila in filas])
@@ -0,0 +1,12 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class PerfilFeaturesDTO(BaseModel):
+    """Atributos de un perfil para el motor de relevancia"""
+    id_usuario: str = Field(..., max_length=50)
+    skills: List[str] = []
+    modalidad: Optional[str] = None
+    ubicacion: Optional[str] = None
+    anios_experiencia: int = 0
+    salario_esperado: Optional[int] = None
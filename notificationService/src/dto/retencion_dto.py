@@ -0,0 +1,44 @@
+import os
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+from ..config.entorno import cargar_entorno
+
+cargar_entorno()
+
+
+def _env_int(nombre: str, default: Optional[int]) -> Optional[int]:
+    valor = os.getenv(nombre)
+    return int(valor) if valor else default
+
+
+class PoliticaRetencionDTO(BaseModel):
+    """
+    Política de retención de `notificaciones`.
+    Los valores por defecto salen de variables de entorno (RETENCION_*).
+    """
+    dias_leidas: Optional[int] = Field(
+        default=_env_int("RETENCION_DIAS_LEIDAS", 90), ge=1,
+        description="Antigüedad (por fecha_creacion) a partir de la cual se retiran las leídas. None = nunca"
+    )
+    dias_no_leidas: Optional[int] = Field(
+        default=_env_int("RETENCION_DIAS_NO_LEIDAS", 365), ge=1,
+        description="Antigüedad a partir de la cual se retiran las no leídas. None = nunca"
+    )
+    modo: Literal["archivar", "eliminar"] = Field(
+        default=os.getenv("RETENCION_MODO", "archivar"),  # type: ignore
+        description="archivar: mueve a notificaciones_archivo; eliminar: borra definitivamente"
+    )
+    # SQL Server escala a bloqueo de tabla a partir de ~5000 locks y admite 2100
+    # parámetros por sentencia: los lotes se mantienen por debajo de ambos límites.
+    tamano_lote: int = Field(default=_env_int("RETENCION_TAMANO_LOTE", 1000), ge=1, le=2000)
+    max_lotes: int = Field(default=_env_int("RETENCION_MAX_LOTES", 500), ge=1)
+    pausa_entre_lotes_ms: int = Field(default=_env_int("RETENCION_PAUSA_MS", 50), ge=0)
+
+
+class ResultadoRetencionDTO(BaseModel):
+    """Resumen de una ejecución de la política de retención"""
+    modo: str
+    lotes: int
+    filas_procesadas: int
+    completado: bool
+    duracion_segundos: float
@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+
+class InsercionParcial(Exception):
+    """
+    Con shards, parte de un insertar_lote quedó confirmada y parte falló:
+    `ids` tiene el id generado de cada fila, o None si no se insertó.
+    """
+
+    def __init__(self, ids: List[Optional[int]], causa: Exception):
+        super().__init__(str(causa) or type(causa).__name__)
+        self.ids = ids
+        self.causa = causa
@@ -0,0 +1,2 @@
+class NoSoportadoConShards(Exception):
+    """La operación lee tablas por empresa de la base primaria: no tiene sentido con SHARDS"""
@@ -0,0 +1,9 @@
+from .almacenes import AlmacenLimites, MemoriaLimites, RedisLimites
+from .limitador import ReglaLimite, Rechazo, Limitador, get_limitador, reglas_por_defecto
+from .middleware import LimitadorMiddleware
+
+__all__ = [
+    "AlmacenLimites", "MemoriaLimites", "RedisLimites",
+    "ReglaLimite", "Rechazo", "Limitador", "get_limitador", "reglas_por_defecto",
+    "LimitadorMiddleware",
+]
@@ -0,0 +1,87 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, List, Protocol
+
+
+class AlmacenLimites(Protocol):
+    """
+    Interfaz de almacenamiento de los contadores (token bucket por clave).
+    Una implementación compartida (Redis) aplica el mismo presupuesto a todos
+    los workers; la de memoria lo aplica por proceso.
+    """
+
+    def consumir(self, clave: str, capacidad: float, tasa: float, costo: float = 1) -> float:
+        """Descuenta `costo` tokens. Devuelve 0 si alcanzó, o los segundos hasta que alcance"""
+        ...
+
+
+class MemoriaLimites:
+    """Token buckets en proceso, acotados por número de claves (se descartan las menos usadas)"""
+
+    def __init__(self, max_claves: int = 100_000):
+        self.max_claves = max_claves
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, clave: str, capacidad: float, tasa: float, costo: float = 1) -> float:
+        ahora = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(clave)
+            if bucket is None:
+                bucket = self._buckets[clave] = [capacidad, ahora]
+                while len(self._buckets) > self.max_claves:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(clave)
+                bucket[0] = min(capacidad, bucket[0] + (ahora - bucket[1]) * tasa)
+                bucket[1] = ahora
+
+            if bucket[0] >= costo:
+                bucket[0] -= costo
+                return 0.0
+            return (costo - bucket[0]) / tasa
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Recarga y descuento atómicos en el servidor; la espera vuelve como texto
+# porque Redis trunca a entero los números que devuelve Lua
+_SCRIPT_TOKEN_BUCKET = """
+local capacidad = tonumber(ARGV[1])
+local tasa = tonumber(ARGV[2])
+local ahora = tonumber(ARGV[3])
+local costo = tonumber(ARGV[4])
+local datos = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(datos[1]) or capacidad
+local ultimo = tonumber(datos[2]) or ahora
+tokens = math.min(capacidad, tokens + math.max(0, ahora - ultimo) * tasa)
+local espera = 0
+if tokens >= costo then
+    tokens = tokens - costo
+else
+    espera = (costo - tokens) / tasa
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(ahora))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidad / tasa) + 1)
+return tostring(espera)
+"""
+
+
+class RedisLimites:
+    """
+    Adaptador sobre un cliente tipo Redis (redis.Redis o un fake con
+    eval(script, numkeys, *keys_y_args)). Usa la hora de pared del proceso:
+    los workers deben tener los relojes sincronizados.
+    """
+
+    def __init__(self, cliente: Any, prefijo: str = "notif:limite:"):
+        self.cliente = cliente
+        self.prefijo = prefijo
+
+    def consumir(self, clave: str, capacidad: float, tasa: float, costo: float = 1) -> float:
+        espera = self.cliente.eval(
+            _SCRIPT_TOKEN_BUCKET, 1, self.prefijo + clave, capacidad, tasa, time.time(), costo
+        )
+        return float(espera)
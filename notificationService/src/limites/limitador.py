@@ -0,0 +1,185 @@
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from ..config.entorno import cargar_entorno
+
+from .almacenes import AlmacenLimites, MemoriaLimites, RedisLimites
+
+cargar_entorno()
+
+
+class ReglaLimite:
+    """
+    Presupuesto de `peticiones` cada `segundos` para las rutas que coinciden con
+    `patron`, contado por IP del cliente o por el id capturado en el grupo
+    `por` del patrón (p. ej. el usuario o la empresa de la ruta).
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        patron: str,
+        peticiones: int,
+        segundos: float,
+        por: str = "ip",
+        metodos: Iterable[str] = ("GET",)
+    ):
+        if peticiones <= 0 or segundos <= 0:
+            raise ValueError(f"Límite '{nombre}': peticiones y segundos deben ser positivos")
+        self.nombre = nombre
+        self.patron = re.compile(patron)
+        self.peticiones = peticiones
+        self.segundos = segundos
+        self.por = por
+        self.metodos = frozenset(m.upper() for m in metodos)
+        if por != "ip" and por not in self.patron.groupindex:
+            raise ValueError(f"Límite '{nombre}': el patrón no tiene el grupo '{por}'")
+
+    @property
+    def tasa(self) -> float:
+        """Tokens recargados por segundo"""
+        return self.peticiones / self.segundos
+
+    def clave(self, metodo: str, ruta: str, ip: str) -> Optional[str]:
+        """Clave del contador para la petición, o None si la regla no aplica"""
+        if metodo not in self.metodos:
+            return None
+        coincidencia = self.patron.match(ruta)
+        if coincidencia is None:
+            return None
+        sujeto = ip if self.por == "ip" else coincidencia.group(self.por)
+        return f"{self.nombre}:{sujeto}"
+
+
+class Rechazo:
+    """Petición rechazada por una regla: cuánto esperar antes de reintentar"""
+
+    def __init__(self, regla: ReglaLimite, espera: float):
+        self.regla = regla
+        self.espera = espera
+
+    @property
+    def retry_after(self) -> int:
+        # Retry-After solo admite segundos enteros: se redondea hacia arriba
+        return max(1, math.ceil(self.espera))
+
+
+class Limitador:
+    """
+    Evalúa las reglas que aplican a una petición, en orden, y la rechaza con la
+    primera que no tenga presupuesto. Si el almacén falla la petición pasa:
+    el limitador protege la BD, no debe tirar el servicio.
+    """
+
+    def __init__(self, almacen: AlmacenLimites, reglas: List[ReglaLimite], confiar_proxy: bool = False):
+        self.almacen = almacen
+        self.reglas = list(reglas)
+        self.confiar_proxy = confiar_proxy
+        self._lock = threading.Lock()
+        self._metricas: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"permitidas": 0, "rechazadas": 0, "errores": 0}
+        )
+
+    def ip_cliente(self, headers: Mapping[str, str], cliente: Optional[Tuple[str, int]]) -> str:
+        """IP del cliente; detrás de un proxy de confianza, la primera de X-Forwarded-For"""
+        if self.confiar_proxy:
+            reenviada = headers.get("x-forwarded-for")
+            if reenviada:
+                return reenviada.split(",")[0].strip()
+        return cliente[0] if cliente else "desconocida"
+
+    def evaluar(self, metodo: str, ruta: str, ip: str) -> Optional[Rechazo]:
+        for regla in self.reglas:
+            clave = regla.clave(metodo, ruta, ip)
+            if clave is None:
+                continue
+            try:
+                espera = self.almacen.consumir(clave, regla.peticiones, regla.tasa)
+            except Exception as e:
+                print(f"⚠️  Limitador no disponible ({regla.nombre}): {e}")
+                self._contar(regla.nombre, "errores")
+                continue
+            if espera > 0:
+                self._contar(regla.nombre, "rechazadas")
+                return Rechazo(regla, espera)
+            self._contar(regla.nombre, "permitidas")
+        return None
+
+    def _contar(self, regla: str, campo: str) -> None:
+        with self._lock:
+            self._metricas[regla][campo] += 1
+
+    def metricas(self) -> Dict[str, Dict]:
+        with self._lock:
+            contadores = {nombre: dict(valores) for nombre, valores in self._metricas.items()}
+        return {
+            regla.nombre: {
+                "presupuesto": f"{regla.peticiones}/{regla.segundos:g}s",
+                "por": regla.por,
+                **contadores.get(regla.nombre, {"permitidas": 0, "rechazadas": 0, "errores": 0})
+            }
+            for regla in self.reglas
+        }
+
+
+def parsear_presupuesto(valor: str) -> Tuple[int, float]:
+    """'60/60' -> (60 peticiones, 60 segundos)"""
+    peticiones, separador, segundos = valor.partition("/")
+    if not separador:
+        raise ValueError(f"Presupuesto de límite inválido '{valor}': se esperaba 'peticiones/segundos'")
+    return int(peticiones), float(segundos)
+
+
+def reglas_por_defecto() -> List[ReglaLimite]:
+    """
+    Reglas de lectura, configurables con LIMITE_<NOMBRE>="peticiones/segundos".
+    Las de usuario y empresa van primero: un cliente que martilla una bandeja
+    agota su presupuesto sin consumir el de su IP.
+    """
+    definiciones = [
+        ("usuario", r"^/notificaciones/(?P<usuario>[^/]+)/user/", "usuario", "60/60"),
+        ("empresa", r"^/notificaciones/(?P<empresa>[^/]+)/company/", "empresa", "120/60"),
+        ("ip_notificaciones", r"^/notificaciones(/|$)", "ip", "300/60"),
+        ("ip_analytics", r"^/analytics(/|$)", "ip", "120/60"),
+        ("ip_exportaciones", r"^/exportaciones(/|$)", "ip", "10/60"),
+    ]
+    reglas = []
+    for nombre, patron, por, presupuesto in definiciones:
+        peticiones, segundos = parsear_presupuesto(os.getenv(f"LIMITE_{nombre.upper()}", presupuesto))
+        reglas.append(ReglaLimite(nombre, patron, peticiones, segundos, por=por))
+    return reglas
+
+
+def _crear_almacen() -> AlmacenLimites:
+    tipo = os.getenv("LIMITES_BACKEND", "memoria").lower()
+
+    if tipo == "redis":
+        try:
+            import redis  # dependencia opcional
+        except ImportError as e:
+            raise RuntimeError("LIMITES_BACKEND=redis requiere el paquete 'redis'") from e
+        cliente = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        return RedisLimites(cliente, prefijo=os.getenv("LIMITES_PREFIJO", "notif:limite:"))
+
+    return MemoriaLimites(max_claves=int(os.getenv("LIMITES_MAX_CLAVES", "100000")))
+
+
+_limitador: Optional[Limitador] = None
+_limitador_lock = threading.Lock()
+
+
+def get_limitador() -> Limitador:
+    """Limitador compartido del proceso (se crea en el primer uso; LIMITES_HABILITADOS=false lo deja sin reglas)"""
+    global _limitador
+    if _limitador is None:
+        with _limitador_lock:
+            if _limitador is None:
+                _limitador = Limitador(
+                    _crear_almacen(),
+                    reglas_por_defecto() if os.getenv("LIMITES_HABILITADOS", "true").lower() == "true" else [],
+                    confiar_proxy=os.getenv("LIMITES_CONFIAR_PROXY", "false").lower() == "true"
+                )
+    return _limitador
@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .almacenes import MemoriaLimites
+from .limitador import Limitador, get_limitador
+
+
+class LimitadorMiddleware:
+    """
+    Middleware ASGI que aplica los límites antes de llegar a la ruta: una
+    petición rechazada no abre sesión ni consulta la BD. Responde 429 con
+    Retry-After (segundos hasta que la regla vuelva a tener presupuesto).
+    """
+
+    def __init__(self, app: ASGIApp, limitador: Optional[Limitador] = None):
+        self.app = app
+        self._limitador = limitador
+
+    @property
+    def limitador(self) -> Limitador:
+        if self._limitador is None:
+            self._limitador = get_limitador()
+        return self._limitador
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limitador = self.limitador
+        ip = limitador.ip_cliente(Headers(scope=scope), scope.get("client"))
+        argumentos = (scope["method"], scope["path"], ip)
+        if isinstance(limitador.almacen, MemoriaLimites):
+            rechazo = limitador.evaluar(*argumentos)
+        else:
+            # Un almacén remoto hace I/O bloqueante: fuera del event loop
+            rechazo = await run_in_threadpool(limitador.evaluar, *argumentos)
+
+        if rechazo is None:
+            await self.app(scope, receive, send)
+            return
+
+        respuesta = JSONResponse(
+            {"detail": f"Demasiadas peticiones (límite '{rechazo.regla.nombre}'). Reintentar en {rechazo.retry_after} s."},
+            status_code=429,
+            headers={"Retry-After": str(rechazo.retry_after)}
+        )
+        await respuesta(scope, receive, send)
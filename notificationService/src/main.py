@@ -1,15 +1,65 @@
-from fastapi import FastAPI
-from sqlmodel import SQLModel
-from .config.db import engine
-from .models import Notificacion
+import os
+from contextlib import asynccontextmanager
+import anyio
+from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
+from .config.db import crear_engines, cerrar_engines
+from .config.db_synapse import get_synapse_engine, cerrar_synapse_engine
+from .config.shards import get_shard_router, cerrar_shard_router
+from .exception.no_soportado_con_shards import NoSoportadoConShards
 from .routes.notificacion_router import router as router_noty
 from .routes.analytic_router import router as router_analytic
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from .routes.postulacion_notificacion_router import router as postulacion_router
 from .routes.oferta_notificacion_router import router as oferta_router
+from .routes.mantenimiento_router import router as mantenimiento_router
+from .routes.metricas_router import router as metricas_router
+from .routes.analytics_notificaciones_router import router as analytics_notificaciones_router
+from .routes.exportacion_router import router as exportacion_router
+from .limites import LimitadorMiddleware
+from .routes.compresion import CompresionMiddleware, opciones_compresion
+from .services.catalogo_skills import get_catalogo_skills
+from .services.cola_escritura import cerrar_cola_escritura
+from .services.rollup_notificaciones_service import iniciar_rollup_periodico, detener_rollup_periodico
 
 
-app = FastAPI(title="Notification-Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines (y driver ODBC) por worker al arrancar, no al importar la app: el import
+    # queda más liviano y con gunicorn --preload los pools no se comparten entre forks
+    crear_engines()
+    get_synapse_engine()
+    # Hilos para los endpoints síncronos (AnyIO usa 40 por defecto)
+    if os.getenv("THREADPOOL_HILOS"):
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.environ["THREADPOOL_HILOS"])
+    shards = get_shard_router()
+    if shards:
+        # Cada shard genera ids de notificación en su propio rango
+        await run_in_threadpool(shards.preparar_identidades)
+    # Catálogo de skills compilado antes de atender requests (si falla, queda la semilla)
+    await run_in_threadpool(get_catalogo_skills().recargar)
+    iniciar_rollup_periodico()
+    yield
+    detener_rollup_periodico()
+    # Escribir lo que quede en la cola antes de apagar
+    await run_in_threadpool(cerrar_cola_escritura, 30)
+    cerrar_shard_router()
+    cerrar_engines()
+    cerrar_synapse_engine()
+
+
+app = FastAPI(title="Notification-Service", lifespan=lifespan)
+# Límites por usuario, empresa e IP antes de tocar la BD (ver limites.reglas_por_defecto)
+app.add_middleware(LimitadorMiddleware)
+# Compresión gzip/brotli de respuestas grandes (listados); la más externa
+app.add_middleware(CompresionMiddleware, **opciones_compresion())
+
+
+@app.exception_handler(NoSoportadoConShards)
+async def no_soportado_con_shards(request: Request, exc: NoSoportadoConShards):
+    # Retención, rollups, exportaciones y reconstrucción de estadísticas aún no recorren los shards
+    return JSONResponse(status_code=status.HTTP_501_NOT_IMPLEMENTED, content={"detail": str(exc)})
+
 
 @app.get("/", response_class=HTMLResponse)
 def home():
@@ -53,3 +103,7 @@ app.include_router(postulacion_router)
 app.include_router(oferta_router)
 app.include_router(router_noty)
 app.include_router(router_analytic)
+app.include_router(mantenimiento_router)
+app.include_router(metricas_router)
+app.include_router(analytics_notificaciones_router)
+app.include_router(exportacion_router)
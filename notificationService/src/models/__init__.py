@@ -1,5 +1,16 @@
-from .notificacion import Notificacion
+from .notificacion import Notificacion, PrioridadNotificacion
 from .convocatoria_snapshot import ConvocatoriaSnapshot
-from .notificacionInt import NotificacionInt
+from .notificacion_archivo import NotificacionArchivo
+from .skill_catalogo import SkillCatalogo
+from .oferta_skills import OfertaSkills
+from .estadisticas import EstadisticaContador, TopOfertaNotificada, SnapshotsPorEmpresa
+from .notificacion_rollup import NotificacionRollupHora, NotificacionRollupLectura, RollupWatermark
+from .usuario_shard import UsuarioShard
 
-__all__ = ["Notificacion", "ConvocatoriaSnapshot", "NotificacionInt"]
\ No newline at end of file
+__all__ = [
+    "Notificacion", "PrioridadNotificacion", "ConvocatoriaSnapshot", "NotificacionArchivo",
+    "SkillCatalogo", "OfertaSkills",
+    "EstadisticaContador", "TopOfertaNotificada", "SnapshotsPorEmpresa",
+    "NotificacionRollupHora", "NotificacionRollupLectura", "RollupWatermark",
+    "UsuarioShard",
+]
@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class EstadisticaContador(SQLModel, table=True):
+    """
+    Contadores agregados mantenidos en la misma transacción que las escrituras
+    de origen (ofertas_notificadas, convocatoria_snapshots).
+    """
+    __tablename__: str = "estadisticas_contadores"
+
+    clave: str = Field(primary_key=True, max_length=100)
+    valor: int = Field(default=0)
+    fecha_actualizacion: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TopOfertaNotificada(SQLModel, table=True):
+    """Top-K acotado de ofertas por usuarios notificados (como máximo TOP_K filas)"""
+    __tablename__: str = "estadisticas_top_ofertas"
+
+    id_oferta: int = Field(primary_key=True)
+    titulo: str = Field(nullable=False)
+    usuarios_notificados: int = Field(default=0, index=True)
+
+
+class SnapshotsPorEmpresa(SQLModel, table=True):
+    """Cantidad de snapshots por empresa; el índice sirve el top por empresa sin GROUP BY"""
+    __tablename__: str = "estadisticas_snapshots_empresa"
+
+    id_empresa: str = Field(primary_key=True, max_length=50)  # UUID como VARCHAR(50)
+    convocatorias: int = Field(default=0, index=True)
@@ -1,13 +1,36 @@
 # notificationService/src/models/notificacion.py
 from __future__ import annotations
+from enum import IntEnum
 from typing import Optional
 from datetime import datetime
 
 from sqlmodel import SQLModel, Field
 
 
+class PrioridadNotificacion(IntEnum):
+    """Valores de `notificaciones.prioridad` (columna INT)"""
+    BAJA = 1
+    MEDIA = 2
+    ALTA = 3
+
+    @classmethod
+    def desde_valor(cls, valor: Optional[int]) -> Optional["PrioridadNotificacion"]:
+        """Vista enum de un valor de la columna; None si es nulo o no está en el enum"""
+        try:
+            return cls(valor) if valor is not None else None
+        except ValueError:
+            return None
+
+
 class Notificacion(SQLModel, table=True):
+    """
+    Único mapeo de la tabla `notificaciones`, para lecturas y escrituras.
+    Los listados no instancian este modelo: leen filas planas (ver
+    COLUMNAS_RESPUESTA en notificacion_repo).
+    """
     __tablename__:str = "notificaciones"
+    # Solo afecta a SQLite: permite fijar el inicio de la identidad por shard (ver ShardRouter)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id_notificacion: int | None = Field(default=None, primary_key=True)
 
@@ -19,9 +42,13 @@ class Notificacion(SQLModel, table=True):
     mensaje: str
 
     id_oferta: int = Field(nullable=False)
-    prioridad: str | None = None
+    prioridad: int | None = None  # Ver PrioridadNotificacion
     datos_adicionales: str | None = None
 
     leida: bool = Field(default=False) 
-    fecha_lectura: datetime | None = None
-    fecha_creacion: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    fecha_lectura: datetime | None = None  # UTC, como fecha_creacion
+    fecha_creacion: datetime = Field(default_factory=datetime.utcnow)
+
+    @property
+    def nivel_prioridad(self) -> Optional[PrioridadNotificacion]:
+        return PrioridadNotificacion.desde_valor(self.prioridad)
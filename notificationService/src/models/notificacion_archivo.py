@@ -0,0 +1,30 @@
+# notificationService/src/models/notificacion_archivo.py
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class NotificacionArchivo(SQLModel, table=True):
+    """
+    Histórico de notificaciones retiradas de `notificaciones` por la política de retención.
+    Conserva el id original para poder rastrear cualquier notificación archivada.
+    """
+    __tablename__: str = "notificaciones_archivo"
+
+    id_notificacion: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+
+    id_usuario: str = Field(nullable=False, max_length=50)  # UUID como VARCHAR(50)
+    id_empresa: str = Field(nullable=False, max_length=50)  # UUID como VARCHAR(50)
+
+    tipo_notificacion: str = Field(nullable=False)
+    asunto: str = Field(nullable=False)
+    mensaje: str
+
+    id_oferta: int = Field(nullable=False)
+    prioridad: int | None = None
+    datos_adicionales: str | None = None
+
+    leida: bool = Field(default=False)
+    fecha_lectura: datetime | None = None
+    fecha_creacion: datetime = Field(nullable=False, index=True)
+    fecha_archivado: datetime = Field(default_factory=datetime.utcnow)
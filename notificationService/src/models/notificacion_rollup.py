@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class NotificacionRollupHora(SQLModel, table=True):
+    """
+    Volúmenes por hora de creación y tipo. `leidas` cuenta las notificaciones
+    de esa cohorte (misma hora de creación) que ya fueron leídas.
+    """
+    __tablename__: str = "notificaciones_rollup_hora"
+
+    hora: datetime = Field(primary_key=True)
+    tipo_notificacion: str = Field(primary_key=True, max_length=100)
+    creadas: int = Field(default=0)
+    leidas: int = Field(default=0)
+
+
+class NotificacionRollupLectura(SQLModel, table=True):
+    """
+    Histograma del tiempo hasta la lectura por hora de creación y tipo.
+    `limite_segundos` es el borde superior del bucket (ver BUCKETS_SEGUNDOS).
+    """
+    __tablename__: str = "notificaciones_rollup_lectura"
+
+    hora: datetime = Field(primary_key=True)
+    tipo_notificacion: str = Field(primary_key=True, max_length=100)
+    limite_segundos: int = Field(primary_key=True)
+    cantidad: int = Field(default=0)
+
+
+class RollupWatermark(SQLModel, table=True):
+    """Hasta dónde procesó cada rollup: id para creaciones, (fecha_lectura, id) para lecturas"""
+    __tablename__: str = "rollup_watermarks"
+
+    nombre: str = Field(primary_key=True, max_length=50)
+    ultimo_id: int = Field(default=0)
+    ultima_fecha: datetime | None = None
+    fecha_actualizacion: datetime = Field(default_factory=datetime.utcnow)
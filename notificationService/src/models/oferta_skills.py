@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class OfertaSkills(SQLModel, table=True):
+    """
+    Skills ya extraídas de cada oferta. Mientras el texto de requirements
+    (hash) y la versión del catálogo no cambien, no se vuelven a extraer.
+    """
+    __tablename__: str = "oferta_skills"
+
+    id_oferta: int = Field(primary_key=True)
+    hash_requirements: str = Field(max_length=64)  # sha256 del texto de requirements
+    version_catalogo: str = Field(max_length=40)
+    skills: str = Field(default="")  # Nombres canónicos separados por "|" ("" = sin skills reconocibles)
+    fecha_extraccion: datetime = Field(default_factory=datetime.utcnow)
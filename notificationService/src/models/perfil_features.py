@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class PerfilFeatures(SQLModel, table=True):
+    """
+    Copia local de los atributos de perfil usados para puntuar la relevancia
+    oferta-perfil sin consultar el API de perfiles en cada procesamiento.
+    """
+    __tablename__: str = "perfiles_features"
+
+    id_usuario: str = Field(primary_key=True, max_length=50)  # UUID como VARCHAR(50)
+    skills: str = Field(default="")  # Nombres de skills separados por "|"
+    modalidad: str | None = Field(default=None, max_length=50)
+    ubicacion: str | None = Field(default=None, max_length=100)
+    anios_experiencia: int = Field(default=0)
+    salario_esperado: int | None = None
+    fecha_actualizacion: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class SkillCatalogo(SQLModel, table=True):
+    """
+    Catálogo de skills reconocidas en los requirements de las ofertas.
+    Reemplaza la lista fija del código: se edita en la tabla y se recarga en caliente.
+    """
+    __tablename__: str = "skills_catalogo"
+
+    id_skill: int | None = Field(default=None, primary_key=True)
+    nombre: str = Field(max_length=150, unique=True)  # Nombre canónico (el que se guarda/consulta)
+    sinonimos: str = Field(default="")  # Alias separados por "|", p. ej. "python|py"
+    activa: bool = Field(default=True)
+    fecha_actualizacion: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+
+
+class UsuarioShard(SQLModel, table=True):
+    """
+    Directorio de shards por usuario (solo con SHARDS configurado). Las filas de
+    notificaciones viven en el shard de su id_empresa; esta tabla, en la base
+    primaria, dice en qué shards tiene filas cada usuario para leer solo esos.
+    """
+    __tablename__: str = "usuarios_shards"
+
+    id_usuario: str = Field(primary_key=True, max_length=50)
+    shard: str = Field(primary_key=True, max_length=50)
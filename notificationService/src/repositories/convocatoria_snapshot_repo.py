@@ -1,13 +1,25 @@
-from sqlmodel import Session, select
-from typing import List, Dict, Optional
+from sqlmodel import Session, select, col, delete
+from typing import List, Dict, Optional, Set, Iterable, Tuple
 from datetime import datetime
 from ..models.convocatoria_snapshot import ConvocatoriaSnapshot
+from ..config.shards import ShardRouter, get_shard_router
+from .estadisticas_repo import EstadisticasRepository
+
+# SQL Server admite 2100 parámetros por sentencia; se deja margen
+MAX_PARAMETROS_SQL = 2000
 
 class ConvocatoriaSnapshotRepository:
-    """Repositorio para gestionar snapshots de conteos de postulaciones"""
+    """
+    Repositorio para gestionar snapshots de conteos de postulaciones.
+
+    Con shards, cada snapshot vive en el shard de su id_empresa; `session` queda
+    para las estadísticas precalculadas, que se actualizan en la base primaria
+    después de confirmar en el shard.
+    """
 
-    def __init__(self, session:Session) -> None:
+    def __init__(self, session:Session, shards: Optional[ShardRouter] = None) -> None:
         self.session = session
+        self.shards = shards or get_shard_router()
 
     def get_snapshot(self, id_convocatoria:int) -> Optional[ConvocatoriaSnapshot]:
         """
@@ -23,18 +35,32 @@ class ConvocatoriaSnapshotRepository:
             ConvocatoriaSnapshot.id_convocatoria == id_convocatoria
         )
 
+        if self.shards:
+            encontrados = self.shards.scatter(lambda s: s.exec(stmt).first())
+            return next((e for e in encontrados if e is not None), None)
         return self.session.exec(stmt).first()
     
     def get_all_snapshots(self) -> List[ConvocatoriaSnapshot]:
         """Obtiene todos los snapshots guardados"""
         stmt = select(ConvocatoriaSnapshot)
+        if self.shards:
+            return [s for snapshots in self.shards.scatter(lambda s: s.exec(stmt).all()) for s in snapshots]
         return list(self.session.exec(stmt).all())
     
+    def get_ids_convocatorias(self) -> Set[int]:
+        """IDs de convocatoria con snapshot (solo la columna, sin instanciar el modelo)"""
+        stmt = select(col(ConvocatoriaSnapshot.id_convocatoria))
+        if self.shards:
+            return set().union(*self.shards.scatter(lambda s: s.exec(stmt).all()))
+        return set(self.session.exec(stmt).all())
+    
     def get_snapshots_por_empresa(self, id_empresa: str) -> List[ConvocatoriaSnapshot]:
         """Obtiene todos los snapshots de una empresa"""
         stmt = select(ConvocatoriaSnapshot).where(
             ConvocatoriaSnapshot.id_empresa == id_empresa
         )
+        if self.shards:
+            return self.shards.en_empresa(id_empresa, lambda s: list(s.exec(stmt).all()))
         return list(self.session.exec(stmt).all())
     
     def crear_o_actualizar_sanpshot(
@@ -56,13 +82,37 @@ class ConvocatoriaSnapshotRepository:
         Returns:
             Snapshot creado o actualizado
         """
-        snapshot = self.get_snapshot(id_convocatoria)
+        if self.shards:
+            snapshot, creado = self.shards.en_empresa(
+                id_empresa,
+                lambda s: self._guardar_snapshot(s, id_empresa, id_convocatoria, titulo, total_postulados)
+            )
+            if creado:
+                EstadisticasRepository(self.session).registrar_snapshots(creados=[id_empresa])
+                self.session.commit()
+            return snapshot
+
+        snapshot, _ = self._guardar_snapshot(self.session, id_empresa, id_convocatoria, titulo, total_postulados)
+        return snapshot
+
+    def _guardar_snapshot(
+            self,
+            session: Session,
+            id_empresa: str,
+            id_convocatoria: int,
+            titulo: str,
+            total_postulados: int
+    ) -> Tuple[ConvocatoriaSnapshot, bool]:
+        snapshot = session.exec(
+            select(ConvocatoriaSnapshot).where(ConvocatoriaSnapshot.id_convocatoria == id_convocatoria)
+        ).first()
+        creado = snapshot is None
 
         if snapshot:
             snapshot.total_postulados = total_postulados
             snapshot.titulo = titulo 
             snapshot.ultima_actualizacion = datetime.utcnow()
-            self.session.add(snapshot)
+            session.add(snapshot)
         else:
             snapshot = ConvocatoriaSnapshot(
                 id_empresa=id_empresa,
@@ -70,11 +120,14 @@ class ConvocatoriaSnapshotRepository:
                 titulo = titulo,
                 total_postulados=total_postulados
             )
-            self.session.add(snapshot)
+            session.add(snapshot)
+            if session is self.session:
+                # Estadísticas precalculadas en la misma transacción
+                EstadisticasRepository(session).registrar_snapshots(creados=[id_empresa])
         
-        self.session.commit()
-        self.session.refresh(snapshot)
-        return snapshot
+        session.commit()
+        session.refresh(snapshot)
+        return snapshot, creado
     
     def actualizar_multiples_snapshots(
             self,
@@ -112,10 +165,75 @@ class ConvocatoriaSnapshotRepository:
         Returns:
             True si se eliminó, False si no exisitía
         """
+        if self.shards:
+            empresas = self._eliminar_en_shards([id_convocatoria])
+            return bool(empresas)
+
         snapshot = self.get_snapshot(id_convocatoria)
 
         if snapshot:
             self.session.delete(snapshot)
+            EstadisticasRepository(self.session).registrar_snapshots(eliminados=[snapshot.id_empresa])
             self.session.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def eliminar_inactivos(
+            self,
+            ids_activos: Iterable[int],
+            ids_existentes: Optional[Set[int]] = None,
+            dry_run: bool = False
+    ) -> List[int]:
+        """
+        Elimina los snapshots de convocatorias que no están en `ids_activos`
+        con DELETEs por lotes de hasta MAX_PARAMETROS_SQL ids y un solo commit.
+
+        Args:
+            ids_activos: IDs de convocatorias activas
+            ids_existentes: IDs con snapshot, si el llamador ya los tiene (evita la consulta)
+            dry_run: Solo calcular qué se eliminaría
+
+        Returns:
+            IDs de convocatoria eliminados (o que se eliminarían)
+        """
+        if ids_existentes is None:
+            ids_existentes = self.get_ids_convocatorias()
+        inactivos = sorted(ids_existentes - set(ids_activos))
+
+        if dry_run or not inactivos:
+            return inactivos
+
+        if self.shards:
+            self._eliminar_en_shards(inactivos)
+            return inactivos
+
+        empresas = self._eliminar_por_ids(self.session, inactivos)
+        # Estadísticas precalculadas en la misma transacción
+        EstadisticasRepository(self.session).registrar_snapshots(eliminados=empresas)
+        self.session.commit()
+        return inactivos
+
+    def _eliminar_por_ids(self, session: Session, inactivos: List[int]) -> List[str]:
+        """DELETE por lotes de id_convocatoria; devuelve la empresa de cada fila eliminada (sin confirmar)"""
+        empresas: List[str] = []
+        for inicio in range(0, len(inactivos), MAX_PARAMETROS_SQL):
+            stmt = (
+                delete(ConvocatoriaSnapshot.__table__)  # type: ignore
+                .where(col(ConvocatoriaSnapshot.id_convocatoria).in_(inactivos[inicio:inicio + MAX_PARAMETROS_SQL]))
+                .returning(col(ConvocatoriaSnapshot.id_empresa))
+            )
+            empresas.extend(session.execute(stmt).scalars().all())
+        return empresas
+
+    def _eliminar_en_shards(self, ids_convocatoria: List[int]) -> List[str]:
+        """Elimina en todos los shards; las estadísticas se actualizan después, en la primaria"""
+        def eliminar(session: Session) -> List[str]:
+            empresas = self._eliminar_por_ids(session, ids_convocatoria)
+            session.commit()
+            return empresas
+
+        empresas = [e for por_shard in self.shards.scatter(eliminar) for e in por_shard]  # type: ignore
+        if empresas:
+            EstadisticasRepository(self.session).registrar_snapshots(eliminados=empresas)
+            self.session.commit()
+        return empresas
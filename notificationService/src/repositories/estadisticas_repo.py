@@ -0,0 +1,204 @@
+from sqlmodel import Session, select, update, delete, insert, func, col
+from typing import Any, Dict, Iterable, List
+from collections import Counter
+from datetime import datetime
+from ..models.estadisticas import EstadisticaContador, TopOfertaNotificada, SnapshotsPorEmpresa
+from ..models.oferta_notificada import OfertaNotificada
+from ..models.convocatoria_snapshot import ConvocatoriaSnapshot
+from ..config.shards import exigir_sin_shards
+
+# Tamaño del top de ofertas que se mantiene y se sirve
+TOP_K = 10
+
+# Claves de estadisticas_contadores
+OFERTAS_NOTIFICADAS = "ofertas_notificadas.total"
+USUARIOS_NOTIFICADOS = "ofertas_notificadas.usuarios"
+SNAPSHOTS = "convocatoria_snapshots.total"
+INICIALIZADAS = "estadisticas.inicializadas"
+
+
+class EstadisticasRepository:
+    """
+    Agregados precalculados para los endpoints de estadísticas.
+
+    Los métodos `registrar_*` no confirman: se llaman desde el repositorio de
+    origen antes de su commit, así el agregado y la fila quedan en la misma
+    transacción. `reconstruir` los recalcula desde cero.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    # MANTENIMIENTO INCREMENTAL
+
+    def _incrementar(self, clave: str, delta: int) -> None:
+        if not delta:
+            return
+        resultado = self.session.exec(  # type: ignore
+            update(EstadisticaContador)
+            .where(col(EstadisticaContador.clave) == clave)
+            .values(valor=EstadisticaContador.valor + delta, fecha_actualizacion=datetime.utcnow())
+        )
+        if not resultado.rowcount:
+            self.session.exec(insert(EstadisticaContador).values(clave=clave, valor=delta))  # type: ignore
+
+    def _incrementar_empresas(self, deltas: Dict[str, int]) -> None:
+        for id_empresa, delta in deltas.items():
+            if not delta:
+                continue
+            resultado = self.session.exec(  # type: ignore
+                update(SnapshotsPorEmpresa)
+                .where(col(SnapshotsPorEmpresa.id_empresa) == id_empresa)
+                .values(convocatorias=SnapshotsPorEmpresa.convocatorias + delta)
+            )
+            if not resultado.rowcount:
+                self.session.exec(  # type: ignore
+                    insert(SnapshotsPorEmpresa).values(id_empresa=id_empresa, convocatorias=max(delta, 0))
+                )
+
+    def registrar_oferta_notificada(self, id_oferta: int, titulo: str, usuarios_notificados: int) -> None:
+        """Suma la oferta a los totales y la ubica en el top-K si corresponde"""
+        self._incrementar(OFERTAS_NOTIFICADAS, 1)
+        self._incrementar(USUARIOS_NOTIFICADOS, usuarios_notificados)
+
+        # ofertas_notificadas solo recibe inserciones, así que el top-K acotado es exacto.
+        # Se lee el top entero (a lo sumo TOP_K filas) con UPDLOCK + HOLDLOCK: el bloqueo
+        # de rango dura hasta el commit, así dos ofertas concurrentes no ven el mismo
+        # mínimo ni el mismo hueco y el top no pierde ni excede filas
+        top = self.session.exec(
+            select(TopOfertaNotificada).with_hint(TopOfertaNotificada, "WITH (UPDLOCK, HOLDLOCK)", "mssql")
+        ).all()
+        if len(top) >= TOP_K:
+            minimo = min(top, key=lambda t: (t.usuarios_notificados, -t.id_oferta))
+            if usuarios_notificados <= minimo.usuarios_notificados:
+                return
+            self.session.delete(minimo)
+        self.session.add(TopOfertaNotificada(
+            id_oferta=id_oferta,
+            titulo=titulo,
+            usuarios_notificados=usuarios_notificados
+        ))
+
+    def registrar_snapshots(self, creados: Iterable[str] = (), eliminados: Iterable[str] = ()) -> None:
+        """Ajusta los conteos con los id_empresa de los snapshots creados y eliminados"""
+        deltas: Counter = Counter(creados)
+        deltas.subtract(Counter(eliminados))
+        self._incrementar(SNAPSHOTS, sum(deltas.values()))
+        self._incrementar_empresas(dict(deltas))
+
+    # LECTURA (O(K): claves primarias y top acotado)
+
+    def inicializadas(self) -> bool:
+        return self.session.get(EstadisticaContador, INICIALIZADAS) is not None
+
+    def _contador(self, clave: str) -> int:
+        contador = self.session.get(EstadisticaContador, clave)
+        return contador.valor if contador else 0
+
+    def get_estadisticas_ofertas(self) -> Dict[str, Any]:
+        top = self.session.exec(
+            select(
+                col(TopOfertaNotificada.id_oferta),
+                col(TopOfertaNotificada.titulo),
+                col(TopOfertaNotificada.usuarios_notificados)
+            )
+            .order_by(col(TopOfertaNotificada.usuarios_notificados).desc())
+            .limit(TOP_K)
+        ).all()
+        return {
+            "total_ofertas_notificadas": self._contador(OFERTAS_NOTIFICADAS),
+            "total_usuarios_notificados": self._contador(USUARIOS_NOTIFICADOS),
+            "top_10_ofertas": [
+                {"id_oferta": row[0], "titulo": row[1], "usuarios_notificados": row[2]}
+                for row in top
+            ]
+        }
+
+    def get_estadisticas_snapshots(self, limite: int = 10) -> Dict[str, Any]:
+        por_empresa = self.session.exec(
+            select(col(SnapshotsPorEmpresa.id_empresa), col(SnapshotsPorEmpresa.convocatorias))
+            .where(col(SnapshotsPorEmpresa.convocatorias) > 0)
+            .order_by(col(SnapshotsPorEmpresa.convocatorias).desc())
+            .limit(limite)
+        ).all()
+        return {
+            "total_snapshots": self._contador(SNAPSHOTS),
+            "top_empresas": [
+                {"id_empresa": row[0], "convocatorias_activas": row[1]}
+                for row in por_empresa
+            ]
+        }
+
+    # CÁLCULO DESDE LAS TABLAS DE ORIGEN
+
+    def calcular_estadisticas_ofertas(self) -> Dict[str, Any]:
+        """Estadísticas de ofertas calculadas sobre ofertas_notificadas (recorre la tabla)"""
+        total = self.session.exec(select(func.count()).select_from(OfertaNotificada)).one()
+        total_usuarios = self.session.exec(
+            select(func.sum(col(OfertaNotificada.usuarios_notificados)))
+        ).one() or 0
+        top = self.session.exec(
+            select(
+                col(OfertaNotificada.id_oferta),
+                col(OfertaNotificada.titulo),
+                col(OfertaNotificada.usuarios_notificados)
+            )
+            .order_by(col(OfertaNotificada.usuarios_notificados).desc())
+            .limit(TOP_K)
+        ).all()
+        return {
+            "total_ofertas_notificadas": total,
+            "total_usuarios_notificados": total_usuarios,
+            "top_10_ofertas": [
+                {"id_oferta": row[0], "titulo": row[1], "usuarios_notificados": row[2]}
+                for row in top
+            ]
+        }
+
+    def _calcular_por_empresa(self) -> List[Any]:
+        return list(self.session.exec(
+            select(col(ConvocatoriaSnapshot.id_empresa), func.count().label('total'))
+            .select_from(ConvocatoriaSnapshot)
+            .group_by(col(ConvocatoriaSnapshot.id_empresa))
+            .order_by(func.count().desc())
+        ).all())
+
+    def calcular_estadisticas_snapshots(self, limite: int = 10) -> Dict[str, Any]:
+        """Estadísticas de snapshots calculadas sobre convocatoria_snapshots (GROUP BY)"""
+        total = self.session.exec(select(func.count()).select_from(ConvocatoriaSnapshot)).one()
+        return {
+            "total_snapshots": total,
+            "top_empresas": [
+                {"id_empresa": row[0], "convocatorias_activas": row[1]}
+                for row in self._calcular_por_empresa()[:limite]
+            ]
+        }
+
+    def reconstruir(self) -> None:
+        """Recalcula todos los agregados desde las tablas de origen en una transacción"""
+        exigir_sin_shards("La reconstrucción de estadísticas")
+        ofertas = self.calcular_estadisticas_ofertas()
+        por_empresa = self._calcular_por_empresa()
+        total_snapshots = sum(row[1] for row in por_empresa)
+
+        self.session.exec(delete(EstadisticaContador))  # type: ignore
+        self.session.exec(delete(TopOfertaNotificada))  # type: ignore
+        self.session.exec(delete(SnapshotsPorEmpresa))  # type: ignore
+
+        ahora = datetime.utcnow()
+        valores = {
+            OFERTAS_NOTIFICADAS: ofertas["total_ofertas_notificadas"],
+            USUARIOS_NOTIFICADOS: ofertas["total_usuarios_notificados"],
+            SNAPSHOTS: total_snapshots,
+            INICIALIZADAS: 1,
+        }
+        self.session.add_all([
+            EstadisticaContador(clave=clave, valor=valor, fecha_actualizacion=ahora)
+            for clave, valor in valores.items()
+        ])
+        self.session.add_all([TopOfertaNotificada(**o) for o in ofertas["top_10_ofertas"]])
+        self.session.add_all([
+            SnapshotsPorEmpresa(id_empresa=id_empresa, convocatorias=total)
+            for id_empresa, total in por_empresa
+        ])
+        self.session.commit()
@@ -0,0 +1,76 @@
+from sqlmodel import Session, select, func
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import Table
+from ..models.notificacion import Notificacion
+from ..models.oferta_notificada import OfertaNotificada
+from ..models.convocatoria_snapshot import ConvocatoriaSnapshot
+from ..config.shards import exigir_sin_shards
+
+# Tablas exportables: nombre -> (tabla, columna de clave para el recorrido por keyset)
+TABLAS_EXPORTABLES: Dict[str, Tuple[Table, str]] = {
+    "notificaciones": (Notificacion.__table__, "id_notificacion"),  # type: ignore
+    "ofertas_notificadas": (OfertaNotificada.__table__, "id"),  # type: ignore
+    "convocatoria_snapshots": (ConvocatoriaSnapshot.__table__, "id"),  # type: ignore
+}
+
+
+class ExportacionRepository:
+    """
+    Lectura por lotes para exportaciones masivas. Recorre por clave primaria
+    (keyset: `WHERE clave > ultima ORDER BY clave`) en lugar de OFFSET, así cada
+    lote es un seek sobre el índice y el coste no crece con el tamaño de la tabla.
+    """
+
+    def __init__(self, session: Session):
+        exigir_sin_shards("La exportación")
+        self.session = session
+
+    @staticmethod
+    def tabla(nombre: str) -> Tuple[Table, str]:
+        if nombre not in TABLAS_EXPORTABLES:
+            raise ValueError(
+                f"Tabla no exportable: '{nombre}'. Opciones: {', '.join(TABLAS_EXPORTABLES)}"
+            )
+        return TABLAS_EXPORTABLES[nombre]
+
+    @staticmethod
+    def nombres() -> List[str]:
+        return list(TABLAS_EXPORTABLES)
+
+    def max_id(self, nombre: str) -> int:
+        tabla, clave = self.tabla(nombre)
+        return self.session.exec(select(func.max(tabla.c[clave]))).one() or 0  # type: ignore
+
+    def lotes(
+        self,
+        nombre: str,
+        desde_id: int = 0,
+        hasta_id: Optional[int] = None,
+        tamano_lote: int = 10000
+    ) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """
+        Devuelve (columnas, filas) por lotes de hasta `tamano_lote` filas con
+        `desde_id < clave <= hasta_id`. Solo se mantiene un lote en memoria.
+        """
+        tabla, clave = self.tabla(nombre)
+        columna_clave = tabla.c[clave]
+        columnas = [c.name for c in tabla.columns]
+        indice_clave = columnas.index(clave)
+        ultimo = desde_id
+
+        while True:
+            stmt = (
+                select(*tabla.columns)
+                .where(columna_clave > ultimo)
+                .order_by(columna_clave)
+                .limit(tamano_lote)
+            )
+            if hasta_id is not None:
+                stmt = stmt.where(columna_clave <= hasta_id)
+            filas = [tuple(f) for f in self.session.exec(stmt).all()]  # type: ignore
+            if not filas:
+                return
+            yield columnas, filas
+            if len(filas) < tamano_lote:
+                return
+            ultimo = filas[-1][indice_clave]
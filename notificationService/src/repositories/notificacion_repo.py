@@ -1,37 +1,168 @@
-from sqlmodel import select, Session
-from typing import List, Optional, Iterator
-from uuid import UUID
+from sqlmodel import select, Session, func, case, col, or_, insert, update, delete, not_
+from sqlalchemy import Row
+from typing import List, Optional, Iterator, Tuple, Dict, Any
+from datetime import datetime
+from itertools import islice
+import heapq
 from ..models.notificacion import Notificacion
 from ..routes.deps.db_session import get_db
-from ..models.notificacionInt import NotificacionInt
+from ..dto.notificacion_dto import CAMPOS_RESPUESTA
+from ..cache import CacheLectura, get_cache, clave_notificacion, NOTIFICACION, NO_LEIDAS_USUARIO
+from ..cache import EscriturasRecientes, get_escrituras_recientes
+from ..config.shards import ShardRouter, get_shard_router
+from ..exception.insercion_parcial import InsercionParcial
+
+# Columnas que expone NotificacionResponseDTO, en su orden. Los listados las leen
+# como filas Row (tuplas, sin instanciar el modelo ORM ni un mapping por fila)
+# para serializarlas directamente.
+COLUMNAS_RESPUESTA = tuple(col(getattr(Notificacion, campo)) for campo in CAMPOS_RESPUESTA)
+COLUMNA_POR_CAMPO = dict(zip(CAMPOS_RESPUESTA, COLUMNAS_RESPUESTA))
+
+# SQL Server admite 2100 parámetros por sentencia; se deja margen
+MAX_PARAMETROS_SQL = 2000
+
+# Filas por INSERT multi-fila (cada fila usa una columna por parámetro)
+TAMANO_LOTE_INSERT = MAX_PARAMETROS_SQL // len(COLUMNAS_RESPUESTA)
+
+
+def _en_lotes(ids: List[int], tamano: int = MAX_PARAMETROS_SQL) -> Iterator[List[int]]:
+    for inicio in range(0, len(ids), tamano):
+        yield ids[inicio:inicio + tamano]
+
+
+def _fecha_creacion(fila: Any) -> datetime:
+    return fila.fecha_creacion
+
+
+def _columnas(campos: Tuple[str, ...], con_fecha: bool = False) -> List[Any]:
+    """
+    Columnas del SELECT para un sparse fieldset (ver parsear_campos). Con `con_fecha`
+    se agrega fecha_creacion al final si falta, para ordenar al mezclar shards:
+    la serialización solo toma las primeras len(campos) columnas.
+    """
+    columnas = [COLUMNA_POR_CAMPO[campo] for campo in campos]
+    if con_fecha and "fecha_creacion" not in campos:
+        columnas.append(COLUMNA_POR_CAMPO["fecha_creacion"])
+    return columnas
+
 
 class NotificacionRepository:
-    def __init__(self, session: Session):
+    """
+    Acceso a `notificaciones`. Con shards (ver config/shards.py) las filas viven en
+    el shard de su id_empresa: las operaciones por empresa van a un shard, las de
+    usuario a los shards del directorio, y las de ids o listados globales hacen
+    scatter-gather. En ese modo se ignora la `session` recibida para esas operaciones.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        cache: Optional[CacheLectura] = None,
+        escrituras: Optional[EscriturasRecientes] = None,
+        shards: Optional[ShardRouter] = None
+    ):
         self.session = session
+        self.cache = cache or get_cache()
+        self.escrituras = escrituras or get_escrituras_recientes()
+        self.shards = shards or get_shard_router()
     
     ## FUNCIONES DE OBTENER
 
-    def get_by_id(self, session: Session, id_: UUID) -> Optional[Notificacion]:
+    def get_by_id(self, session: Session, id_: int) -> Optional[Notificacion]:
+        if self.shards:
+            # Los ids no se repiten entre shards (ver ShardRouter.preparar_identidades)
+            encontradas = self.shards.scatter(lambda s: s.get(Notificacion, id_))
+            return next((n for n in encontradas if n is not None), None)
         return session.get(Notificacion, id_)
     
-    def get_by_id_usuario(self, session:Session, id_usuario: str) -> List[Notificacion]:
-        stmt = select(Notificacion).where(Notificacion.id_usuario == id_usuario)
-        results = session.exec(stmt)
-        return results.all()
+    def get_by_id_usuario(
+        self,
+        session: Session,
+        id_usuario: str,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
+        stmt = select(*_columnas(campos)).where(col(Notificacion.id_usuario) == id_usuario)
+        stmt = self._filtrar_cambios(stmt, since_id, since)
+        if self.shards:
+            return self._filas_usuario(id_usuario, stmt)
+        return self._filas(session, stmt)
     
-    def get_by_id_empresa(self, session:Session, id_empresa: str) -> List[Notificacion]:
-        stmt = select(Notificacion).where(Notificacion.id_empresa == id_empresa)
-        results = session.exec(stmt)
-        return results.all()
+    def get_by_id_empresa(
+        self,
+        session: Session,
+        id_empresa: str,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
+        stmt = select(*_columnas(campos)).where(col(Notificacion.id_empresa) == id_empresa)
+        stmt = self._filtrar_cambios(stmt, since_id, since)
+        if self.shards:
+            return self.shards.en_empresa(id_empresa, lambda s: self._filas(s, stmt))
+        return self._filas(session, stmt)
+
+    def get_version_usuario(self, session: Session, id_usuario: str) -> Tuple[int, int, int, Optional[datetime]]:
+        """Obtener (max id, total, no leídas, última lectura) de un usuario en una sola consulta agregada"""
+        filtro = col(Notificacion.id_usuario) == id_usuario
+        if self.shards:
+            versiones = self.shards.scatter(
+                lambda s: self._get_version(s, filtro), self.shards.shards_de_usuario(id_usuario)
+            )
+            return (
+                max((v[0] for v in versiones), default=0),
+                sum(v[1] for v in versiones),
+                sum(v[2] for v in versiones),
+                max((v[3] for v in versiones if v[3] is not None), default=None)
+            )
+        return self._get_version(session, filtro)
+
+    def get_version_empresa(self, session: Session, id_empresa: str) -> Tuple[int, int, int, Optional[datetime]]:
+        """Obtener (max id, total, no leídas, última lectura) de una empresa en una sola consulta agregada"""
+        filtro = col(Notificacion.id_empresa) == id_empresa
+        if self.shards:
+            return self.shards.en_empresa(id_empresa, lambda s: self._get_version(s, filtro))
+        return self._get_version(session, filtro)
+
+    def _get_version(self, session: Session, filtro) -> Tuple[int, int, int, Optional[datetime]]:
+        stmt = select(
+            func.max(Notificacion.id_notificacion),
+            func.count(),
+            func.sum(case((not_(col(Notificacion.leida)), 1), else_=0)),
+            func.max(Notificacion.fecha_lectura)
+        ).where(filtro)
+        max_id, total, no_leidas, ultima_lectura = session.exec(stmt).one()
+        return max_id or 0, total or 0, no_leidas or 0, ultima_lectura
+
+    def _filtrar_cambios(self, stmt, since_id: Optional[int], since: Optional[datetime]):
+        """
+        Restringe la consulta a las filas nuevas (id > since_id) o que cambiaron
+        desde `since` (creadas o leídas después de esa fecha).
+        """
+        condiciones = []
+        if since_id is not None:
+            condiciones.append(col(Notificacion.id_notificacion) > since_id)
+        if since is not None:
+            condiciones.append(col(Notificacion.fecha_creacion) > since)
+            condiciones.append(col(Notificacion.fecha_lectura) > since)
+        if condiciones:
+            stmt = stmt.where(or_(*condiciones))
+        return stmt
     
     def get_no_leidas_by_usuario(self, session: Session, id_usuario: str) -> List[Notificacion]:
         """Obtener notificaciones no leídas de un usuario"""
         stmt = (
             select(Notificacion)
             .where(Notificacion.id_usuario == id_usuario)
-            .where(Notificacion.leida == False)
+            .where(not_(col(Notificacion.leida)))
             .order_by(Notificacion.fecha_creacion.desc())
         )
+        if self.shards:
+            return list(heapq.merge(
+                *self.shards.scatter(lambda s: s.exec(stmt).all(), self.shards.shards_de_usuario(id_usuario)),
+                key=_fecha_creacion, reverse=True
+            ))
         results = session.exec(stmt)
         return results.all()
 
@@ -40,31 +171,83 @@ class NotificacionRepository:
         stmt = (
             select(Notificacion)
             .where(Notificacion.id_empresa == id_empresa)
-            .where(Notificacion.leida == False)
+            .where(not_(col(Notificacion.leida)))
             .order_by(Notificacion.fecha_creacion.desc())
         )
+        if self.shards:
+            return self.shards.en_empresa(id_empresa, lambda s: list(s.exec(stmt).all()))
         results = session.exec(stmt)
         return results.all()
 
-    def list_all(self, session: Session, skip: int = 0, limit: int = 100) -> List[Notificacion]:
-        stmt = select(Notificacion).order_by(Notificacion.fecha_creacion.desc()).offset(skip).limit(limit)
-        return session.exec(stmt).all()
+    def get_filas_no_leidas_by_usuario(
+        self, session: Session, id_usuario: str, campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
+        """Obtener las notificaciones no leídas de un usuario como filas planas (solo `campos`)"""
+        stmt = (
+            select(*_columnas(campos, con_fecha=bool(self.shards)))
+            .where(col(Notificacion.id_usuario) == id_usuario)
+            .where(not_(col(Notificacion.leida)))
+            .order_by(col(Notificacion.fecha_creacion).desc())
+        )
+        if self.shards:
+            return self._filas_usuario(id_usuario, stmt, ordenadas=True)
+        return self._filas(session, stmt)
 
-    def get_by_status(self, session: Session) -> List[Notificacion]:
-        stmt = select(Notificacion).where(Notificacion.leida == False)
-        results = session.exec(stmt)
-        return results.all()
+    def list_all(
+        self,
+        session: Session,
+        skip: int = 0,
+        limit: int = 100,
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
+        stmt = (
+            select(*_columnas(campos, con_fecha=bool(self.shards)))
+            .order_by(col(Notificacion.fecha_creacion).desc())
+        )
+        if self.shards:
+            # Scatter-gather: cada shard aporta sus primeras skip+limit filas y se mezclan por fecha
+            por_shard = self.shards.scatter(lambda s: self._filas(s, stmt.limit(skip + limit)))
+            return list(islice(heapq.merge(*por_shard, key=_fecha_creacion, reverse=True), skip, skip + limit))
+        return self._filas(session, stmt.offset(skip).limit(limit))
+
+    def get_by_status(self, session: Session, campos: Tuple[str, ...] = CAMPOS_RESPUESTA) -> List[Row]:
+        stmt = select(*_columnas(campos)).where(not_(col(Notificacion.leida)))
+        if self.shards:
+            return [fila for filas in self.shards.scatter(lambda s: self._filas(s, stmt)) for fila in filas]
+        return self._filas(session, stmt)
 
+    def _filas(self, session: Session, stmt) -> List[Row]:
+        """
+        Ejecuta un select de COLUMNAS_RESPUESTA (o de un subconjunto) y devuelve las filas Row (sin ORM).
+        Acceso por atributo (`fila.leida`) o por posición; `fila._asdict()` si hace falta un dict.
+        """
+        return list(session.exec(stmt).all())
+
+    def _filas_usuario(self, id_usuario: str, stmt, ordenadas: bool = False) -> List[Row]:
+        """Filas de un usuario desde los shards donde tiene notificaciones"""
+        por_shard = self.shards.scatter(  # type: ignore
+            lambda s: self._filas(s, stmt), self.shards.shards_de_usuario(id_usuario)  # type: ignore
+        )
+        if ordenadas:
+            return list(heapq.merge(*por_shard, key=_fecha_creacion, reverse=True))
+        return [fila for filas in por_shard for fila in filas]
 
     # FUNCIONES POST 
 
     def create(self, session: Session, notificacion: Notificacion) -> Notificacion:
+        if self.shards:
+            self._guardar_en_shards([notificacion])
+            self._invalidar(notificacion)
+            return notificacion
         session.add(notificacion)
         session.commit()
         session.refresh(notificacion)
+        self._invalidar(notificacion)
         return notificacion
     
-    def create_(self, obj: NotificacionInt) -> NotificacionInt:
+    def create_(self, obj: Notificacion) -> Notificacion:
+        if self.shards:
+            return self.create(self.session, obj)
         session_generator: Iterator[Session] = get_db()
         session: Optional[Session] = None 
         try:
@@ -72,6 +255,7 @@ class NotificacionRepository:
             session.add(obj)
             session.commit()
             session.refresh(obj)
+            self._invalidar(obj)
             
             return obj
             
@@ -85,23 +269,206 @@ class NotificacionRepository:
                 next(session_generator)
             except StopIteration:
                 pass
+
+    def insertar_lote(self, session: Session, filas: List[Dict[str, Any]]) -> List[int]:
+        """
+        Inserta filas (dicts con las columnas de Notificacion) en sentencias INSERT
+        multi-fila de hasta TAMANO_LOTE_INSERT filas, dentro de la transacción actual.
+        No confirma: el llamador decide el commit/rollback.
+
+        Con shards, cada shard inserta su parte y confirma por su cuenta (no hay
+        transacción entre shards): el commit/rollback del llamador no las afecta.
+        Si algún shard falla, los demás siguen y se lanza InsercionParcial con los
+        ids de lo que sí quedó confirmado.
+
+        Returns:
+            IDs generados, en el mismo orden que `filas`
+        """
+        if self.shards:
+            return self._insertar_lote_en_shards(filas)
+        return self._insertar_lote(session, filas)
+
+    def _insertar_lote(self, session: Session, filas: List[Dict[str, Any]]) -> List[int]:
+        stmt = insert(Notificacion).returning(
+            col(Notificacion.id_notificacion), sort_by_parameter_order=True
+        )
+        ids: List[int] = []
+        for inicio in range(0, len(filas), TAMANO_LOTE_INSERT):
+            lote = filas[inicio:inicio + TAMANO_LOTE_INSERT]
+            ids.extend(session.execute(stmt, lote).scalars().all())
+        return ids
+
+    def _insertar_lote_en_shards(self, filas: List[Dict[str, Any]]) -> List[int]:
+        shards: ShardRouter = self.shards  # type: ignore
+        ids: List[Optional[int]] = [None] * len(filas)
+        error: Optional[Exception] = None
+        for shard, indices in shards.agrupar_por_shard(range(len(filas)), lambda i: filas[i]["id_empresa"]).items():
+            try:
+                shards.registrar_usuarios((filas[i]["id_usuario"], shard) for i in indices)
+                with shards.sesion(shard) as s:
+                    generados = self._insertar_lote(s, [filas[i] for i in indices])
+                    s.commit()
+            except Exception as e:
+                error = error or e
+                continue
+            for indice, id_generado in zip(indices, generados):
+                ids[indice] = id_generado
+        if error is not None:
+            raise InsercionParcial(ids, error) from error
+        return ids  # type: ignore
+
+    def _guardar_en_shards(self, notificaciones: List[Notificacion]) -> None:
+        """Inserta o actualiza objetos en el shard de su empresa (un commit por shard)"""
+        shards: ShardRouter = self.shards  # type: ignore
+        for shard, grupo in shards.agrupar_por_shard(notificaciones, lambda n: n.id_empresa).items():
+            shards.registrar_usuarios((n.id_usuario, shard) for n in grupo)
+            with shards.sesion(shard) as s:
+                s.add_all(grupo)
+                s.commit()
+
+    def invalidar_cache_usuarios(self, ids_usuario: List[str], ids_empresa: Optional[List[str]] = None) -> None:
+        """Invalida las listas de no leídas de usuarios afectados por escrituras en lote"""
+        self.cache.invalidar(NO_LEIDAS_USUARIO, *set(ids_usuario))
+        self.escrituras.registrar("usuario", ids_usuario)
+        self.escrituras.registrar("empresa", ids_empresa or [])
+
     #FUNCIONES PUT/PATCH
 
     def update(self, session: Session, notificacion: Notificacion) -> Notificacion:
+        if self.shards:
+            self._guardar_en_shards([notificacion])
+            self._invalidar(notificacion)
+            return notificacion
         session.add(notificacion)
         session.commit()
         session.refresh(notificacion)
+        self._invalidar(notificacion)
         return notificacion
     
     def update_many(self, session: Session, notificaciones: List[Notificacion]) -> None:
         """Actualizar múltiples notificaciones"""
+        if self.shards:
+            self._guardar_en_shards(notificaciones)
+            self._invalidar(*notificaciones)
+            return
         for notificacion in notificaciones:
             session.add(notificacion)
         session.commit()
+        self._invalidar(*notificaciones)
+
+    def marcar_leidas_por_ids(self, session: Session, ids: List[int], fecha_lectura: datetime) -> Dict[int, str]:
+        """
+        Marca como leídas las notificaciones indicadas con un UPDATE por lote de
+        hasta MAX_PARAMETROS_SQL ids, en una sola transacción.
+
+        Returns:
+            Resultado por id: "marcada", "ya_leida" o "no_encontrada"
+        """
+        if self.shards:
+            # Cada id está en un solo shard: se toma el resultado del shard que lo tiene
+            por_shard = self.shards.scatter(lambda s: self._marcar_leidas(s, ids, fecha_lectura))
+            afectadas = [fila for _, filas in por_shard for fila in filas]
+            resultados = {
+                i: next((r[i] for r, _ in por_shard if r[i] != "no_encontrada"), "no_encontrada")
+                for i in ids
+            }
+        else:
+            resultados, afectadas = self._marcar_leidas(session, ids, fecha_lectura)
+        self.invalidar_ids(afectadas)
+        return resultados
 
+    def _marcar_leidas(
+        self,
+        session: Session,
+        ids: List[int],
+        fecha_lectura: datetime
+    ) -> Tuple[Dict[int, str], List[Tuple[int, str, str]]]:
+        resultados: Dict[int, str] = {}
+        afectadas: List[Tuple[int, str, str]] = []
+
+        for lote in _en_lotes(ids):
+            stmt = (
+                update(Notificacion.__table__)  # type: ignore
+                .where(col(Notificacion.id_notificacion).in_(lote))
+                .where(not_(col(Notificacion.leida)))
+                .values(leida=True, fecha_lectura=fecha_lectura)
+                .returning(col(Notificacion.id_notificacion), col(Notificacion.id_usuario), col(Notificacion.id_empresa))
+            )
+            marcadas = session.execute(stmt).all()
+            afectadas.extend((i, u, e) for i, u, e in marcadas)
+            resultados.update({i: "marcada" for i, _, _ in marcadas})
+
+            # Solo se distingue "ya leída" de "inexistente" si quedó algún id sin marcar
+            restantes = [i for i in lote if i not in resultados]
+            if restantes:
+                existentes = set(session.exec(
+                    select(col(Notificacion.id_notificacion))
+                    .where(col(Notificacion.id_notificacion).in_(restantes))
+                ).all())
+                resultados.update({
+                    i: "ya_leida" if i in existentes else "no_encontrada"
+                    for i in restantes
+                })
+
+        session.commit()
+        return resultados, afectadas
 
     #FUNCIONES DELETE
+
+    def delete_por_ids(self, session: Session, ids: List[int]) -> Dict[int, str]:
+        """
+        Elimina las notificaciones indicadas con un DELETE por lote de hasta
+        MAX_PARAMETROS_SQL ids, en una sola transacción.
+
+        Returns:
+            Resultado por id: "eliminada" o "no_encontrada"
+        """
+        if self.shards:
+            eliminadas = [
+                fila for filas in self.shards.scatter(lambda s: self._delete_por_ids(s, ids))
+                for fila in filas
+            ]
+        else:
+            eliminadas = self._delete_por_ids(session, ids)
+        self.invalidar_ids(eliminadas)
+
+        ids_eliminados = {i for i, _, _ in eliminadas}
+        return {i: "eliminada" if i in ids_eliminados else "no_encontrada" for i in ids}
+
+    def _delete_por_ids(self, session: Session, ids: List[int]) -> List[Tuple[int, str, str]]:
+        eliminadas: List[Tuple[int, str, str]] = []
+        for lote in _en_lotes(ids):
+            stmt = (
+                delete(Notificacion.__table__)  # type: ignore
+                .where(col(Notificacion.id_notificacion).in_(lote))
+                .returning(col(Notificacion.id_notificacion), col(Notificacion.id_usuario), col(Notificacion.id_empresa))
+            )
+            eliminadas.extend((i, u, e) for i, u, e in session.execute(stmt).all())
+        session.commit()
+        return eliminadas
     
     def delete(self, session: Session, notificacion: Notificacion) -> None:
-        session.delete(notificacion)
-        session.commit()
\ No newline at end of file
+        ids = (notificacion.id_notificacion, notificacion.id_usuario, notificacion.id_empresa)
+        if self.shards:
+            self.shards.en_empresa(
+                notificacion.id_empresa, lambda s: self._delete_por_ids(s, [notificacion.id_notificacion])  # type: ignore
+            )
+        else:
+            session.delete(notificacion)
+            session.commit()
+        self.invalidar_ids([ids])
+
+    # INVALIDACIÓN DE CACHE Y MARCA DE ESCRITURA RECIENTE (después de confirmar la escritura)
+
+    def _invalidar(self, *notificaciones: Notificacion) -> None:
+        self.invalidar_ids([(n.id_notificacion, n.id_usuario, n.id_empresa) for n in notificaciones])
+
+    def invalidar_ids(self, filas: List[Tuple[Optional[int], str, str]]) -> None:
+        """Filas (id_notificacion, id_usuario, id_empresa) escritas o borradas, ya confirmadas"""
+        ids = {clave_notificacion(i) for i, _, _ in filas if i is not None}
+        self.cache.invalidar(NOTIFICACION, *ids)
+        self.cache.invalidar(NO_LEIDAS_USUARIO, *{u for _, u, _ in filas})
+        # Con réplica: lecturas de estos ids/usuarios/empresas a la primaria por un momento
+        self.escrituras.registrar("notificacion", ids)
+        self.escrituras.registrar("usuario", [u for _, u, _ in filas])
+        self.escrituras.registrar("empresa", [e for _, _, e in filas])
\ No newline at end of file
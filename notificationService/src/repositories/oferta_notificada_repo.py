@@ -1,13 +1,21 @@
-from sqlmodel import Session, select
+from sqlmodel import Session, select, col
 from typing import List, Optional, Set
 from ..models.oferta_notificada import OfertaNotificada
+from ..config.shards import ShardRouter, get_shard_router
+from .estadisticas_repo import EstadisticasRepository
 
 
 class OfertaNotificadaRepository:
-    """Repositorio para gestionar el tracking de ofertas notificadas"""
+    """
+    Repositorio para gestionar el tracking de ofertas notificadas.
+
+    Con shards, cada registro vive en el shard de su id_empresa y las búsquedas
+    por id_oferta consultan todos los shards.
+    """
     
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, shards: Optional[ShardRouter] = None):
         self.session = session
+        self.shards = shards or get_shard_router()
     
     def get_oferta_notificada(self, id_oferta: int) -> Optional[OfertaNotificada]:
         """
@@ -22,6 +30,9 @@ class OfertaNotificadaRepository:
         stmt = select(OfertaNotificada).where(
             OfertaNotificada.id_oferta == id_oferta
         )
+        if self.shards:
+            encontrados = self.shards.scatter(lambda s: s.exec(stmt).first())
+            return next((e for e in encontrados if e is not None), None)
         return self.session.exec(stmt).first()
     
     def get_ids_ya_notificados(self, ids_ofertas: List[int] | int) -> Set[int]:
@@ -41,11 +52,11 @@ class OfertaNotificadaRepository:
         if isinstance(ids_ofertas, int):
             ids_ofertas = [ids_ofertas]
         
-        from sqlmodel import col
-        
         stmt = select(OfertaNotificada.id_oferta).where(
             col(OfertaNotificada.id_oferta).in_(ids_ofertas)
         )
+        if self.shards:
+            return set().union(*self.shards.scatter(lambda s: s.exec(stmt).all()))
         results = self.session.exec(stmt).all()
         return set(results)
     
@@ -77,12 +88,33 @@ class OfertaNotificadaRepository:
             fecha_publicacion=fecha_publicacion,
             usuarios_notificados=usuarios_notificados
         )
+        if self.shards:
+            self.shards.en_empresa(id_empresa, lambda s: self._guardar(s, registro))
+            # Las estadísticas quedan en la base primaria, después de confirmar en el shard
+            EstadisticasRepository(self.session).registrar_oferta_notificada(
+                id_oferta, titulo, usuarios_notificados
+            )
+            self.session.commit()
+            return registro
+
         self.session.add(registro)
+        # Estadísticas precalculadas en la misma transacción
+        EstadisticasRepository(self.session).registrar_oferta_notificada(
+            id_oferta, titulo, usuarios_notificados
+        )
         self.session.commit()
         self.session.refresh(registro)
         return registro
+
+    @staticmethod
+    def _guardar(session: Session, registro: OfertaNotificada) -> None:
+        session.add(registro)
+        session.commit()
+        session.refresh(registro)
     
     def get_all(self) -> List[OfertaNotificada]:
         """Obtiene todas las ofertas notificadas"""
         stmt = select(OfertaNotificada)
+        if self.shards:
+            return [r for registros in self.shards.scatter(lambda s: s.exec(stmt).all()) for r in registros]
         return list(self.session.exec(stmt).all())
\ No newline at end of file
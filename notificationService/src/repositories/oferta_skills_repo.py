@@ -0,0 +1,69 @@
+from sqlmodel import Session, select, col, delete
+from typing import Dict, List, Tuple
+from datetime import datetime
+from ..models.oferta_skills import OfertaSkills
+
+SEPARADOR_SKILLS = "|"
+
+# SQL Server admite 2100 parámetros por sentencia; se deja margen
+MAX_PARAMETROS_SQL = 2000
+
+
+class OfertaSkillsRepository:
+    """Repositorio de las skills extraídas por oferta"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_por_ids(self, ids_ofertas: List[int]) -> Dict[int, Tuple[str, str, List[str]]]:
+        """
+        Skills guardadas de las ofertas indicadas.
+
+        Returns:
+            {id_oferta: (hash_requirements, version_catalogo, skills)}
+        """
+        previas: Dict[int, Tuple[str, str, List[str]]] = {}
+        for inicio in range(0, len(ids_ofertas), MAX_PARAMETROS_SQL):
+            stmt = select(
+                col(OfertaSkills.id_oferta),
+                col(OfertaSkills.hash_requirements),
+                col(OfertaSkills.version_catalogo),
+                col(OfertaSkills.skills),
+            ).where(col(OfertaSkills.id_oferta).in_(ids_ofertas[inicio:inicio + MAX_PARAMETROS_SQL]))
+            for id_oferta, hash_req, version, skills in self.session.exec(stmt).all():
+                previas[id_oferta] = (hash_req, version, skills.split(SEPARADOR_SKILLS) if skills else [])
+        return previas
+
+    def guardar_muchos(self, extraidas: List[Tuple[int, str, List[str]]], version_catalogo: str) -> int:
+        """
+        Inserta o reemplaza las skills extraídas en una sola transacción
+        (borra por clave e inserta, portable entre SQL Server y SQLite).
+
+        Args:
+            extraidas: Tuplas (id_oferta, hash_requirements, skills)
+            version_catalogo: Versión del catálogo con que se extrajeron
+        """
+        # Una oferta repetida en la entrada se guarda una vez (la última)
+        por_id = {id_oferta: (hash_req, skills) for id_oferta, hash_req, skills in extraidas}
+        if not por_id:
+            return 0
+
+        ahora = datetime.utcnow()
+        ids = list(por_id)
+        for inicio in range(0, len(ids), MAX_PARAMETROS_SQL):
+            self.session.exec(  # type: ignore
+                delete(OfertaSkills).where(col(OfertaSkills.id_oferta).in_(ids[inicio:inicio + MAX_PARAMETROS_SQL]))
+            )
+
+        self.session.add_all([
+            OfertaSkills(
+                id_oferta=id_oferta,
+                hash_requirements=hash_req,
+                version_catalogo=version_catalogo,
+                skills=SEPARADOR_SKILLS.join(skills),
+                fecha_extraccion=ahora
+            )
+            for id_oferta, (hash_req, skills) in por_id.items()
+        ])
+        self.session.commit()
+        return len(por_id)
@@ -0,0 +1,57 @@
+from sqlmodel import Session, select, col, delete
+from sqlalchemy import RowMapping
+from typing import List
+from datetime import datetime
+from ..models.perfil_features import PerfilFeatures
+from ..dto.perfil_dto import PerfilFeaturesDTO
+
+SEPARADOR_SKILLS = "|"
+
+
+class PerfilFeaturesRepository:
+    """Repositorio de la tabla local de atributos de perfil"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_all_filas(self) -> List[RowMapping]:
+        """Todas las filas como mappings (sin instanciar el modelo)"""
+        stmt = select(
+            col(PerfilFeatures.id_usuario),
+            col(PerfilFeatures.skills),
+            col(PerfilFeatures.modalidad),
+            col(PerfilFeatures.ubicacion),
+            col(PerfilFeatures.anios_experiencia),
+            col(PerfilFeatures.salario_esperado),
+        )
+        return list(self.session.exec(stmt).mappings().all())
+
+    def reemplazar_muchos(self, perfiles: List[PerfilFeaturesDTO]) -> int:
+        """
+        Inserta o reemplaza los perfiles indicados en una sola transacción
+        (borra por clave e inserta, portable entre SQL Server y SQLite).
+        """
+        if not perfiles:
+            return 0
+
+        ahora = datetime.utcnow()
+        ids = [p.id_usuario for p in perfiles]
+        for inicio in range(0, len(ids), 2000):
+            self.session.exec(  # type: ignore
+                delete(PerfilFeatures).where(col(PerfilFeatures.id_usuario).in_(ids[inicio:inicio + 2000]))
+            )
+
+        self.session.add_all([
+            PerfilFeatures(
+                id_usuario=p.id_usuario,
+                skills=SEPARADOR_SKILLS.join(p.skills),
+                modalidad=p.modalidad,
+                ubicacion=p.ubicacion,
+                anios_experiencia=p.anios_experiencia,
+                salario_esperado=p.salario_esperado,
+                fecha_actualizacion=ahora
+            )
+            for p in perfiles
+        ])
+        self.session.commit()
+        return len(perfiles)
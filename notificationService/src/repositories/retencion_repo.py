@@ -0,0 +1,106 @@
+from sqlmodel import Session, select, delete, insert, func, col, and_, or_, literal, not_
+from typing import List, Optional, Tuple
+from datetime import datetime
+from ..models.notificacion import Notificacion
+from ..models.notificacion_archivo import NotificacionArchivo
+from ..config.shards import exigir_sin_shards
+from .notificacion_repo import NotificacionRepository
+
+# Columnas copiadas tal cual de notificaciones a notificaciones_archivo
+COLUMNAS_ARCHIVO = [
+    "id_notificacion", "id_usuario", "id_empresa", "tipo_notificacion", "asunto",
+    "mensaje", "id_oferta", "prioridad", "datos_adicionales", "leida",
+    "fecha_lectura", "fecha_creacion",
+]
+
+
+class RetencionRepository:
+    """Repositorio para retirar notificaciones antiguas en lotes acotados"""
+
+    def __init__(self, session: Session, notificacion_repo: Optional[NotificacionRepository] = None):
+        exigir_sin_shards("La retención")
+        self.session = session
+        # Para invalidar el cache de lectura y marcar las escrituras recientes
+        self.notificacion_repo = notificacion_repo or NotificacionRepository(session)
+
+    def _filtro(self, corte_leidas: Optional[datetime], corte_no_leidas: Optional[datetime]):
+        condiciones = []
+        if corte_leidas is not None:
+            condiciones.append(and_(
+                col(Notificacion.leida),
+                col(Notificacion.fecha_creacion) < corte_leidas
+            ))
+        if corte_no_leidas is not None:
+            condiciones.append(and_(
+                not_(col(Notificacion.leida)),
+                col(Notificacion.fecha_creacion) < corte_no_leidas
+            ))
+        return or_(*condiciones) if condiciones else None
+
+    def contar_candidatas(
+        self,
+        corte_leidas: Optional[datetime],
+        corte_no_leidas: Optional[datetime]
+    ) -> int:
+        """Cuenta las notificaciones que retiraría la política (dry-run)"""
+        filtro = self._filtro(corte_leidas, corte_no_leidas)
+        if filtro is None:
+            return 0
+        stmt = select(func.count()).select_from(Notificacion).where(filtro)
+        return self.session.exec(stmt).one()
+
+    def procesar_lote(
+        self,
+        corte_leidas: Optional[datetime],
+        corte_no_leidas: Optional[datetime],
+        tamano_lote: int,
+        archivar: bool
+    ) -> int:
+        """
+        Retira hasta `tamano_lote` notificaciones (las de menor id primero) en una
+        transacción corta: copia al archivo si corresponde y borra por clave primaria.
+        Después del commit invalida el cache de las notificaciones y usuarios retirados.
+
+        Returns:
+            Cantidad de filas retiradas (0 cuando ya no quedan candidatas)
+        """
+        filtro = self._filtro(corte_leidas, corte_no_leidas)
+        if filtro is None:
+            return 0
+
+        stmt_ids = (
+            select(col(Notificacion.id_notificacion))
+            .where(filtro)
+            .order_by(col(Notificacion.id_notificacion))
+            .limit(tamano_lote)
+        )
+        ids: List[int] = list(self.session.exec(stmt_ids).all())
+        if not ids:
+            return 0
+
+        try:
+            if archivar:
+                origen = select(
+                    *[getattr(Notificacion, c) for c in COLUMNAS_ARCHIVO],
+                    literal(datetime.utcnow()).label("fecha_archivado")
+                ).where(col(Notificacion.id_notificacion).in_(ids))
+                self.session.exec(  # type: ignore
+                    insert(NotificacionArchivo).from_select(
+                        COLUMNAS_ARCHIVO + ["fecha_archivado"], origen
+                    )
+                )
+
+            retiradas: List[Tuple[int, str, str]] = [
+                (i, u, e) for i, u, e in self.session.execute(
+                    delete(Notificacion)
+                    .where(col(Notificacion.id_notificacion).in_(ids))
+                    .returning(col(Notificacion.id_notificacion), col(Notificacion.id_usuario), col(Notificacion.id_empresa))
+                ).all()
+            ]
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        self.notificacion_repo.invalidar_ids(retiradas)
+        return len(ids)
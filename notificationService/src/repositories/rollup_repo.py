@@ -0,0 +1,203 @@
+from sqlmodel import Session, select, update, insert, col, or_, and_
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+from itertools import takewhile
+from datetime import datetime
+from ..models.notificacion import Notificacion
+from ..models.notificacion_rollup import NotificacionRollupHora, NotificacionRollupLectura, RollupWatermark
+from ..config.shards import exigir_sin_shards
+
+# Bordes superiores (segundos) del histograma de tiempo hasta la lectura
+BUCKETS_SEGUNDOS = (
+    60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    86400, 2 * 86400, 4 * 86400, 7 * 86400, 14 * 86400, 30 * 86400,
+)
+# Bucket abierto para lecturas posteriores al último borde
+BUCKET_DESBORDE = 2_147_483_647
+
+WATERMARK_CREADAS = "rollup_creadas"
+WATERMARK_LECTURAS = "rollup_lecturas"
+
+
+def _hora(fecha: datetime) -> datetime:
+    return fecha.replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket(segundos: float) -> int:
+    segundos = max(segundos, 0)
+    for limite in BUCKETS_SEGUNDOS:
+        if segundos <= limite:
+            return limite
+    return BUCKET_DESBORDE
+
+
+class RollupRepository:
+    """
+    Rollups horarios de notificaciones. Cada lote se procesa en una transacción
+    que avanza el watermark junto con los contadores, así un lote nunca se
+    cuenta dos veces aunque varios workers ejecuten el job.
+    """
+
+    def __init__(self, session: Session):
+        exigir_sin_shards("Los rollups de notificaciones")
+        self.session = session
+
+    # WATERMARKS
+
+    def get_watermark(self, nombre: str, bloquear: bool = False) -> RollupWatermark:
+        stmt = select(RollupWatermark).where(col(RollupWatermark.nombre) == nombre)
+        if bloquear:
+            # SQL Server: WITH (UPDLOCK, ROWLOCK); serializa a los workers que corren el job
+            stmt = stmt.with_for_update()
+        watermark = self.session.exec(stmt).first()
+        if watermark is None:
+            watermark = RollupWatermark(nombre=nombre)
+            self.session.add(watermark)
+            self.session.flush()
+        return watermark
+
+    def get_watermarks(self) -> List[RollupWatermark]:
+        return list(self.session.exec(select(RollupWatermark)).all())
+
+    # INCREMENTOS
+
+    def _sumar_horas(self, deltas: Dict[Tuple[datetime, str], Tuple[int, int]]) -> None:
+        for (hora, tipo), (creadas, leidas) in deltas.items():
+            resultado = self.session.exec(  # type: ignore
+                update(NotificacionRollupHora)
+                .where(col(NotificacionRollupHora.hora) == hora)
+                .where(col(NotificacionRollupHora.tipo_notificacion) == tipo)
+                .values(
+                    creadas=NotificacionRollupHora.creadas + creadas,
+                    leidas=NotificacionRollupHora.leidas + leidas
+                )
+            )
+            if not resultado.rowcount:
+                self.session.exec(insert(NotificacionRollupHora).values(  # type: ignore
+                    hora=hora, tipo_notificacion=tipo, creadas=creadas, leidas=leidas
+                ))
+
+    def _sumar_histograma(self, deltas: Counter) -> None:
+        for (hora, tipo, limite), cantidad in deltas.items():
+            resultado = self.session.exec(  # type: ignore
+                update(NotificacionRollupLectura)
+                .where(col(NotificacionRollupLectura.hora) == hora)
+                .where(col(NotificacionRollupLectura.tipo_notificacion) == tipo)
+                .where(col(NotificacionRollupLectura.limite_segundos) == limite)
+                .values(cantidad=NotificacionRollupLectura.cantidad + cantidad)
+            )
+            if not resultado.rowcount:
+                self.session.exec(insert(NotificacionRollupLectura).values(  # type: ignore
+                    hora=hora, tipo_notificacion=tipo, limite_segundos=limite, cantidad=cantidad
+                ))
+
+    # LOTES
+
+    def procesar_lote_creadas(self, corte: datetime, tamano_lote: int) -> int:
+        """
+        Suma al rollup las notificaciones con id mayor al watermark, hasta
+        `tamano_lote` filas. El lote termina antes del primer id creado después
+        de `corte`: filtrarlo dejaría al watermark saltarlo y no se contaría
+        nunca. Confirma la transacción.
+
+        Returns:
+            Filas procesadas
+        """
+        watermark = self.get_watermark(WATERMARK_CREADAS, bloquear=True)
+        filas = self.session.exec(
+            select(
+                col(Notificacion.id_notificacion),
+                col(Notificacion.tipo_notificacion),
+                col(Notificacion.fecha_creacion)
+            )
+            .where(col(Notificacion.id_notificacion) > watermark.ultimo_id)
+            .order_by(col(Notificacion.id_notificacion))
+            .limit(tamano_lote)
+        ).all()
+        filas = list(takewhile(lambda fila: fila[2] <= corte, filas))
+
+        if filas:
+            conteo = Counter((_hora(fecha), tipo) for _, tipo, fecha in filas)
+            self._sumar_horas({clave: (n, 0) for clave, n in conteo.items()})
+            watermark.ultimo_id = filas[-1][0]
+            watermark.fecha_actualizacion = datetime.utcnow()
+            self.session.add(watermark)
+        self.session.commit()
+        return len(filas)
+
+    def procesar_lote_lecturas(self, corte: datetime, tamano_lote: int) -> int:
+        """
+        Suma al rollup las lecturas posteriores al watermark (fecha_lectura, id)
+        y anteriores a `corte`, hasta `tamano_lote` filas. Confirma la transacción.
+
+        Returns:
+            Filas procesadas
+        """
+        watermark = self.get_watermark(WATERMARK_LECTURAS, bloquear=True)
+        stmt = (
+            select(
+                col(Notificacion.id_notificacion),
+                col(Notificacion.tipo_notificacion),
+                col(Notificacion.fecha_creacion),
+                col(Notificacion.fecha_lectura)
+            )
+            .where(col(Notificacion.fecha_lectura).is_not(None))
+            .where(col(Notificacion.fecha_lectura) <= corte)
+        )
+        if watermark.ultima_fecha is not None:
+            stmt = stmt.where(or_(
+                col(Notificacion.fecha_lectura) > watermark.ultima_fecha,
+                and_(
+                    col(Notificacion.fecha_lectura) == watermark.ultima_fecha,
+                    col(Notificacion.id_notificacion) > watermark.ultimo_id
+                )
+            ))
+        filas = self.session.exec(
+            stmt.order_by(col(Notificacion.fecha_lectura), col(Notificacion.id_notificacion)).limit(tamano_lote)
+        ).all()
+
+        if filas:
+            leidas = Counter((_hora(creacion), tipo) for _, tipo, creacion, _ in filas)
+            histograma = Counter(
+                (_hora(creacion), tipo, _bucket((lectura - creacion).total_seconds()))
+                for _, tipo, creacion, lectura in filas
+            )
+            self._sumar_horas({clave: (0, n) for clave, n in leidas.items()})
+            self._sumar_histograma(histograma)
+            watermark.ultimo_id = filas[-1][0]
+            watermark.ultima_fecha = filas[-1][3]
+            watermark.fecha_actualizacion = datetime.utcnow()
+            self.session.add(watermark)
+        self.session.commit()
+        return len(filas)
+
+    # CONSULTAS (solo sobre los rollups)
+
+    def get_horas(self, desde: datetime, hasta: datetime, tipo: Optional[str] = None) -> List[Any]:
+        stmt = (
+            select(
+                col(NotificacionRollupHora.hora),
+                col(NotificacionRollupHora.tipo_notificacion),
+                col(NotificacionRollupHora.creadas),
+                col(NotificacionRollupHora.leidas)
+            )
+            .where(col(NotificacionRollupHora.hora) >= desde)
+            .where(col(NotificacionRollupHora.hora) < hasta)
+        )
+        if tipo:
+            stmt = stmt.where(col(NotificacionRollupHora.tipo_notificacion) == tipo)
+        return list(self.session.exec(stmt.order_by(col(NotificacionRollupHora.hora))).all())
+
+    def get_histograma(self, desde: datetime, hasta: datetime, tipo: Optional[str] = None) -> List[Any]:
+        stmt = (
+            select(
+                col(NotificacionRollupLectura.tipo_notificacion),
+                col(NotificacionRollupLectura.limite_segundos),
+                col(NotificacionRollupLectura.cantidad)
+            )
+            .where(col(NotificacionRollupLectura.hora) >= desde)
+            .where(col(NotificacionRollupLectura.hora) < hasta)
+        )
+        if tipo:
+            stmt = stmt.where(col(NotificacionRollupLectura.tipo_notificacion) == tipo)
+        return list(self.session.exec(stmt).all())
@@ -0,0 +1,24 @@
+from sqlmodel import Session, select, col
+from typing import Dict, List
+from ..models.skill_catalogo import SkillCatalogo
+
+SEPARADOR_SINONIMOS = "|"
+
+
+class SkillCatalogoRepository:
+    """Repositorio de la tabla del catálogo de skills"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_catalogo(self) -> Dict[str, List[str]]:
+        """Skills activas como {nombre canónico: [sinónimos]}, en orden de id"""
+        stmt = (
+            select(col(SkillCatalogo.nombre), col(SkillCatalogo.sinonimos))
+            .where(col(SkillCatalogo.activa))
+            .order_by(col(SkillCatalogo.id_skill))
+        )
+        return {
+            nombre: [s for s in (sinonimos or "").split(SEPARADOR_SINONIMOS) if s.strip()]
+            for nombre, sinonimos in self.session.exec(stmt).all()
+        }
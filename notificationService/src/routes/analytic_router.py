@@ -3,7 +3,7 @@ from sqlmodel import Session
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from ..repositories.analytic_repo import NotificacionAnalyticsRepository
-from ..config.db_synapse import synapse_engine
+from ..config.db_synapse import get_synapse_engine
 from ..schemas.analytics_schemas import (
     PostuladosResponse,
     CantidadResponse,
@@ -17,7 +17,7 @@ router = APIRouter(
 
 def get_synapse_session():
     """Retorna una sesión conectada a Synapse."""
-    with Session(synapse_engine) as session:
+    with Session(get_synapse_engine()) as session:
         yield session
 
 def get_repo(session: Session = Depends(get_synapse_session)):
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlmodel import Session
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from ..routes.deps.db_session import get_db, get_db_lectura
+from ..repositories.rollup_repo import RollupRepository
+from ..services.rollup_notificaciones_service import RollupNotificacionesService
+from ..schemas.analytics_schemas import VolumenesResponse, LecturaResponse
+
+
+router = APIRouter(
+    prefix="/analytics/notificaciones",
+    tags=["Analytics - Notificaciones"]
+)
+
+
+def _rango(desde: Optional[datetime], hasta: Optional[datetime]):
+    hasta = hasta or datetime.utcnow()
+    return desde or hasta - timedelta(days=30), hasta
+
+
+@router.get(
+    "/volumenes",
+    response_model=VolumenesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Notificaciones creadas y leídas por día y tipo"
+)
+def volumenes_por_dia(
+    desde: Optional[datetime] = Query(default=None, description="Inicio (por defecto, 30 días antes de `hasta`)"),
+    hasta: Optional[datetime] = Query(default=None, description="Fin, exclusivo (por defecto, ahora)"),
+    tipo_notificacion: Optional[str] = Query(default=None),
+    session: Session = Depends(get_db_lectura)
+):
+    """Servido desde los rollups horarios (no recorre `notificaciones`)."""
+    desde, hasta = _rango(desde, hasta)
+    service = RollupNotificacionesService(RollupRepository(session))
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "data": service.volumenes_por_dia(desde, hasta, tipo_notificacion)
+    }
+
+
+@router.get(
+    "/lectura",
+    response_model=LecturaResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Tasa de lectura y tiempo hasta la lectura (p50/p90)"
+)
+def resumen_lectura(
+    desde: Optional[datetime] = Query(default=None, description="Inicio (por defecto, 30 días antes de `hasta`)"),
+    hasta: Optional[datetime] = Query(default=None, description="Fin, exclusivo (por defecto, ahora)"),
+    tipo_notificacion: Optional[str] = Query(default=None),
+    session: Session = Depends(get_db_lectura)
+):
+    """
+    Por cohorte de creación en el rango: tasa de lectura y percentiles
+    aproximados desde el histograma de tiempos hasta la lectura.
+    """
+    desde, hasta = _rango(desde, hasta)
+    service = RollupNotificacionesService(RollupRepository(session))
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        **service.lectura(desde, hasta, tipo_notificacion)
+    }
+
+
+@router.get(
+    "/rollup",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Watermarks de los rollups"
+)
+def estado_rollup(session: Session = Depends(get_db)):
+    return RollupNotificacionesService(RollupRepository(session)).estado()
+
+
+@router.post(
+    "/rollup/actualizar",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Procesar ahora las notificaciones nuevas en los rollups",
+    description="""
+    Lo mismo que hace el job periódico (ROLLUP_INTERVALO_SEGUNDOS): suma a los
+    rollups las notificaciones con id posterior al watermark y las lecturas
+    posteriores al watermark de fecha_lectura.
+    """
+)
+def actualizar_rollup(
+    tamano_lote: int = Query(default=5000, ge=100, le=50000),
+    session: Session = Depends(get_db)
+):
+    return RollupNotificacionesService(RollupRepository(session)).actualizar(tamano_lote)
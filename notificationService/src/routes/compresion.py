@@ -0,0 +1,101 @@
+import os
+from typing import Dict, Optional
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config.entorno import cargar_entorno
+
+cargar_entorno()
+
+try:
+    import brotli  # dependencia opcional
+except ImportError:
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    """Como GZipResponder de Starlette, con un compresor brotli incremental"""
+
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, calidad: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compresor = brotli.Compressor(quality=calidad)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        comprimido = self.compresor.process(body)
+        if more_body:
+            return comprimido + self.compresor.flush()
+        return comprimido + self.compresor.finish()
+
+
+def _codificaciones_aceptadas(accept_encoding: str) -> Dict[str, float]:
+    """'br;q=1.0, gzip;q=0.5, *;q=0' -> {'br': 1.0, 'gzip': 0.5, '*': 0.0}"""
+    aceptadas: Dict[str, float] = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if not nombre:
+            continue
+        calidad = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                calidad = float(parametro[2:])
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre.strip().lower()] = calidad
+    return aceptadas
+
+
+class CompresionMiddleware:
+    """
+    Comprime respuestas de al menos `minimo_bytes` con brotli (si el paquete
+    está instalado y el cliente lo acepta) o gzip. Las respuestas chicas no se
+    comprimen: el costo de CPU no compensa los bytes ahorrados.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimo_bytes: int = 1024,
+        nivel_gzip: int = 6,
+        calidad_brotli: int = 4
+    ):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+        self.nivel_gzip = nivel_gzip
+        self.calidad_brotli = calidad_brotli
+
+    def _elegir(self, accept_encoding: str) -> Optional[str]:
+        aceptadas = _codificaciones_aceptadas(accept_encoding)
+        comodin = aceptadas.get("*", 0.0)
+        candidatas = ["br", "gzip"] if brotli is not None else ["gzip"]
+        puntajes = {c: aceptadas.get(c, comodin) for c in candidatas}
+        # A igual calidad gana la primera (brotli)
+        mejor = max(candidatas, key=lambda c: puntajes[c])
+        return mejor if puntajes[mejor] > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = self._elegir(Headers(scope=scope).get("accept-encoding", ""))
+        responder: ASGIApp
+        if codificacion == "br":
+            responder = BrotliResponder(self.app, self.minimo_bytes, self.calidad_brotli)
+        elif codificacion == "gzip":
+            responder = GZipResponder(self.app, self.minimo_bytes, compresslevel=self.nivel_gzip)
+        else:
+            responder = IdentityResponder(self.app, self.minimo_bytes)
+        await responder(scope, receive, send)
+
+
+def opciones_compresion() -> Dict[str, int]:
+    """Umbral y niveles desde COMPRESION_MIN_BYTES, COMPRESION_NIVEL_GZIP y COMPRESION_CALIDAD_BROTLI"""
+    return {
+        "minimo_bytes": int(os.getenv("COMPRESION_MIN_BYTES", "1024")),
+        "nivel_gzip": int(os.getenv("COMPRESION_NIVEL_GZIP", "6")),
+        "calidad_brotli": int(os.getenv("COMPRESION_CALIDAD_BROTLI", "4")),
+    }
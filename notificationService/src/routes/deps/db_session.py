@@ -1,10 +1,52 @@
-from typing import Annotated, Generator
-from fastapi import Depends
+from typing import Annotated, Generator, List
+from fastapi import Depends, Request
 from sqlmodel import Session
-from ...config.db import engine
+from ...config.db import get_engine, get_engine_lectura, hay_replica
+from ...cache import clave_notificacion, get_escrituras_recientes
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
 
-SessionDep = Annotated[Session, Depends(get_db)]
\ No newline at end of file
+SessionDep = Annotated[Session, Depends(get_db)]
+
+
+# Parámetros de ruta -> (tipo de clave de escritura reciente, normalización del valor crudo
+# de la ruta al valor con que el repositorio registra la escritura; ver EscriturasRecientes)
+_PARAMETROS_CONSISTENCIA = {
+    "id_usuario": ("usuario", str),
+    "id_empresa": ("empresa", str),
+    "id_notificacion": ("notificacion", clave_notificacion),
+}
+
+
+def _claves_escritura(path_params: dict) -> List[str]:
+    escrituras = get_escrituras_recientes()
+    claves = []
+    for parametro, (tipo, normalizar) in _PARAMETROS_CONSISTENCIA.items():
+        if parametro not in path_params:
+            continue
+        try:
+            valor = normalizar(path_params[parametro])
+        except ValueError:
+            continue  # La validación de la ruta responde 422
+        claves.append(escrituras.clave(tipo, valor))
+    return claves
+
+
+def get_db_lectura(request: Request) -> Generator[Session, None, None]:
+    """
+    Sesión para endpoints de solo lectura: usa la réplica si está configurada,
+    salvo que el usuario/empresa/notificación de la ruta se haya escrito hace
+    poco (read-your-writes), en cuyo caso lee de la primaria.
+    """
+    engine_sesion = get_engine_lectura()
+    if hay_replica:
+        claves = _claves_escritura(request.path_params)
+        if claves and get_escrituras_recientes().alguna(claves):
+            engine_sesion = get_engine()
+
+    with Session(engine_sesion) as session:
+        yield session
+
+SessionLecturaDep = Annotated[Session, Depends(get_db_lectura)]
@@ -1,7 +1,7 @@
 from typing import Annotated, Generator
 from fastapi import Depends
 from sqlmodel import Session
-from ...config.db_synapse import synapse_engine
+from ...config.db_synapse import get_synapse_engine
 
 
 def get_synapse_session() -> Generator[Session, None, None]:
@@ -9,7 +9,7 @@ def get_synapse_session() -> Generator[Session, None, None]:
     Generador de sesión para Azure Synapse Analytics.
     Se usa para consultas analíticas y de solo lectura.
     """
-    with Session(synapse_engine) as session:
+    with Session(get_synapse_engine()) as session:
         yield session
 
 
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from typing import Dict, List, Optional
+
+from ..config.db import get_engine, get_engine_lectura
+from ..config.shards import exigir_sin_shards
+from ..routes.deps.db_session import get_db, get_db_lectura
+from ..repositories.exportacion_repo import ExportacionRepository
+from ..repositories.rollup_repo import RollupRepository
+from ..services.exportacion_columnar import (
+    ExportacionColumnarService, ExportacionEnCurso, MEDIA_TYPE_ARROW, esquema_arrow
+)
+
+
+router = APIRouter(
+    prefix="/exportaciones",
+    tags=["Exportaciones"]
+)
+
+
+def _validar_tabla(tabla: str) -> None:
+    exigir_sin_shards("La exportación")
+    try:
+        # También comprueba que pyarrow esté instalado antes de empezar a responder
+        esquema_arrow(tabla)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+
+
+def _stream_tabla(tabla: str, desde_id: int, hasta_id: int, tamano_lote: int):
+    """Generador del cuerpo: usa su propia sesión porque se consume después del handler"""
+    with Session(get_engine_lectura()) as session:
+        service = ExportacionColumnarService(ExportacionRepository(session))
+        yield from service.stream_ipc(tabla, desde_id, hasta_id, tamano_lote)
+
+
+def _ejecutar_exportacion(tabla: str, incremental: bool, tamano_lote: int) -> None:
+    """Tarea en segundo plano: usa su propia sesión porque la del request ya se cerró"""
+    with Session(get_engine()) as session:
+        service = ExportacionColumnarService(ExportacionRepository(session), RollupRepository(session))
+        try:
+            service.exportar_parquet(tabla, incremental=incremental, tamano_lote=tamano_lote)
+        except ExportacionEnCurso as e:
+            print(f"⚠️  {e}")
+        except Exception as e:
+            print(f"❌ Error exportando {tabla} a Parquet: {e}")
+
+
+@router.get(
+    "/{tabla}/arrow",
+    status_code=status.HTTP_200_OK,
+    summary="Descargar una tabla como stream Arrow IPC",
+    description="""
+    Tablas: `notificaciones`, `ofertas_notificadas`, `convocatoria_snapshots`.
+
+    Devuelve las filas con `desde_id < clave <= hasta_id` en formato Arrow IPC
+    (streaming), generado lote a lote: la memoria del servidor no depende del
+    tamaño de la tabla. Leer con `pyarrow.ipc.open_stream(respuesta)`.
+
+    **Exportación incremental desde el cliente:** la cabecera `X-Exportacion-Hasta-Id`
+    indica hasta qué clave incluye el stream; pasarla como `desde_id` en la siguiente
+    llamada para recibir solo las filas nuevas.
+    """
+)
+def exportar_arrow(
+    tabla: str,
+    desde_id: int = Query(default=0, ge=0, description="Exportar filas con clave mayor a este valor"),
+    hasta_id: Optional[int] = Query(default=None, ge=0, description="Clave máxima (por defecto, la actual)"),
+    tamano_lote: int = Query(default=10000, ge=100, le=100000),
+    session: Session = Depends(get_db_lectura)
+):
+    _validar_tabla(tabla)
+    if hasta_id is None:
+        # Se fija al inicio para que el stream tenga un final bien definido
+        hasta_id = ExportacionRepository(session).max_id(tabla)
+
+    return StreamingResponse(
+        _stream_tabla(tabla, desde_id, hasta_id, tamano_lote),
+        media_type=MEDIA_TYPE_ARROW,
+        headers={
+            "Content-Disposition": f'attachment; filename="{tabla}.arrows"',
+            "X-Exportacion-Desde-Id": str(desde_id),
+            "X-Exportacion-Hasta-Id": str(hasta_id),
+        }
+    )
+
+
+@router.post(
+    "/{tabla}/parquet",
+    response_model=Dict,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Exportar una tabla a Parquet particionado en segundo plano",
+    description="""
+    Escribe en `EXPORTACION_DIR/<tabla>/exportacion=<marca>/parte-NNNNN.parquet`.
+
+    Con `incremental=true` solo exporta las filas nuevas desde la última exportación
+    (watermark por tabla, visible en `GET /exportaciones`); con `false` exporta la
+    tabla completa sin mover el watermark hacia atrás.
+    """
+)
+def exportar_parquet(
+    tabla: str,
+    background_tasks: BackgroundTasks,
+    incremental: bool = Query(default=True),
+    tamano_lote: int = Query(default=10000, ge=100, le=100000)
+):
+    _validar_tabla(tabla)
+    if ExportacionColumnarService.en_curso(tabla):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya hay una exportación de '{tabla}' en curso."
+        )
+
+    background_tasks.add_task(_ejecutar_exportacion, tabla, incremental, tamano_lote)
+    return {
+        "mensaje": f"Exportación Parquet de '{tabla}' programada en segundo plano",
+        "incremental": incremental
+    }
+
+
+@router.get(
+    "",
+    response_model=List[Dict],
+    status_code=status.HTTP_200_OK,
+    summary="Watermarks de exportación por tabla"
+)
+def estado_exportaciones(session: Session = Depends(get_db)):
+    return ExportacionColumnarService(ExportacionRepository(session), RollupRepository(session)).estado()
@@ -0,0 +1,121 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlmodel import Session
+from typing import Dict
+
+from ..config.db import get_engine
+from ..config.shards import exigir_sin_shards
+from ..routes.deps.db_session import get_db
+from ..repositories.retencion_repo import RetencionRepository
+from ..repositories.estadisticas_repo import EstadisticasRepository
+from ..services.retencion_service import RetencionService, RetencionEnCurso
+from ..dto.retencion_dto import PoliticaRetencionDTO
+
+
+router = APIRouter(
+    prefix="/mantenimiento",
+    tags=["Mantenimiento"]
+)
+
+
+def _ejecutar_retencion(politica: PoliticaRetencionDTO) -> None:
+    """Tarea en segundo plano: usa su propia sesión porque la del request ya se cerró"""
+    with Session(get_engine()) as session:
+        try:
+            RetencionService(RetencionRepository(session)).ejecutar(politica)
+        except RetencionEnCurso as e:
+            print(f"⚠️  {e}")
+        except Exception as e:
+            print(f"❌ Error aplicando retención: {e}")
+
+
+@router.post(
+    "/retencion/pendientes",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Contar notificaciones que retiraría la política de retención (dry-run)"
+)
+def contar_retencion_pendiente(
+    politica: PoliticaRetencionDTO = PoliticaRetencionDTO(),
+    session: Session = Depends(get_db)
+):
+    return RetencionService(RetencionRepository(session)).contar_pendientes(politica)
+
+
+@router.post(
+    "/retencion",
+    response_model=Dict,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Aplicar la política de retención en segundo plano",
+    description="""
+    Retira notificaciones antiguas de `notificaciones` en lotes acotados.
+
+    **Cómo funciona:**
+    1. Selecciona hasta `tamano_lote` ids candidatos (leídas más antiguas que `dias_leidas`
+       o no leídas más antiguas que `dias_no_leidas`)
+    2. Los copia a `notificaciones_archivo` (modo `archivar`) y los borra por clave primaria
+    3. Confirma la transacción, hace una pausa y repite hasta agotar candidatas
+
+    **Ejemplo de uso:**
+    - Llamar este endpoint una vez al día desde un scheduler
+    """
+)
+def aplicar_retencion(
+    background_tasks: BackgroundTasks,
+    politica: PoliticaRetencionDTO = PoliticaRetencionDTO()
+):
+    exigir_sin_shards("La retención")
+    if RetencionService.en_curso():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ya hay una ejecución de retención en curso."
+        )
+
+    background_tasks.add_task(_ejecutar_retencion, politica)
+    return {
+        "mensaje": "Retención programada en segundo plano",
+        "politica": politica.model_dump()
+    }
+
+
+@router.post(
+    "/estadisticas/reconstruir",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Recalcular desde cero las estadísticas precalculadas",
+    description="""
+    Recalcula los agregados de `/procesamiento-ofertas/estadisticas` y
+    `/procesamiento/estadisticas-snapshots` desde las tablas de origen.
+
+    Devuelve los valores mantenidos antes de reconstruir y los recalculados,
+    para verificar que el mantenimiento incremental no se desvió. Ejecutarlo
+    una vez al desplegar para inicializar los agregados.
+    """
+)
+def reconstruir_estadisticas(session: Session = Depends(get_db)):
+    repo = EstadisticasRepository(session)
+    antes = {
+        "ofertas": repo.get_estadisticas_ofertas(),
+        "snapshots": repo.get_estadisticas_snapshots()
+    } if repo.inicializadas() else None
+
+    repo.reconstruir()
+    despues = {
+        "ofertas": repo.get_estadisticas_ofertas(),
+        "snapshots": repo.get_estadisticas_snapshots()
+    }
+
+    def _firma(estadisticas: Dict) -> tuple:
+        # Los empates del top pueden salir en otro orden: se comparan totales y valores
+        return (
+            estadisticas["ofertas"]["total_ofertas_notificadas"],
+            estadisticas["ofertas"]["total_usuarios_notificados"],
+            [o["usuarios_notificados"] for o in estadisticas["ofertas"]["top_10_ofertas"]],
+            estadisticas["snapshots"]["total_snapshots"],
+            [e["convocatorias_activas"] for e in estadisticas["snapshots"]["top_empresas"]],
+        )
+
+    return {
+        "antes": antes,
+        "despues": despues,
+        "coincidian": antes is not None and _firma(antes) == _firma(despues)
+    }
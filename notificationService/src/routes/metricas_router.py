@@ -0,0 +1,53 @@
+from fastapi import APIRouter, status
+from typing import Dict
+
+from ..cache import get_cache
+from ..limites import get_limitador
+from ..services.rendimiento_escritura import get_rendimiento_escritura
+from ..services.cola_escritura import get_cola_escritura
+
+
+router = APIRouter(
+    prefix="/metricas",
+    tags=["Métricas"]
+)
+
+
+@router.get(
+    "/cache",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Hits/misses del cache de lectura por keyspace"
+)
+def metricas_cache():
+    return get_cache().metricas()
+
+
+@router.get(
+    "/escritura",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Throughput reciente de escritura de notificaciones"
+)
+def metricas_escritura():
+    return get_rendimiento_escritura().metricas()
+
+
+@router.get(
+    "/cola-escritura",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Pendientes por carril y contrapresión de la cola de escritura"
+)
+def metricas_cola_escritura():
+    return get_cola_escritura().metricas()
+
+
+@router.get(
+    "/limites",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Peticiones permitidas y rechazadas por regla del limitador"
+)
+def metricas_limites():
+    return get_limitador().metricas()
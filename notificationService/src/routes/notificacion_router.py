@@ -1,52 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
-from uuid import UUID
-from typing import List
-from .deps.db_session import get_db  # Ajusta según tu configuración de BD
+from datetime import datetime
+from typing import List, Optional, Any, Tuple
+import json
+import os
+import zlib
+from .deps.db_session import get_db, get_db_lectura  # Ajusta según tu configuración de BD
 from ..services.notificacion_service import NotificacionService
 from ..repositories.notificacion_repo import NotificacionRepository
-from ..dto.notificacion_dto import NotificacionCreateDTO, NotificacionResponseDTO
+from ..dto.notificacion_dto import (
+    CAMPOS_RESPUESTA,
+    parsear_campos,
+    NotificacionCreateDTO,
+    NotificacionResponseDTO,
+    NotificacionBulkResultadoDTO,
+    ErrorItemDTO,
+    IdsNotificacionesDTO,
+    OperacionBulkResultadoDTO
+)
 from ..exception.notificacion_not_found import NotificacionNotFound
+from .responses import NotificacionesJSONResponse
 
 router = APIRouter(
     prefix="/notificaciones",
     tags=["Notificaciones"]
 )
 
+# Máximo de elementos aceptados por POST /notificaciones/bulk
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+
 # Dependencia para inyectar el servicio
 def get_notificacion_service(session: Session = Depends(get_db)) -> NotificacionService:
     repository = NotificacionRepository(session)
     return NotificacionService(repository)
 
 
+def get_campos(
+    fields: Optional[str] = Query(
+        default=None,
+        description="Campos a devolver separados por coma (p. ej. asunto,leida); id_notificacion va siempre"
+    )
+) -> Tuple[str, ...]:
+    """Sparse fieldset de los listados: reduce el SELECT, no solo el JSON"""
+    try:
+        return parsear_campos(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+def _etag_consulta(
+    etag: str, campos: Tuple[str, ...], since_id: Optional[int], since: Optional[datetime]
+) -> str:
+    """
+    Cada fieldset y cada delta (since_id / since) es una representación distinta:
+    su ETag no debe coincidir con el de la bandeja completa
+    """
+    if campos is CAMPOS_RESPUESTA and since_id is None and since is None:
+        return etag
+    consulta = f"{','.join(campos)}|{since_id}|{since.isoformat() if since else ''}"
+    return f'{etag[:-1]}-{zlib.crc32(consulta.encode()):08x}"'
+
+
+def _etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara el header If-None-Match con el ETag actual (comparación débil)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidatos
+
+
 @router.get("/", response_model=List[NotificacionResponseDTO], status_code=status.HTTP_200_OK)
 def listar_notificaciones(
     limit: int = Query(default=100, le=100, ge=1),
     offset: int = Query(default=0, ge=0),
-    session: Session = Depends(get_db),
+    campos: Tuple[str, ...] = Depends(get_campos),
+    session: Session = Depends(get_db_lectura),
     service: NotificacionService = Depends(get_notificacion_service)
 ):
     """
     Listar todas las notificaciones con paginación
     """
-    return service.listar_todas(session, limit, offset)
+    return NotificacionesJSONResponse(service.listar_todas(session, limit, offset, campos), campos)
 
 
 @router.get("/no-leidas", response_model=List[NotificacionResponseDTO], status_code=status.HTTP_200_OK)
 def listar_notificaciones_no_leidas(
-    session: Session = Depends(get_db),
+    campos: Tuple[str, ...] = Depends(get_campos),
+    session: Session = Depends(get_db_lectura),
     service: NotificacionService = Depends(get_notificacion_service)
 ):
     """
     Listar solo las notificaciones no leídas
     """
-    return service.listar_no_leidas(session)
+    return NotificacionesJSONResponse(service.listar_no_leidas(session, campos), campos)
 
 
 @router.get("/{id_notificacion}", response_model=NotificacionResponseDTO, status_code=status.HTTP_200_OK)
 def obtener_notificacion(
-    id_notificacion: UUID,
-    session: Session = Depends(get_db),
+    id_notificacion: int,
+    session: Session = Depends(get_db_lectura),
     service: NotificacionService = Depends(get_notificacion_service)
 ):
     """
@@ -61,12 +117,65 @@ def obtener_notificacion(
         )
     
 @router.get("/{id_usuario}/user/all", response_model=List[NotificacionResponseDTO], status_code=status.HTTP_200_OK)
-def obterner_todas_por_usuario(id_usuario:str, session: Session = Depends(get_db), service: NotificacionService = Depends(get_notificacion_service)):
-    return service.listar_dado_id_usuario(session, id_usuario)
+def obterner_todas_por_usuario(
+    id_usuario: str,
+    request: Request,
+    since_id: Optional[int] = Query(default=None, ge=0, description="Solo notificaciones con id mayor a este"),
+    since: Optional[datetime] = Query(default=None, description="Solo notificaciones creadas o leídas después de esta fecha"),
+    campos: Tuple[str, ...] = Depends(get_campos),
+    session: Session = Depends(get_db_lectura),
+    service: NotificacionService = Depends(get_notificacion_service)
+):
+    """
+    Listar las notificaciones de un usuario.
+    Soporta sincronización incremental (since_id / since), If-None-Match -> 304 y fields=.
+    """
+    etag = _etag_consulta(service.calcular_etag_usuario(session, id_usuario), campos, since_id, since)
+    if _etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return NotificacionesJSONResponse(
+        service.listar_dado_id_usuario(session, id_usuario, since_id, since, campos),
+        campos,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+@router.get("/{id_usuario}/user/no-leidas", response_model=List[NotificacionResponseDTO], status_code=status.HTTP_200_OK)
+def obtener_no_leidas_por_usuario(
+    id_usuario: str,
+    campos: Tuple[str, ...] = Depends(get_campos),
+    session: Session = Depends(get_db_lectura),
+    service: NotificacionService = Depends(get_notificacion_service)
+):
+    """
+    Listar las notificaciones no leídas de un usuario (servido desde cache;
+    con fields= se leen solo esas columnas, sin pasar por el cache)
+    """
+    return NotificacionesJSONResponse(service.listar_no_leidas_usuario(session, id_usuario, campos), campos)
 
 @router.get("/{id_empresa}/company/all", response_model=List[NotificacionResponseDTO], status_code=status.HTTP_200_OK)
-def obtener_todas_por_empresa(id_empresa:str, session: Session = Depends(get_db), service: NotificacionService = Depends(get_notificacion_service)):
-    return service.listar_dado_id_empresa(session, id_empresa)
+def obtener_todas_por_empresa(
+    id_empresa: str,
+    request: Request,
+    since_id: Optional[int] = Query(default=None, ge=0, description="Solo notificaciones con id mayor a este"),
+    since: Optional[datetime] = Query(default=None, description="Solo notificaciones creadas o leídas después de esta fecha"),
+    campos: Tuple[str, ...] = Depends(get_campos),
+    session: Session = Depends(get_db_lectura),
+    service: NotificacionService = Depends(get_notificacion_service)
+):
+    """
+    Listar las notificaciones de una empresa.
+    Soporta sincronización incremental (since_id / since), If-None-Match -> 304 y fields=.
+    """
+    etag = _etag_consulta(service.calcular_etag_empresa(session, id_empresa), campos, since_id, since)
+    if _etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return NotificacionesJSONResponse(
+        service.listar_dado_id_empresa(session, id_empresa, since_id, since, campos),
+        campos,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
 
 
 @router.post("/", response_model=NotificacionResponseDTO, status_code=status.HTTP_201_CREATED)
@@ -80,9 +189,97 @@ def crear_notificacion(
     """
     return service.create(session, notificacion)
 
+
+def _demasiados_items() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Máximo {BULK_MAX_ITEMS} notificaciones por lote"
+    )
+
+
+async def _leer_arreglo_json(request: Request) -> List[Any]:
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El cuerpo no es JSON válido")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Se esperaba un arreglo de notificaciones")
+    if len(items) > BULK_MAX_ITEMS:
+        raise _demasiados_items()
+    return items
+
+
+def _agregar_linea_ndjson(items: List[Any], linea: bytes) -> None:
+    """Agrega la notificación de una línea NDJSON; si la línea es inválida agrega su error"""
+    if not linea.strip():
+        return
+    if len(items) >= BULK_MAX_ITEMS:
+        raise _demasiados_items()
+    try:
+        items.append(json.loads(linea))
+    except ValueError as e:
+        items.append(ErrorItemDTO(indice=len(items), errores=[{"type": "json_invalid", "msg": str(e)}]))
+
+
+async def _leer_ndjson(request: Request) -> List[Any]:
+    """Procesa las líneas a medida que llegan, sin esperar el cuerpo completo"""
+    items: List[Any] = []
+    pendiente = b""
+    async for bloque in request.stream():
+        pendiente += bloque
+        *lineas, pendiente = pendiente.split(b"\n")
+        for linea in lineas:
+            _agregar_linea_ndjson(items, linea)
+    _agregar_linea_ndjson(items, pendiente)
+    return items
+
+
+async def _leer_items_bulk(request: Request) -> List[Any]:
+    """
+    Lee el cuerpo de /bulk: un arreglo JSON o NDJSON (una notificación por línea,
+    procesado a medida que llega). Las líneas NDJSON inválidas quedan como error.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        return await _leer_ndjson(request)
+    return await _leer_arreglo_json(request)
+
+
+@router.post("/bulk", response_model=NotificacionBulkResultadoDTO, status_code=status.HTTP_201_CREATED)
+async def crear_notificaciones_bulk(
+    request: Request,
+    todo_o_nada: bool = Query(default=False, description="Si algún elemento es inválido no se crea ninguno"),
+    session: Session = Depends(get_db),
+    service: NotificacionService = Depends(get_notificacion_service)
+):
+    """
+    Crear muchas notificaciones en una sola petición.
+    Acepta un arreglo JSON o NDJSON (Content-Type: application/x-ndjson).
+    """
+    items = await _leer_items_bulk(request)
+    resultado = await run_in_threadpool(service.create_many, session, items, todo_o_nada)
+
+    if todo_o_nada and resultado.errores:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content=resultado.model_dump()
+        )
+    return resultado
+
+@router.patch("/marcar-leidas", response_model=OperacionBulkResultadoDTO, status_code=status.HTTP_200_OK)
+def marcar_notificaciones_leidas(
+    body: IdsNotificacionesDTO,
+    session: Session = Depends(get_db),
+    service: NotificacionService = Depends(get_notificacion_service)
+):
+    """
+    Marcar varias notificaciones como leídas (resultado por id: marcada, ya_leida, no_encontrada)
+    """
+    return service.marcar_leidas_por_ids(session, body.ids)
+
 @router.patch("/{id_notificacion}/marcar-leida", response_model=NotificacionResponseDTO, status_code=status.HTTP_200_OK)
 def marcar_notificacion_leida(
-    id_notificacion: UUID,
+    id_notificacion: int,
     session: Session = Depends(get_db),
     service: NotificacionService = Depends(get_notificacion_service)
 ):
@@ -117,9 +314,21 @@ def marcar_todas_leidas_empresa(
     return service.marcar_todas_leidas_empresa(session, id_empresa)
 
 
+@router.delete("", response_model=OperacionBulkResultadoDTO, status_code=status.HTTP_200_OK)
+def eliminar_notificaciones(
+    body: IdsNotificacionesDTO,
+    session: Session = Depends(get_db),
+    service: NotificacionService = Depends(get_notificacion_service)
+):
+    """
+    Eliminar varias notificaciones (resultado por id: eliminada, no_encontrada)
+    """
+    return service.eliminar_por_ids(session, body.ids)
+
+
 @router.delete("/{id_notificacion}", status_code=status.HTTP_204_NO_CONTENT)
 def eliminar_notificacion(
-    id_notificacion: UUID,
+    id_notificacion: int,
     session: Session = Depends(get_db),
     service: NotificacionService = Depends(get_notificacion_service)
 ):
@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, Query, status
 from sqlmodel import Session
-from typing import Dict
+from typing import Dict, List, Optional
+import os
 
-from ..routes.deps.db_session import get_db
+from ..routes.deps.db_session import get_db, get_db_lectura
 from ..routes.deps.synapse_session import get_synapse_session
 from ..services.oferta_notificacion_service import OfertaNotificacionService
 from ..repositories.notificacion_repo import NotificacionRepository
 from ..repositories.oferta_notificada_repo import OfertaNotificadaRepository
 from ..repositories.oferta_analitycs_repo import OfertaAnalyticsRepository
+from ..repositories.perfil_features_repo import PerfilFeaturesRepository
+from ..repositories.oferta_skills_repo import OfertaSkillsRepository
+from ..repositories.estadisticas_repo import EstadisticasRepository
+from ..services.motor_relevancia import get_motor_relevancia
+from ..services.catalogo_skills import get_catalogo_skills
+from ..dto.perfil_dto import PerfilFeaturesDTO
 
 
 router = APIRouter(
@@ -28,7 +35,9 @@ def get_oferta_service(
     return OfertaNotificacionService(
         notif_repo,
         oferta_notif_repo,
-        oferta_analytics_repo
+        oferta_analytics_repo,
+        perfil_features_repo=PerfilFeaturesRepository(session),
+        oferta_skills_repo=OfertaSkillsRepository(session)
     )
 
 
@@ -49,7 +58,11 @@ def get_oferta_service(
     
     **Parámetros:**
     - dias_atras: Ventana de tiempo (1-30 días)
+    - min_coincidencias: Mínimo de skills de la oferta que debe tener un usuario para ser notificado
+    - usar_relevancia: Puntuar localmente (skills, modalidad, ubicación, experiencia, salario) contra `perfiles_features`
+    - top_k / umbral_relevancia: Con relevancia, notificar solo a los K mejores y/o por encima del umbral
     - solo_analizar: Si es true, solo analiza sin llamar al API ni crear notificaciones (útil para debug)
+    - modo_sombra: Si es true, resuelve la audiencia pero no escribe; devuelve el costo estimado
     """
 )
 def notificar_ofertas_compatibles(
@@ -59,10 +72,34 @@ def notificar_ofertas_compatibles(
         le=30,
         description="Ventana de tiempo en días para buscar ofertas nuevas (1-30 días)"
     ),
+    min_coincidencias: int = Query(
+        default=1,
+        ge=1,
+        description="Mínimo de skills coincidentes entre la oferta y el perfil"
+    ),
+    usar_relevancia: bool = Query(
+        default=os.getenv("RELEVANCIA_HABILITADA", "false").lower() == "true",
+        description="Usar el motor de relevancia local en lugar del API de perfiles"
+    ),
+    top_k: Optional[int] = Query(
+        default=None,
+        ge=1,
+        description="Con relevancia: máximo de usuarios a notificar por oferta"
+    ),
+    umbral_relevancia: float = Query(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description="Con relevancia: puntaje mínimo (0-1) para notificar"
+    ),
     solo_analizar: bool = Query(
         default=False,
         description="Solo analizar ofertas sin llamar al API ni crear notificaciones (debug)"
     ),
+    modo_sombra: bool = Query(
+        default=False,
+        description="Ejecutar el pipeline completo sin escribir y devolver un reporte de costo"
+    ),
     session: Session = Depends(get_db),
     service: OfertaNotificacionService = Depends(get_oferta_service)
 ):
@@ -72,12 +109,82 @@ def notificar_ofertas_compatibles(
     if solo_analizar:
         # Modo debug: solo analizar ofertas y extraer skills
         return service.analizar_ofertas_sin_notificar(session, dias_atras)
+    elif modo_sombra:
+        # Modo sombra: audiencia y costo de la ejecución real, sin escribir
+        return service.simular_procesamiento(
+            session,
+            dias_atras,
+            min_coincidencias,
+            usar_relevancia,
+            top_k,
+            umbral_relevancia
+        )
     else:
         # Modo normal: procesar todo
-        resultado = service.procesar_nuevas_ofertas(session, dias_atras)
+        resultado = service.procesar_nuevas_ofertas(
+            session,
+            dias_atras,
+            min_coincidencias,
+            usar_relevancia,
+            top_k,
+            umbral_relevancia
+        )
         return resultado
 
 
+@router.put(
+    "/perfiles-features",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Cargar atributos de perfiles para el motor de relevancia"
+)
+def cargar_perfiles_features(
+    perfiles: List[PerfilFeaturesDTO],
+    session: Session = Depends(get_db)
+):
+    """
+    Inserta o reemplaza perfiles en la tabla local `perfiles_features` y
+    reconstruye el motor de relevancia del proceso.
+    """
+    repo = PerfilFeaturesRepository(session)
+    actualizados = repo.reemplazar_muchos(perfiles)
+    motor = get_motor_relevancia(repo.get_all_filas, forzar=True)
+    return {
+        "perfiles_actualizados": actualizados,
+        "perfiles_en_motor": len(motor)
+    }
+
+
+@router.get(
+    "/catalogo-skills",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Versión del catálogo de skills cargado"
+)
+def obtener_catalogo_skills():
+    """Versión, tamaño y antigüedad del catálogo de skills de este worker."""
+    return get_catalogo_skills().estado()
+
+
+@router.post(
+    "/catalogo-skills/recargar",
+    response_model=Dict,
+    status_code=status.HTTP_200_OK,
+    summary="Recargar el catálogo de skills sin reiniciar"
+)
+def recargar_catalogo_skills():
+    """
+    Vuelve a leer el catálogo (tabla `skills_catalogo` o SKILLS_CATALOGO_ARCHIVO)
+    y reemplaza el matcher de este worker. Los demás workers lo toman al vencer
+    SKILLS_CATALOGO_TTL_SEGUNDOS.
+    """
+    catalogo = get_catalogo_skills()
+    version_anterior = catalogo.estado()["version"]
+    catalogo.recargar()
+    estado = catalogo.estado()
+    return {**estado, "version_anterior": version_anterior, "cambio": estado["version"] != version_anterior}
+
+
 @router.get(
     "/estadisticas",  # ← Simplificado
     response_model=Dict,
@@ -85,43 +192,14 @@ def notificar_ofertas_compatibles(
     summary="Obtener estadísticas de ofertas notificadas"
 )
 def obtener_estadisticas_ofertas(
-    session: Session = Depends(get_db)
+    session: Session = Depends(get_db_lectura)
 ):
     """
-    Obtiene estadísticas sobre ofertas notificadas.
+    Obtiene estadísticas sobre ofertas notificadas desde los agregados
+    precalculados (contadores y top-K), sin recorrer ofertas_notificadas.
     """
-    from sqlmodel import select, func, col
-    from ..models.oferta_notificada import OfertaNotificada
-    
-    # Total de ofertas notificadas
-    stmt_total = select(func.count()).select_from(OfertaNotificada)
-    total = session.exec(stmt_total).one()
-    
-    # Total de usuarios notificados (suma)
-    stmt_usuarios = select(func.sum(col(OfertaNotificada.usuarios_notificados)))
-    total_usuarios = session.exec(stmt_usuarios).one() or 0
-    
-    # Top ofertas por usuarios notificados
-    stmt_top = (
-        select(
-            col(OfertaNotificada.id_oferta),
-            col(OfertaNotificada.titulo),
-            col(OfertaNotificada.usuarios_notificados)
-        )
-        .order_by(col(OfertaNotificada.usuarios_notificados).desc())
-        .limit(10)
-    )
-    top_ofertas = session.exec(stmt_top).all()
-    
-    return {
-        "total_ofertas_notificadas": total,
-        "total_usuarios_notificados": total_usuarios,
-        "top_10_ofertas": [
-            {
-                "id_oferta": row[0],
-                "titulo": row[1],
-                "usuarios_notificados": row[2]
-            }
-            for row in top_ofertas
-        ]
-    }
\ No newline at end of file
+    repo = EstadisticasRepository(session)
+    if not repo.inicializadas():
+        # Aún no se ejecutó /mantenimiento/estadisticas/reconstruir: cálculo sobre la tabla
+        return repo.calcular_estadisticas_ofertas()
+    return repo.get_estadisticas_ofertas()
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlmodel import Session
 from typing import Dict
 
-from ..routes.deps.db_session import get_db
+from ..routes.deps.db_session import get_db, get_db_lectura
 from ..routes.deps.synapse_session import get_synapse_session
 from ..services.postulacion_notificacion_service import PostulacionNotificacionService
 from ..repositories.notificacion_repo import NotificacionRepository
 from ..repositories.convocatoria_snapshot_repo import ConvocatoriaSnapshotRepository
 from ..repositories.analytic_repo import NotificacionAnalyticsRepository
+from ..repositories.estadisticas_repo import EstadisticasRepository
 
 
 router = APIRouter(
@@ -46,6 +47,7 @@ def get_postulacion_service(
     2. Compara con el último snapshot guardado
     3. Si hay incremento, crea una notificación para la empresa
     4. Actualiza los snapshots con los valores actuales
+    5. Con `limpiar_inactivos=true`, elimina en el mismo proceso los snapshots de convocatorias inactivas
     
     **Ejemplo de uso:**
     - Llamar este endpoint cada hora desde un scheduler
@@ -53,6 +55,10 @@ def get_postulacion_service(
     """
 )
 def procesar_notificaciones_postulaciones(
+    limpiar_inactivos: bool = Query(
+        default=False,
+        description="Eliminar también los snapshots de convocatorias que ya no están activas"
+    ),
     session: Session = Depends(get_db),
     service: PostulacionNotificacionService = Depends(get_postulacion_service)
 ):
@@ -62,7 +68,7 @@ def procesar_notificaciones_postulaciones(
     Returns:
         Resumen con cantidad de notificaciones creadas y detalle por convocatoria
     """
-    resultado = service.procesar_nuevas_postulaciones(session)
+    resultado = service.procesar_nuevas_postulaciones(session, limpiar_inactivos)
     return resultado
 
 
@@ -93,38 +99,17 @@ def obtener_resumen_convocatorias(
     summary="Obtener estadísticas de snapshots guardados"
 )
 def obtener_estadisticas_snapshots(
-    session: Session = Depends(get_db)
+    session: Session = Depends(get_db_lectura)
 ):
     """
-    Obtiene estadísticas sobre los snapshots de convocatorias guardados.
+    Obtiene estadísticas sobre los snapshots de convocatorias guardados desde
+    los agregados precalculados, sin GROUP BY sobre convocatoria_snapshots.
     """
-    from sqlmodel import select, func, col
-    from ..models.convocatoria_snapshot import ConvocatoriaSnapshot
-    
-    # Total de snapshots
-    stmt_total = select(func.count()).select_from(ConvocatoriaSnapshot)
-    total = session.exec(stmt_total).one()
-    
-    # Snapshots por empresa - usar col() para forzar tipo correcto
-    stmt_por_empresa = (
-        select(
-            col(ConvocatoriaSnapshot.id_empresa),
-            func.count().label('total')
-        )
-        .select_from(ConvocatoriaSnapshot)
-        .group_by(col(ConvocatoriaSnapshot.id_empresa))
-        .order_by(func.count().desc())
-        .limit(10)
-    )
-    por_empresa = session.exec(stmt_por_empresa).all()
-    
-    return {
-        "total_snapshots": total,
-        "top_empresas": [
-            {"id_empresa": row[0], "convocatorias_activas": row[1]}
-            for row in por_empresa
-        ]
-    }
+    repo = EstadisticasRepository(session)
+    if not repo.inicializadas():
+        # Aún no se ejecutó /mantenimiento/estadisticas/reconstruir: cálculo sobre la tabla
+        return repo.calcular_estadisticas_snapshots()
+    return repo.get_estadisticas_snapshots()
 
 
 @router.delete(
@@ -134,37 +119,15 @@ def obtener_estadisticas_snapshots(
     description="""
     Elimina snapshots de convocatorias que ya no están en la vista activa.
     Útil para mantener la tabla limpia.
+    
+    También puede hacerse en cada corrida con `POST /procesamiento/notificar-postulaciones?limpiar_inactivos=true`.
     """
 )
 def limpiar_snapshots_inactivos(
-    session: Session = Depends(get_db),
-    synapse_session: Session = Depends(get_synapse_session)
+    dry_run: bool = Query(default=False, description="Solo contar los snapshots que se eliminarían"),
+    service: PostulacionNotificacionService = Depends(get_postulacion_service)
 ):
     """
     Limpia snapshots de convocatorias que ya no están activas.
     """
-    from ..repositories.convocatoria_snapshot_repo import ConvocatoriaSnapshotRepository
-    from ..repositories.analytic_repo import NotificacionAnalyticsRepository
-    
-    snapshot_repo = ConvocatoriaSnapshotRepository(session)
-    analytics_repo = NotificacionAnalyticsRepository(synapse_session)
-    
-    # Obtener IDs de convocatorias activas
-    convocatorias_activas = analytics_repo.get_postulados_por_convocatoria()
-    ids_activos = {conv['id_convocatoria'] for conv in convocatorias_activas}
-    
-    # Obtener todos los snapshots
-    todos_snapshots = snapshot_repo.get_all_snapshots()
-    
-    # Eliminar los que ya no están activos
-    eliminados = 0
-    for snapshot in todos_snapshots:
-        if snapshot.id_convocatoria not in ids_activos:
-            snapshot_repo.eliminar_snapshot(snapshot.id_convocatoria)
-            eliminados += 1
-    
-    return {
-        "mensaje": f"Se limpiaron {eliminados} snapshots de convocatorias inactivas",
-        "snapshots_eliminados": eliminados,
-        "snapshots_restantes": len(todos_snapshots) - eliminados
-    }
\ No newline at end of file
+    return service.limpiar_snapshots_inactivos(dry_run)
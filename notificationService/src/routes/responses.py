@@ -0,0 +1,18 @@
+from typing import Any, Tuple
+from fastapi.responses import JSONResponse
+from ..dto.notificacion_dto import filas_a_json, CAMPOS_RESPUESTA
+
+
+class NotificacionesJSONResponse(JSONResponse):
+    """
+    Respuesta para listados de notificaciones leídos como filas planas.
+    Serializa directamente con pydantic-core, sin pasar por response_model.
+    Con `campos` solo serializa esas columnas (ver parsear_campos).
+    """
+
+    def __init__(self, content: Any, campos: Tuple[str, ...] = CAMPOS_RESPUESTA, **kwargs: Any):
+        self.campos = campos
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return filas_a_json(content, self.campos)
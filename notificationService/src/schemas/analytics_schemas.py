@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
+from datetime import datetime
 
 class PostuladoConvocatoria(BaseModel):
     id_empresa: int
@@ -15,3 +16,29 @@ class CantidadResponse(BaseModel):
 
 class URLResponse(BaseModel):
     url: str
+
+
+class VolumenDiaTipo(BaseModel):
+    dia: str
+    tipo_notificacion: str
+    creadas: int
+    leidas: int
+    tasa_lectura: Optional[float] = None
+
+class VolumenesResponse(BaseModel):
+    desde: datetime
+    hasta: datetime
+    data: List[VolumenDiaTipo]
+
+class ResumenLectura(BaseModel):
+    creadas: int
+    leidas: int
+    tasa_lectura: Optional[float] = None
+    p50_segundos_hasta_lectura: Optional[float] = None
+    p90_segundos_hasta_lectura: Optional[float] = None
+
+class LecturaResponse(ResumenLectura):
+    desde: datetime
+    hasta: datetime
+    buckets_segundos: List[int]
+    por_tipo: Dict[str, ResumenLectura]
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+from ..config.db import get_engine
+from ..config.entorno import cargar_entorno
+from sqlmodel import Session
+
+from .extraccion_skills import SKILLS_CONOCIDAS, MatcherSkills, get_matcher, instalar_matcher
+
+cargar_entorno()
+
+
+def cargar_desde_archivo(ruta: str) -> Dict[str, List[str]]:
+    """
+    Lee un catálogo JSON. Acepta una lista de nombres, una lista de
+    {"nombre": ..., "sinonimos": [...]} o un objeto {nombre: [sinónimos]}.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+
+    if isinstance(datos, dict):
+        return {nombre: list(sinonimos or []) for nombre, sinonimos in datos.items()}
+
+    catalogo: Dict[str, List[str]] = {}
+    for item in datos:
+        if isinstance(item, str):
+            catalogo[item] = []
+        else:
+            catalogo[item["nombre"]] = list(item.get("sinonimos") or [])
+    return catalogo
+
+
+def cargar_desde_bd() -> Dict[str, List[str]]:
+    """Lee la tabla skills_catalogo con una sesión propia"""
+    from ..repositories.skill_catalogo_repo import SkillCatalogoRepository
+
+    with Session(get_engine()) as session:
+        return SkillCatalogoRepository(session).get_catalogo()
+
+
+def cargar_catalogo() -> Dict[str, List[str]]:
+    """
+    Fuente del catálogo: SKILLS_CATALOGO_ARCHIVO si está definido, si no la
+    tabla skills_catalogo y, si está vacía, la lista semilla.
+    """
+    ruta = os.getenv("SKILLS_CATALOGO_ARCHIVO")
+    catalogo = cargar_desde_archivo(ruta) if ruta else cargar_desde_bd()
+    return catalogo or {skill: [] for skill in SKILLS_CONOCIDAS}
+
+
+class CatalogoSkills:
+    """
+    Recarga versionada del catálogo de skills.
+
+    El matcher nuevo se compila fuera de cualquier lock que use la extracción y
+    se instala con un solo cambio de referencia: las extracciones en curso
+    terminan con la versión que tomaron y las siguientes usan la nueva. Cada
+    worker del servidor refresca su copia al vencer SKILLS_CATALOGO_TTL_SEGUNDOS,
+    en un hilo de fondo, o al instante con el endpoint de recarga.
+    """
+
+    def __init__(self, cargador: Callable[[], Dict[str, List[str]]] = cargar_catalogo, ttl: Optional[int] = None):
+        self.cargador = cargador
+        self.ttl = ttl if ttl is not None else int(os.getenv("SKILLS_CATALOGO_TTL_SEGUNDOS", "300"))
+        self.cargado: Optional[float] = None
+        self.ultimo_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._recargando = False
+
+    def recargar(self) -> MatcherSkills:
+        """Carga y compila el catálogo; solo instala el matcher si cambió la versión"""
+        with self._lock:
+            try:
+                nuevo = MatcherSkills(self.cargador())
+            except Exception as e:
+                # Se conserva el matcher vigente; se reintenta al vencer el TTL
+                self.ultimo_error = str(e)
+                self.cargado = time.monotonic()
+                print(f"⚠️  No se pudo cargar el catálogo de skills: {e}")
+                return get_matcher()
+
+            self.ultimo_error = None
+            self.cargado = time.monotonic()
+            if nuevo.version != get_matcher().version:
+                instalar_matcher(nuevo)
+                print(f"✅ Catálogo de skills {nuevo.version} instalado ({len(nuevo)} skills)")
+            return get_matcher()
+
+    def vigente(self) -> MatcherSkills:
+        """
+        Matcher a usar ahora. Nunca espera una recarga: si el catálogo venció,
+        la lanza en segundo plano y devuelve el matcher actual.
+        """
+        vencido = self.cargado is None or time.monotonic() - self.cargado >= self.ttl
+        # Sin bloquear: si el lock está tomado ya hay una recarga en curso
+        if vencido and self._lock.acquire(blocking=False):
+            try:
+                if not self._recargando:
+                    self._recargando = True
+                    threading.Thread(target=self._recargar_fondo, name="catalogo-skills", daemon=True).start()
+            finally:
+                self._lock.release()
+        return get_matcher()
+
+    def _recargar_fondo(self) -> None:
+        try:
+            self.recargar()
+        finally:
+            with self._lock:
+                self._recargando = False
+
+    def estado(self) -> Dict[str, object]:
+        matcher = get_matcher()
+        return {
+            "version": matcher.version,
+            "skills": len(matcher),
+            "alias": len(matcher.alias),
+            "segundos_desde_carga": round(time.monotonic() - self.cargado, 1) if self.cargado else None,
+            "ultimo_error": self.ultimo_error
+        }
+
+
+_catalogo: Optional[CatalogoSkills] = None
+_catalogo_lock = threading.Lock()
+
+
+def get_catalogo_skills() -> CatalogoSkills:
+    """Catálogo compartido del proceso"""
+    global _catalogo
+    if _catalogo is None:
+        with _catalogo_lock:
+            if _catalogo is None:
+                _catalogo = CatalogoSkills()
+    return _catalogo
@@ -0,0 +1,360 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..config.db import get_engine
+from ..config.entorno import cargar_entorno
+from sqlmodel import Session
+
+from ..exception.insercion_parcial import InsercionParcial
+from ..repositories.notificacion_repo import NotificacionRepository, TAMANO_LOTE_INSERT
+from .rendimiento_escritura import get_rendimiento_escritura
+
+cargar_entorno()
+
+
+class TokenBucket:
+    """Limita filas por segundo permitiendo ráfagas de hasta `capacidad` filas"""
+
+    def __init__(self, tasa: float, capacidad: float):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.tokens = capacidad
+        self._ultimo = time.monotonic()
+
+    def _recargar(self) -> None:
+        ahora = time.monotonic()
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def consumir(self, n: int) -> float:
+        """Bloquea hasta disponer de `n` tokens. Devuelve los segundos esperados"""
+        n = min(n, self.capacidad)
+        esperado = 0.0
+        while True:
+            self._recargar()
+            if self.tokens >= n:
+                self.tokens -= n
+                return esperado
+            espera = (n - self.tokens) / self.tasa
+            time.sleep(espera)
+            esperado += espera
+
+
+class SolicitudEscritura:
+    """Filas encoladas por un productor; se completa cuando todas se escribieron o fallaron"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.escritas = 0
+        self.fallidas = 0
+        self.errores: List[str] = []
+        self.cancelada = False
+        self._tomada = False
+        self._estado = threading.Lock()
+        self._listo = threading.Event()
+        if total == 0:
+            self._listo.set()
+
+    def cancelar(self) -> bool:
+        """
+        Descarta las filas si la cola todavía no las tomó: ninguna se escribirá.
+        Devuelve False si ya se están escribiendo (o se escribieron); en ese caso
+        hay que esperar su resultado.
+        """
+        with self._estado:
+            if self._tomada:
+                return False
+            self.cancelada = True
+        self._listo.set()
+        return True
+
+    def _tomar(self) -> bool:
+        # Solo lo llama el hilo de la cola, al sacar las filas para escribirlas
+        with self._estado:
+            if not self.cancelada:
+                self._tomada = True
+            return self._tomada
+
+    def _registrar(self, escritas: int, fallidas: int, error: Optional[str] = None) -> None:
+        # Solo lo llama el hilo de la cola
+        self.escritas += escritas
+        self.fallidas += fallidas
+        if error and error not in self.errores:
+            self.errores.append(error)
+        if self.escritas + self.fallidas >= self.total:
+            self._listo.set()
+
+    def esperar(self, timeout: Optional[float] = None) -> int:
+        """Espera a que se procesen todas las filas. Devuelve cuántas se escribieron"""
+        if not self._listo.wait(timeout):
+            raise TimeoutError(f"Escritura pendiente: {self.escritas + self.fallidas}/{self.total} filas")
+        return self.escritas
+
+
+class ColaEscrituraNotificaciones:
+    """
+    Cola interna para las escrituras masivas de notificaciones (fan-out de ofertas).
+
+    - Carriles por prioridad (PRIORIDAD_MAP): siempre se vacía primero el más alto
+    - Token bucket de filas/segundo: el fan-out no satura la BD que comparten los
+      endpoints interactivos
+    - Lotes por tamaño o por tiempo: se escribe al juntar `tamano_lote` filas o
+      cuando la fila más antigua lleva `espera_lote` segundos en la cola. Las filas
+      de una solicitud no se reparten entre lotes: se escriben en una sola
+      transacción, o se descartan enteras si se cancela antes (ver cancelar)
+    - Contrapresión: `encolar` bloquea si hay más de `max_pendientes` filas en cola
+
+    Un único hilo escribe, con su propia sesión, mediante insertar_lote.
+    """
+
+    def __init__(
+        self,
+        engine,
+        filas_por_segundo: float,
+        tamano_lote: int = TAMANO_LOTE_INSERT,
+        espera_lote: float = 0.2,
+        max_pendientes: int = 20000
+    ):
+        self.engine = engine
+        self.tamano_lote = tamano_lote
+        self.espera_lote = espera_lote
+        self.max_pendientes = max_pendientes
+        self.bucket = TokenBucket(filas_por_segundo, max(tamano_lote, 1))
+
+        self._carriles: Dict[int, Deque[Tuple[List[Dict[str, Any]], SolicitudEscritura, float]]] = {}
+        self._pendientes = 0
+        self._condicion = threading.Condition()
+        self._cerrada = False
+        self._hilo: Optional[threading.Thread] = None
+        self._metricas: Dict[str, float] = {
+            "filas_encoladas": 0, "filas_escritas": 0, "filas_fallidas": 0, "lotes": 0,
+            "bloqueos_productor": 0, "segundos_bloqueo_productor": 0.0,
+            "segundos_espera_tokens": 0.0, "segundos_escritura": 0.0
+        }
+        self._encoladas_carril: Dict[int, int] = {}
+
+    def iniciar(self) -> "ColaEscrituraNotificaciones":
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._procesar, name="cola-escritura", daemon=True)
+            self._hilo.start()
+        return self
+
+    def encolar(self, filas: List[Dict[str, Any]], prioridad: int) -> SolicitudEscritura:
+        """
+        Encola filas (dicts con las columnas de Notificacion, salvo fecha_creacion,
+        que se fija al escribirlas) en el carril de su prioridad. Bloquea mientras la
+        cola esté llena (contrapresión).
+        """
+        solicitud = SolicitudEscritura(len(filas))
+        if not filas:
+            return solicitud
+
+        with self._condicion:
+            if self._cerrada:
+                raise RuntimeError("La cola de escritura está cerrada")
+            if self._pendientes and self._pendientes + len(filas) > self.max_pendientes:
+                inicio = time.monotonic()
+                self._metricas["bloqueos_productor"] += 1
+                while self._pendientes and self._pendientes + len(filas) > self.max_pendientes:
+                    self._condicion.wait()
+                self._metricas["segundos_bloqueo_productor"] += time.monotonic() - inicio
+
+            self._carriles.setdefault(prioridad, deque()).append((filas, solicitud, time.monotonic()))
+            self._pendientes += len(filas)
+            self._metricas["filas_encoladas"] += len(filas)
+            self._encoladas_carril[prioridad] = self._encoladas_carril.get(prioridad, 0) + len(filas)
+            self._condicion.notify_all()
+        return solicitud
+
+    def cerrar(self, timeout: Optional[float] = None) -> None:
+        """Deja de aceptar filas y espera a que se escriban las pendientes"""
+        with self._condicion:
+            self._cerrada = True
+            self._condicion.notify_all()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    def _mas_antigua(self) -> float:
+        return min(carril[0][2] for carril in self._carriles.values() if carril)
+
+    def _tomar_lote(self) -> List[Tuple[List[Dict[str, Any]], SolicitudEscritura]]:
+        """
+        Saca solicitudes enteras hasta juntar tamano_lote filas (al menos una), del
+        carril de mayor prioridad hacia abajo. Las canceladas se descartan.
+        """
+        lote = []
+        filas_lote = 0
+        for prioridad in sorted(self._carriles, reverse=True):
+            carril = self._carriles[prioridad]
+            while carril and filas_lote < self.tamano_lote:
+                filas, solicitud, _ = carril.popleft()
+                self._pendientes -= len(filas)
+                if solicitud._tomar():
+                    lote.append((filas, solicitud))
+                    filas_lote += len(filas)
+            if filas_lote >= self.tamano_lote:
+                break
+        return lote
+
+    def _procesar(self) -> None:
+        while True:
+            with self._condicion:
+                while not self._pendientes and not self._cerrada:
+                    self._condicion.wait()
+                if not self._pendientes and self._cerrada:
+                    return
+                # Lote por tiempo: se espera a llenarlo mientras la fila más antigua no venza
+                limite = self._mas_antigua() + self.espera_lote
+                while self._pendientes < self.tamano_lote and not self._cerrada:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+                lote = self._tomar_lote()
+                self._condicion.notify_all()  # libera productores bloqueados
+
+            if lote:
+                self._consumir_tokens(sum(len(filas) for filas, _ in lote))
+                self._escribir(lote)
+
+    def _consumir_tokens(self, filas: int) -> None:
+        # Una solicitud puede superar la capacidad del bucket: se consume por tramos
+        while filas > 0:
+            tramo = min(filas, self.bucket.capacidad)
+            self._metricas["segundos_espera_tokens"] += self.bucket.consumir(tramo)
+            filas -= tramo
+
+    def _escribir(self, lote: List[Tuple[List[Dict[str, Any]], SolicitudEscritura]]) -> None:
+        """
+        Escribe el lote en una transacción. Si falla, se reintenta cada solicitud
+        fallida en su propia transacción: una fila inválida solo hace fallar a su solicitud.
+        """
+        # Pase lo que pase, cada solicitud del lote queda completada (escrita o fallida)
+        # y una excepción no termina el hilo de la cola
+        inicio = time.perf_counter()
+        errores: List[Optional[str]] = ["Lote no escrito"] * len(lote)
+        try:
+            errores = self._escribir_transaccion(lote)
+            fallidas = [i for i, error in enumerate(errores) if error]
+            if fallidas and len(lote) > 1:
+                print(f"⚠️  Se reintentan por separado {len(fallidas)} solicitudes del lote fallido")
+                for i in fallidas:
+                    errores[i] = self._escribir_transaccion([lote[i]])[0]
+        finally:
+            self._metricas["lotes"] += 1
+            self._metricas["segundos_escritura"] += time.perf_counter() - inicio
+            for (filas, solicitud), error in zip(lote, errores):
+                self._metricas["filas_fallidas" if error else "filas_escritas"] += len(filas)
+                if error:
+                    solicitud._registrar(0, len(filas), error)
+                else:
+                    solicitud._registrar(len(filas), 0)
+
+    def _escribir_transaccion(
+        self, lote: List[Tuple[List[Dict[str, Any]], SolicitudEscritura]]
+    ) -> List[Optional[str]]:
+        """
+        Inserta las filas de las solicitudes en una transacción. Devuelve el error de
+        cada solicitud, o None si se escribió. fecha_creacion es la del momento de la
+        inserción: con la del encolado, filas escritas tarde quedarían detrás de los
+        watermarks por fecha (rollups, sincronización con `since`) y no se verían nunca.
+        """
+        ahora = datetime.utcnow()
+        filas = [
+            {**fila, "fecha_creacion": ahora}
+            for filas_solicitud, _ in lote for fila in filas_solicitud
+        ]
+        inicio = time.perf_counter()
+        try:
+            with Session(self.engine) as session:
+                try:
+                    NotificacionRepository(session).insertar_lote(session, filas)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+        except Exception as e:
+            print(f"❌ Error escribiendo lote de {len(filas)} notificaciones: {e}")
+            error = str(e) or type(e).__name__
+            if not isinstance(e, InsercionParcial):
+                return [error] * len(lote)
+            # Con shards, las solicitudes de los shards que confirmaron quedan escritas
+            # (las filas de una solicitud son de una empresa: van todas a un shard)
+            errores: List[Optional[str]] = []
+            posicion = 0
+            for filas_solicitud, _ in lote:
+                ids = e.ids[posicion:posicion + len(filas_solicitud)]
+                posicion += len(filas_solicitud)
+                errores.append(error if None in ids else None)
+            filas = [fila for fila, id_ in zip(filas, e.ids) if id_ is not None]
+        else:
+            errores = [None] * len(lote)
+        self._despues_de_escribir(filas, time.perf_counter() - inicio)
+        return errores
+
+    def _despues_de_escribir(self, filas: List[Dict[str, Any]], segundos: float) -> None:
+        if not filas:
+            return
+        try:
+            get_rendimiento_escritura().registrar(len(filas), segundos)
+            with Session(self.engine) as session:
+                NotificacionRepository(session).invalidar_cache_usuarios(
+                    [f["id_usuario"] for f in filas], [f["id_empresa"] for f in filas]
+                )
+        except Exception as e:
+            print(f"⚠️  Lote de {len(filas)} notificaciones escrito, pero falló lo posterior: {e}")
+
+    def metricas(self) -> Dict[str, Any]:
+        """Estado de la cola: pendientes por carril, contrapresión y throughput"""
+        with self._condicion:
+            carriles = {
+                str(prioridad): {
+                    "pendientes": sum(len(filas) for filas, _, _ in carril),
+                    "encoladas": self._encoladas_carril.get(prioridad, 0)
+                }
+                for prioridad, carril in sorted(self._carriles.items(), reverse=True)
+            }
+            antiguedad = time.monotonic() - self._mas_antigua() if self._pendientes else 0.0
+            pendientes = self._pendientes
+        return {
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self._metricas.items()},
+            "pendientes": pendientes,
+            "max_pendientes": self.max_pendientes,
+            "antiguedad_max_segundos": round(antiguedad, 3),
+            "filas_por_segundo_limite": self.bucket.tasa,
+            "tamano_lote": self.tamano_lote,
+            "carriles": carriles
+        }
+
+
+_cola: Optional[ColaEscrituraNotificaciones] = None
+_cola_lock = threading.Lock()
+
+
+def get_cola_escritura() -> ColaEscrituraNotificaciones:
+    """
+    Cola compartida del proceso, configurada con COLA_ESCRITURA_FILAS_POR_SEGUNDO,
+    COLA_ESCRITURA_TAMANO_LOTE, COLA_ESCRITURA_ESPERA_MS y COLA_ESCRITURA_MAX_PENDIENTES.
+    """
+    global _cola
+    if _cola is None:
+        with _cola_lock:
+            if _cola is None:
+                _cola = ColaEscrituraNotificaciones(
+                    get_engine(),
+                    filas_por_segundo=float(os.getenv("COLA_ESCRITURA_FILAS_POR_SEGUNDO", "500")),
+                    tamano_lote=int(os.getenv("COLA_ESCRITURA_TAMANO_LOTE", str(TAMANO_LOTE_INSERT))),
+                    espera_lote=int(os.getenv("COLA_ESCRITURA_ESPERA_MS", "200")) / 1000,
+                    max_pendientes=int(os.getenv("COLA_ESCRITURA_MAX_PENDIENTES", "20000"))
+                ).iniciar()
+    return _cola
+
+
+def cerrar_cola_escritura(timeout: Optional[float] = None) -> None:
+    """Vacía y detiene la cola si se llegó a crear (apagado del servidor)"""
+    if _cola is not None:
+        _cola.cerrar(timeout)
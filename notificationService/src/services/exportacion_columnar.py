@@ -0,0 +1,287 @@
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config.entorno import cargar_entorno
+
+from ..repositories.exportacion_repo import ExportacionRepository
+from ..repositories.rollup_repo import RollupRepository
+
+cargar_entorno()
+
+MEDIA_TYPE_ARROW = "application/vnd.apache.arrow.stream"
+
+# Evita dos exportaciones Parquet simultáneas de la misma tabla en el mismo proceso
+_exportaciones_en_curso: set = set()
+_exportaciones_lock = threading.Lock()
+
+
+class ExportacionEnCurso(Exception):
+    pass
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # dependencia opcional
+    except ImportError as e:
+        raise RuntimeError("La exportación columnar requiere el paquete 'pyarrow'") from e
+    return pyarrow
+
+
+def _tipo_arrow(pa, columna):
+    try:
+        tipo_python = columna.type.python_type
+    except NotImplementedError:
+        tipo_python = str
+    if tipo_python is datetime:
+        return pa.timestamp("us")
+    if tipo_python is date:
+        return pa.date32()
+    if tipo_python is bool:
+        return pa.bool_()
+    if tipo_python is int:
+        return pa.int64()
+    if tipo_python is float:
+        return pa.float64()
+    return pa.string()
+
+
+def esquema_arrow(nombre: str):
+    """Esquema Arrow derivado de las columnas de la tabla"""
+    pa = _pyarrow()
+    tabla, _ = ExportacionRepository.tabla(nombre)
+    return pa.schema([
+        pa.field(c.name, _tipo_arrow(pa, c), nullable=c.nullable)
+        for c in tabla.columns
+    ])
+
+
+def _record_batch(pa, esquema, filas: List[Tuple[Any, ...]]):
+    columnas = list(zip(*filas))
+    arrays = []
+    for campo, valores in zip(esquema, columnas):
+        try:
+            arrays.append(pa.array(valores, type=campo.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if campo.type != pa.string():
+                raise
+            # Columnas de texto con valores de otro tipo en BD
+            arrays.append(pa.array(
+                [None if v is None else str(v) for v in valores], type=campo.type
+            ))
+    return pa.RecordBatch.from_arrays(arrays, schema=esquema)
+
+
+class _BufferSalida:
+    """Destino en memoria del writer IPC; se vacía tras cada lote para no acumular"""
+
+    def __init__(self):
+        self.partes: List[bytes] = []
+        self.closed = False
+
+    def write(self, datos) -> int:
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+class ExportacionColumnarService:
+    """
+    Exporta tablas operativas a formatos columnares (Arrow IPC y Parquet) para
+    análisis fuera de la base de datos. Las filas se leen por keyset en lotes de
+    `tamano_lote` y cada lote se convierte en un RecordBatch que se escribe y se
+    descarta, así la memoria queda acotada por el lote y no por la tabla.
+    """
+
+    def __init__(self, exportacion_repo: ExportacionRepository, rollup_repo: Optional[RollupRepository] = None):
+        self.exportacion_repo = exportacion_repo
+        self.rollup_repo = rollup_repo
+
+    @staticmethod
+    def en_curso(nombre: str) -> bool:
+        return nombre in _exportaciones_en_curso
+
+    @staticmethod
+    def nombre_watermark(nombre: str) -> str:
+        return f"exportacion_{nombre}"
+
+    def lotes_arrow(
+        self,
+        nombre: str,
+        desde_id: int = 0,
+        hasta_id: Optional[int] = None,
+        tamano_lote: int = 10000
+    ) -> Iterator[Any]:
+        pa = _pyarrow()
+        esquema = esquema_arrow(nombre)
+        for _, filas in self.exportacion_repo.lotes(nombre, desde_id, hasta_id, tamano_lote):
+            yield _record_batch(pa, esquema, filas)
+
+    def stream_ipc(
+        self,
+        nombre: str,
+        desde_id: int = 0,
+        hasta_id: Optional[int] = None,
+        tamano_lote: int = 10000
+    ) -> Iterator[bytes]:
+        """
+        Stream Arrow IPC (formato streaming) listo para enviar por HTTP: un
+        fragmento de bytes por lote, con el esquema al inicio y el fin de stream
+        al cerrar. Se lee con `pyarrow.ipc.open_stream`.
+        """
+        pa = _pyarrow()
+        esquema = esquema_arrow(nombre)
+        buffer = _BufferSalida()
+        writer = pa.ipc.new_stream(pa.PythonFile(buffer, mode="w"), esquema)
+        try:
+            for lote in self.lotes_arrow(nombre, desde_id, hasta_id, tamano_lote):
+                writer.write_batch(lote)
+                yield buffer.vaciar()
+        finally:
+            writer.close()
+        yield buffer.vaciar()
+
+    def exportar_parquet(
+        self,
+        nombre: str,
+        incremental: bool = True,
+        directorio: Optional[str] = None,
+        tamano_lote: int = 10000,
+        filas_por_archivo: int = 500000
+    ) -> Dict[str, Any]:
+        """
+        Escribe la tabla (o, si `incremental`, las filas nuevas desde el último
+        watermark) como una partición Parquet:
+
+            <directorio>/<tabla>/exportacion=<AAAAMMDDTHHMMSSffffff>/parte-00000.parquet
+
+        Cada lote es un row group y se abre un archivo nuevo cada `filas_por_archivo`
+        filas. La partición se escribe en un directorio temporal que se renombra al
+        terminar, y el watermark avanza en la misma transacción que lo bloqueó al
+        inicio: un fallo a mitad no publica archivos parciales ni pierde filas.
+
+        El incremental es por clave (filas insertadas); las actualizaciones de filas
+        ya exportadas requieren una exportación completa.
+        """
+        if self.rollup_repo is None:
+            raise ValueError("exportar_parquet requiere rollup_repo para el watermark")
+
+        with _exportaciones_lock:
+            if nombre in _exportaciones_en_curso:
+                raise ExportacionEnCurso(f"Ya hay una exportación de '{nombre}' en curso.")
+            _exportaciones_en_curso.add(nombre)
+
+        temporal = None
+        try:
+            _pyarrow()
+            inicio = time.perf_counter()
+            # Bloquea el watermark: serializa exportaciones entre workers
+            watermark = self.rollup_repo.get_watermark(self.nombre_watermark(nombre), bloquear=True)
+            desde_id = watermark.ultimo_id if incremental else 0
+            hasta_id = self.exportacion_repo.max_id(nombre)
+
+            directorio = directorio or os.getenv("EXPORTACION_DIR", "exportaciones")
+            marca = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+            destino = os.path.join(directorio, nombre, f"exportacion={marca}")
+            temporal = destino + ".tmp"
+            os.makedirs(temporal, exist_ok=True)
+
+            archivos, filas_totales = self._escribir_partes(
+                nombre, desde_id, hasta_id, tamano_lote, temporal, filas_por_archivo
+            )
+
+            if archivos:
+                os.replace(temporal, destino)
+                temporal = None
+            else:
+                destino = None
+
+            if filas_totales:
+                watermark.ultimo_id = max(watermark.ultimo_id, hasta_id)
+                watermark.fecha_actualizacion = datetime.utcnow()
+                self.rollup_repo.session.add(watermark)
+            self.rollup_repo.session.commit()
+
+            duracion = round(time.perf_counter() - inicio, 3)
+            print(f"📦 Exportación Parquet de {nombre}: {filas_totales} filas en {len(archivos)} archivos, {duracion}s")
+
+            return {
+                "tabla": nombre,
+                "incremental": incremental,
+                "desde_id": desde_id,
+                "hasta_id": hasta_id,
+                "filas": filas_totales,
+                "directorio": destino,
+                "archivos": archivos,
+                "duracion_segundos": duracion
+            }
+        except Exception:
+            self.rollup_repo.session.rollback()
+            raise
+        finally:
+            if temporal is not None:
+                shutil.rmtree(temporal, ignore_errors=True)
+            with _exportaciones_lock:
+                _exportaciones_en_curso.discard(nombre)
+
+    def _escribir_partes(
+        self,
+        nombre: str,
+        desde_id: int,
+        hasta_id: int,
+        tamano_lote: int,
+        directorio: str,
+        filas_por_archivo: int
+    ) -> Tuple[List[str], int]:
+        """Escribe los lotes en parte-NNNNN.parquet, uno nuevo cada `filas_por_archivo` filas"""
+        import pyarrow.parquet as pq
+
+        esquema = esquema_arrow(nombre)
+        archivos: List[str] = []
+        writer = None
+        filas_archivo = filas_totales = 0
+        try:
+            for lote in self.lotes_arrow(nombre, desde_id, hasta_id, tamano_lote):
+                if writer is None or filas_archivo >= filas_por_archivo:
+                    if writer is not None:
+                        writer.close()
+                    archivo = f"parte-{len(archivos):05d}.parquet"
+                    writer = pq.ParquetWriter(os.path.join(directorio, archivo), esquema)
+                    archivos.append(archivo)
+                    filas_archivo = 0
+                writer.write_batch(lote)
+                filas_archivo += lote.num_rows
+                filas_totales += lote.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return archivos, filas_totales
+
+    def estado(self) -> List[Dict[str, Any]]:
+        """Watermark de exportación incremental por tabla"""
+        if self.rollup_repo is None:
+            raise ValueError("estado requiere rollup_repo")
+        watermarks = {w.nombre: w for w in self.rollup_repo.get_watermarks()}
+        resultado = []
+        for nombre in ExportacionRepository.nombres():
+            w = watermarks.get(self.nombre_watermark(nombre))
+            resultado.append({
+                "tabla": nombre,
+                "ultimo_id_exportado": w.ultimo_id if w else 0,
+                "fecha_actualizacion": w.fecha_actualizacion if w else None,
+                "max_id": self.exportacion_repo.max_id(nombre)
+            })
+        return resultado
@@ -0,0 +1,120 @@
+"""
+Extracción de skills desde el texto de requirements.
+
+Módulo sin dependencias de BD ni HTTP: lo importan los procesos del pool de
+extracción (ver pipeline_ofertas.py) sin arrastrar engines ni clientes. El
+catálogo se carga en catalogo_skills.py y se instala aquí ya compilado.
+"""
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+# Catálogo semilla: se usa mientras no haya catálogo en BD/archivo o si su carga falla
+SKILLS_CONOCIDAS = [
+    # Blandas
+    "Pensamiento creativo", "Comunicación asertiva", "Gestión emocional",
+    "Manejo de conflictos", "Empoderamiento personal", "Disciplina laboral",
+    "Capacidad de análisis", "Responsabilidad social", "Etica profesional",
+    "Honestidad", "Tolerancia a la frustración", "Aprendizaje continuo",
+    "Orientación al servicio", "Paciencia", "Confianza interpersonal",
+    "Cortesía", "Pensamiento lógico", "Sensibilidad cultural",
+    "Autonomía", "Capacidad de adaptación", "Trabajo bajo presión",
+    "Capacidad de escucha", "Planeación personal", "Gestión del cambio",
+    "Toma de iniciativa", "Orientación al cliente", "Pensamiento positivo",
+    "Capacidad de observación", "Confidencialidad", "Influencia y persuasión",
+    "Manejo de prioridades", "Pensamiento organizado", "Gestión del tiempo personal",
+    "Trabajo colaborativo", "Sentido de pertenencia", "Optimismo",
+    "Autocontrol", "Capacidad de concentración", "Empatía social",
+    "Escucha empática", "Respeto a la diversidad", "Manejo de la frustración",
+    "Pensamiento sistémico", "Colaboración interdepartamental", "Gestión del conflicto",
+    "Orientación a resultados", "Manejo del cambio organizacional", "Tolerancia",
+    "Capacidad de negociación", "Capacidad de aprendizaje rápido", "Motivación personal",
+    "Capacidad de liderazgo", "Asertividad", "Capacidad de autocrítica",
+    "Trabajo ético", "Desarrollo personal", "Pensamiento estratégico personal",
+    "Capacidad de mediación", "Respeto por las normas", "Responsabilidad colectiva",
+    "Compromiso organizacional", "Solidaridad",
+    # Duras
+    "Programación en Java", "Programación en Python", "SQL",
+    "Git / Control de versiones", "Linux", "Docker", "Kubernetes",
+    "HTML / CSS", "Spring Boot", "React.js", "Contabilidad financiera",
+    "Análisis de estados financieros", "Gestión de presupuestos",
+    "Auditoría interna", "Control de inventarios", "Planeación financiera",
+    "Gestión de nómina", "Tributación básica", "Evaluación de proyectos",
+    "Costos y presupuestos", "Marketing digital", "Copywriting",
+    "SEO (posicionamiento en buscadores)", "Análisis de mercado",
+    "Branding", "Relaciones públicas", "Planificación de campañas publicitarias",
+    "Email marketing", "Gestión de redes sociales", "Atención al cliente",
+    # ... (resto de skills)
+]
+
+
+class MatcherSkills:
+    """
+    Catálogo compilado e inmutable: alias en minúsculas -> skill canónica.
+
+    Se construye una sola vez por versión de catálogo y se reemplaza entero en
+    cada recarga, así que los lectores nunca ven un catálogo a medio actualizar.
+    Es picklable para enviarlo a los procesos del pool de extracción.
+    """
+    __slots__ = ("version", "nombres", "alias")
+
+    def __init__(self, catalogo: Dict[str, List[str]], version: Optional[str] = None):
+        """
+        Args:
+            catalogo: {nombre canónico: [sinónimos]}; el orden define el de la salida
+            version: Identificador de la versión; por defecto, hash del contenido
+        """
+        self.nombres: Tuple[str, ...] = tuple(catalogo)
+        alias: Dict[str, int] = {}
+        for indice, (nombre, sinonimos) in enumerate(catalogo.items()):
+            for termino in (nombre, *sinonimos):
+                termino = termino.strip().lower()
+                if termino:
+                    alias.setdefault(termino, indice)
+        # Cada alias se busca por separado (subcadena), así que el orden no cambia
+        # el resultado; se ordenan solo para que la tupla sea determinista
+        self.alias: Tuple[Tuple[str, int], ...] = tuple(sorted(alias.items()))
+        self.version = version or hashlib.sha1(
+            json.dumps(catalogo, ensure_ascii=False, sort_keys=True).encode()
+        ).hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def extraer(self, texto: str) -> List[str]:
+        """Skills canónicas presentes en el texto (por nombre o sinónimo), sin repetir"""
+        if not texto:
+            return []
+        texto_lower = texto.lower()
+        encontrados = {indice for termino, indice in self.alias if termino in texto_lower}
+        return [self.nombres[i] for i in sorted(encontrados)]
+
+
+_matcher = MatcherSkills({skill: [] for skill in SKILLS_CONOCIDAS}, version="semilla")
+
+
+def get_matcher() -> MatcherSkills:
+    """Matcher vigente del proceso"""
+    return _matcher
+
+
+def instalar_matcher(matcher: MatcherSkills) -> None:
+    """
+    Reemplaza el matcher vigente (una asignación de referencia: atómica).
+    También es el initializer de los procesos del pool de extracción.
+    """
+    global _matcher
+    _matcher = matcher
+
+
+def hash_requirements(requirements_text: str) -> str:
+    """Huella del texto de requirements para detectar ofertas sin cambios"""
+    return hashlib.sha256((requirements_text or "").encode("utf-8")).hexdigest()
+
+
+def extraer_skills(requirements_text: str) -> List[str]:
+    """
+    Extrae skills conocidas del texto de requirements.
+    Busca coincidencias con el catálogo vigente (nombres y sinónimos).
+    """
+    return _matcher.extraer(requirements_text)
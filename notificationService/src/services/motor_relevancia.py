@@ -0,0 +1,176 @@
+import os
+import math
+import time
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ..config.entorno import cargar_entorno
+
+cargar_entorno()
+
+# Peso de cada componente en el puntaje final (suman 1)
+PESOS = {
+    "skills": 0.60,
+    "modalidad": 0.15,
+    "ubicacion": 0.10,
+    "experiencia": 0.10,
+    "salario": 0.05,
+}
+
+MODALIDADES_REMOTAS = {"remoto", "remote", "teletrabajo"}
+
+
+def _normalizar(texto: Optional[str]) -> str:
+    return (texto or "").strip().lower()
+
+
+class MotorRelevancia:
+    """
+    Puntúa la relevancia de una oferta para todos los perfiles a la vez.
+
+    Las skills se guardan como una matriz dispersa perfil x skill en formato por
+    columnas (para cada skill, el arreglo numpy de índices de perfiles que la tienen).
+    El puntaje de skills de una oferta es el producto de esa matriz por el vector
+    de pesos IDF de las skills de la oferta, y el resto de componentes se calcula
+    vectorizado sobre los perfiles que comparten alguna skill.
+    """
+
+    def __init__(self, perfiles: Iterable[Mapping[str, Any]], separador: str = "|"):
+        ids: List[str] = []
+        modalidades = array("i")
+        ubicaciones = array("i")
+        experiencia = array("i")
+        salarios = array("q")
+        columnas: Dict[str, array] = {}
+        codigos: Dict[str, int] = {"": 0}
+
+        def _codigo(valor: Optional[str]) -> int:
+            return codigos.setdefault(_normalizar(valor), len(codigos))
+
+        for indice, perfil in enumerate(perfiles):
+            ids.append(perfil["id_usuario"])
+            modalidades.append(_codigo(perfil.get("modalidad")))
+            ubicaciones.append(_codigo(perfil.get("ubicacion")))
+            experiencia.append(perfil.get("anios_experiencia") or 0)
+            salarios.append(perfil.get("salario_esperado") or 0)
+
+            for skill in {_normalizar(s) for s in (perfil.get("skills") or "").split(separador)}:
+                if skill:
+                    columnas.setdefault(skill, array("i")).append(indice)
+
+        total = max(len(ids), 1)
+        self.ids = ids
+        self.columnas = {s: np.frombuffer(p, dtype=np.intc) for s, p in columnas.items()}
+        self.idf = {s: math.log(1 + total / len(p)) for s, p in columnas.items()}
+        self.modalidades = np.frombuffer(modalidades, dtype=np.intc)
+        self.ubicaciones = np.frombuffer(ubicaciones, dtype=np.intc)
+        self.experiencia = np.frombuffer(experiencia, dtype=np.intc)
+        self.salarios = np.frombuffer(salarios, dtype=np.longlong)
+        self._codigos = codigos
+        self.construido = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def puntuar(
+        self,
+        oferta: Mapping[str, Any],
+        skills: List[str],
+        top_k: Optional[int] = None,
+        umbral: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Calcula el puntaje (0-1) de cada perfil que comparte al menos una skill.
+
+        Args:
+            oferta: Datos de la oferta (modality, location, years_experience, salary)
+            skills: Skills extraídas de la oferta
+            top_k: Si se indica, devuelve solo los K mejores
+            umbral: Puntaje mínimo para ser devuelto
+
+        Returns:
+            (id_usuario, puntaje) ordenados de mayor a menor
+        """
+        pesos_oferta = {
+            s: self.idf[s] for s in {_normalizar(x) for x in skills} if s in self.idf
+        }
+        if not pesos_oferta:
+            return []
+        norma = sum(pesos_oferta.values())
+
+        # Producto matriz dispersa x vector (un perfil aparece una vez por columna)
+        acumulado = np.zeros(len(self.ids))
+        for skill, peso in pesos_oferta.items():
+            acumulado[self.columnas[skill]] += peso
+        indices = np.flatnonzero(acumulado)
+
+        modalidad = self._codigos.get(_normalizar(oferta.get("modality")), -1)
+        ubicacion = self._codigos.get(_normalizar(oferta.get("location")), -1)
+        remota = _normalizar(oferta.get("modality")) in MODALIDADES_REMOTAS
+        anios = oferta.get("years_experience") or 0
+        salario = oferta.get("salary") or 0
+
+        puntajes = acumulado[indices] * (PESOS["skills"] / norma)
+
+        modalidades = self.modalidades[indices]
+        puntajes += np.where((modalidades == 0) | (modalidades == modalidad), PESOS["modalidad"], 0.0)
+
+        if remota:
+            puntajes += PESOS["ubicacion"]
+        else:
+            ubicaciones = self.ubicaciones[indices]
+            puntajes += np.where((ubicaciones == 0) | (ubicaciones == ubicacion), PESOS["ubicacion"], 0.0)
+
+        experiencia = self.experiencia[indices]
+        puntajes += np.where(
+            experiencia >= anios, PESOS["experiencia"], PESOS["experiencia"] * experiencia / max(anios, 1)
+        )
+
+        esperados = self.salarios[indices]
+        puntajes += np.where(
+            (esperados == 0) | (esperados <= salario),
+            PESOS["salario"],
+            PESOS["salario"] * salario / np.maximum(esperados, 1)
+        )
+
+        if umbral > 0:
+            pasan = puntajes >= umbral
+            indices, puntajes = indices[pasan], puntajes[pasan]
+
+        # De mayor a menor puntaje; a igual puntaje, el índice de perfil mayor primero
+        if top_k is not None and 0 < top_k < len(puntajes):
+            # Solo se ordenan los que alcanzan el K-ésimo puntaje (incluidos los empates)
+            corte = np.partition(puntajes, len(puntajes) - top_k)[len(puntajes) - top_k]
+            pasan = puntajes >= corte
+            indices, puntajes = indices[pasan], puntajes[pasan]
+        orden = np.lexsort((indices, puntajes))[::-1][:top_k]
+
+        ids = self.ids
+        return [(ids[i], round(p, 4)) for i, p in zip(indices[orden].tolist(), puntajes[orden].tolist())]
+
+
+_motor: Optional[MotorRelevancia] = None
+_motor_lock = threading.Lock()
+
+
+def get_motor_relevancia(cargar_perfiles, forzar: bool = False) -> MotorRelevancia:
+    """
+    Motor compartido del proceso. Se reconstruye desde la tabla local de perfiles
+    cuando supera RELEVANCIA_TTL_SEGUNDOS o si se fuerza.
+
+    Args:
+        cargar_perfiles: Callable que devuelve las filas de perfiles_features
+    """
+    global _motor
+    ttl = int(os.getenv("RELEVANCIA_TTL_SEGUNDOS", "600"))
+    motor = _motor
+    if motor is not None and not forzar and time.monotonic() - motor.construido < ttl:
+        return motor
+
+    with _motor_lock:
+        if _motor is None or forzar or time.monotonic() - _motor.construido >= ttl:
+            _motor = MotorRelevancia(cargar_perfiles())
+        return _motor
@@ -1,48 +1,212 @@
 from sqlmodel import Session
-from typing import List
-from uuid import UUID  
+from sqlalchemy import Row
+from typing import List, Optional, Any, Tuple
+from pydantic import ValidationError
 from datetime import datetime
-from ..repositories.notificacion_repo import NotificacionRepository
-from ..dto.notificacion_dto import NotificacionCreateDTO, NotificacionResponseDTO
+from ..repositories.notificacion_repo import NotificacionRepository, TAMANO_LOTE_INSERT
+from ..dto.notificacion_dto import (
+    CAMPOS_RESPUESTA,
+    NotificacionCreateDTO,
+    NotificacionResponseDTO,
+    NotificacionBulkResultadoDTO,
+    ErrorItemDTO,
+    OperacionBulkResultadoDTO,
+    ResultadoIdDTO
+)
 from ..models.notificacion import Notificacion
 from ..exception.notificacion_not_found import NotificacionNotFound 
+from ..exception.insercion_parcial import InsercionParcial
+from ..cache import clave_notificacion, NOTIFICACION, NO_LEIDAS_USUARIO
 
 class NotificacionService:
     def __init__(self, notificacionRepository: NotificacionRepository):
         self.notificacionRepository = notificacionRepository
     
-    def get_by_id(self, session: Session, id_notificacion: UUID) -> NotificacionResponseDTO:  # UUID en lugar de int
-        entidad = self.notificacionRepository.get_by_id(session, id_notificacion)
-        if not entidad:
+    def get_by_id(self, session: Session, id_notificacion: int) -> NotificacionResponseDTO:
+        def cargar():
+            entidad = self.notificacionRepository.get_by_id(session, id_notificacion)
+            if not entidad:
+                return None
+            return NotificacionResponseDTO.model_validate(entidad).model_dump(mode="json")
+
+        datos = self.notificacionRepository.cache.obtener(
+            NOTIFICACION, clave_notificacion(id_notificacion), cargar
+        )
+        if not datos:
             raise NotificacionNotFound(f"Notificación {id_notificacion} no encontrada.")
-        return NotificacionResponseDTO.model_validate(entidad)
+        return NotificacionResponseDTO.model_validate(datos)
 
-    def listar_todas(self, session: Session, limit: int = 100, offset: int = 0) -> List[NotificacionResponseDTO]:
-        results = self.notificacionRepository.list_all(session, offset, limit)
-        return [NotificacionResponseDTO.model_validate(e) for e in results]
+    # Los listados devuelven filas planas con las columnas de NotificacionResponseDTO
+    # (o solo las de `campos`); el router las serializa directamente (ver NotificacionesJSONResponse).
 
-    def listar_no_leidas(self, session: Session) -> List[NotificacionResponseDTO]:
-        results = self.notificacionRepository.get_by_status(session)
-        return [NotificacionResponseDTO.model_validate(e) for e in results]
+    def listar_todas(
+        self,
+        session: Session,
+        limit: int = 100,
+        offset: int = 0,
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
+        return self.notificacionRepository.list_all(session, offset, limit, campos)
+
+    def listar_no_leidas(self, session: Session, campos: Tuple[str, ...] = CAMPOS_RESPUESTA) -> List[Row]:
+        return self.notificacionRepository.get_by_status(session, campos)
+    
+    def listar_no_leidas_usuario(
+        self, session: Session, id_usuario: str, campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Any]:
+        """
+        Notificaciones no leídas de un usuario. Con todas las columnas se sirven del
+        read-through cache; con un sparse fieldset se leen solo esas columnas, sin cache.
+        """
+        if campos != CAMPOS_RESPUESTA:
+            return self.notificacionRepository.get_filas_no_leidas_by_usuario(session, id_usuario, campos)
+        return self.notificacionRepository.cache.obtener(
+            NO_LEIDAS_USUARIO,
+            id_usuario,
+            lambda: [
+                fila._asdict() for fila in
+                self.notificacionRepository.get_filas_no_leidas_by_usuario(session, id_usuario)
+            ]
+        )
     
-    def listar_dado_id_usuario(self, session: Session, id_usuario:str) -> List[NotificacionResponseDTO]:
+    def listar_dado_id_usuario(
+        self,
+        session: Session,
+        id_usuario: str,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
         
         # Poner validación de ID cuando se tenga acceso
-        results = self.notificacionRepository.get_by_id_usuario(session, id_usuario)
-        return [NotificacionResponseDTO.model_validate(e) for e in results]
+        return self.notificacionRepository.get_by_id_usuario(session, id_usuario, since_id, since, campos)
     
-    def listar_dado_id_empresa(self, session: Session, id_empresa:str) -> List[NotificacionResponseDTO]:
+    def listar_dado_id_empresa(
+        self,
+        session: Session,
+        id_empresa: str,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        campos: Tuple[str, ...] = CAMPOS_RESPUESTA
+    ) -> List[Row]:
         
         # Poner validación de ID cuando se tenga acceso
-        results = self.notificacionRepository.get_by_id_empresa(session, id_empresa)
-        return [NotificacionResponseDTO.model_validate(e) for e in results]
+        return self.notificacionRepository.get_by_id_empresa(session, id_empresa, since_id, since, campos)
+
+    def calcular_etag_usuario(self, session: Session, id_usuario: str) -> str:
+        """ETag débil de la bandeja de un usuario: cambia con cada alta, lectura o borrado"""
+        return self._etag(*self.notificacionRepository.get_version_usuario(session, id_usuario))
+
+    def calcular_etag_empresa(self, session: Session, id_empresa: str) -> str:
+        """ETag débil de la bandeja de una empresa: cambia con cada alta, lectura o borrado"""
+        return self._etag(*self.notificacionRepository.get_version_empresa(session, id_empresa))
+
+    @staticmethod
+    def _etag(max_id: int, total: int, no_leidas: int, ultima_lectura: Optional[datetime]) -> str:
+        # Con la última lectura, una marca de lectura cambia el ETag aunque los conteos vuelvan a coincidir
+        lectura = ultima_lectura.strftime("%Y%m%d%H%M%S%f") if ultima_lectura else "0"
+        return f'W/"{max_id}-{total}-{no_leidas}-{lectura}"'
     
     def create(self, session: Session, notificacionDto: NotificacionCreateDTO) -> NotificacionResponseDTO:
         notificacion = Notificacion(**notificacionDto.model_dump())
         nueva_notificacion = self.notificacionRepository.create(session, notificacion)
         return NotificacionResponseDTO.model_validate(nueva_notificacion)
 
-    def update(self, session: Session, id_notificacion: UUID, notificacionDto: NotificacionCreateDTO) -> NotificacionResponseDTO:  # UUID
+    def create_many(
+        self,
+        session: Session,
+        items: List[Any],
+        todo_o_nada: bool = False
+    ) -> NotificacionBulkResultadoDTO:
+        """
+        Crea muchas notificaciones en una sola transacción.
+
+        Args:
+            items: Elementos crudos (dicts) a validar contra NotificacionCreateDTO
+            todo_o_nada: Si hay cualquier error no se inserta nada
+
+        Returns:
+            IDs creados y reporte de errores por índice
+        """
+        validos: List[Tuple[int, NotificacionCreateDTO]] = []
+        errores: List[ErrorItemDTO] = []
+
+        for indice, item in enumerate(items):
+            if isinstance(item, ErrorItemDTO):
+                errores.append(item)
+                continue
+            try:
+                validos.append((indice, NotificacionCreateDTO.model_validate(item)))
+            except ValidationError as e:
+                errores.append(ErrorItemDTO(indice=indice, errores=e.errors(include_url=False, include_context=False)))
+
+        if not validos or (todo_o_nada and errores):
+            return NotificacionBulkResultadoDTO(creadas=0, ids=[], errores=errores)
+
+        ahora = datetime.utcnow()
+        filas = [
+            {**dto.model_dump(), "leida": False, "fecha_creacion": ahora}
+            for _, dto in validos
+        ]
+
+        try:
+            ids = self.notificacionRepository.insertar_lote(session, filas)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            if todo_o_nada:
+                raise
+            # Sin todo_o_nada se reintenta por lotes aislados para reportar solo los que fallan
+            ids, errores_insercion = self._insertar_por_lotes(session, validos, filas, e)
+            errores.extend(errores_insercion)
+
+        self.notificacionRepository.invalidar_cache_usuarios(
+            [f["id_usuario"] for f in filas], [f["id_empresa"] for f in filas]
+        )
+        return NotificacionBulkResultadoDTO(
+            creadas=len(ids),
+            ids=[str(i) for i in ids],
+            errores=sorted(errores, key=lambda e: e.indice)
+        )
+
+    def _insertar_por_lotes(
+        self,
+        session: Session,
+        validos: List[Tuple[int, NotificacionCreateDTO]],
+        filas: List[dict],
+        error_original: Exception
+    ) -> Tuple[List[int], List[ErrorItemDTO]]:
+        # Con shards, lo que ya confirmaron otros shards no se reintenta (se duplicaría)
+        if isinstance(error_original, InsercionParcial):
+            insertadas: List[Optional[int]] = list(error_original.ids)
+        else:
+            insertadas = [None] * len(filas)
+        pendientes = [posicion for posicion, id_ in enumerate(insertadas) if id_ is None]
+        errores: List[ErrorItemDTO] = []
+
+        for inicio in range(0, len(pendientes), TAMANO_LOTE_INSERT):
+            lote = pendientes[inicio:inicio + TAMANO_LOTE_INSERT]
+            try:
+                generados: List[Optional[int]] = list(
+                    self.notificacionRepository.insertar_lote(session, [filas[p] for p in lote])
+                )
+                session.commit()
+                mensaje = ""
+            except Exception as e:
+                session.rollback()
+                generados = list(e.ids) if isinstance(e, InsercionParcial) else [None] * len(lote)
+                mensaje = str(e) or str(error_original)
+            for posicion, id_ in zip(lote, generados):
+                insertadas[posicion] = id_
+                if id_ is None:
+                    errores.append(ErrorItemDTO(
+                        indice=validos[posicion][0], errores=[{"type": "db_error", "msg": mensaje}]
+                    ))
+        return [id_ for id_ in insertadas if id_ is not None], errores
+
+    def update(
+        self, session: Session, id_notificacion: int, notificacionDto: NotificacionCreateDTO
+    ) -> NotificacionResponseDTO:
         entidad = self.notificacionRepository.get_by_id(session, id_notificacion)
         if not entidad:
             raise NotificacionNotFound(f"Notificación {id_notificacion} no encontrada.")
@@ -53,19 +217,36 @@ class NotificacionService:
         notificacion_actualizada = self.notificacionRepository.update(session, entidad)
         return NotificacionResponseDTO.model_validate(notificacion_actualizada)
 
-    def marcar_como_leida(self, session: Session, id_notificacion: UUID) -> NotificacionResponseDTO:  # UUID
-        from datetime import datetime
-        
+    def marcar_como_leida(self, session: Session, id_notificacion: int) -> NotificacionResponseDTO:
         entidad = self.notificacionRepository.get_by_id(session, id_notificacion)
         if not entidad:
             raise NotificacionNotFound(f"Notificación {id_notificacion} no encontrada.")
         
         entidad.leida = True
-        entidad.fecha_lectura = datetime.now()
+        entidad.fecha_lectura = datetime.utcnow()
         
         notificacion_actualizada = self.notificacionRepository.update(session, entidad)
         return NotificacionResponseDTO.model_validate(notificacion_actualizada)
     
+    def marcar_leidas_por_ids(self, session: Session, ids: List[int]) -> OperacionBulkResultadoDTO:
+        """Marcar como leídas varias notificaciones por id, con resultado por id"""
+        ids_unicos = list(dict.fromkeys(ids))
+        resultados = self.notificacionRepository.marcar_leidas_por_ids(session, ids_unicos, datetime.utcnow())
+        return self._resultado_bulk(ids_unicos, resultados, "marcada")
+
+    def eliminar_por_ids(self, session: Session, ids: List[int]) -> OperacionBulkResultadoDTO:
+        """Eliminar varias notificaciones por id, con resultado por id"""
+        ids_unicos = list(dict.fromkeys(ids))
+        resultados = self.notificacionRepository.delete_por_ids(session, ids_unicos)
+        return self._resultado_bulk(ids_unicos, resultados, "eliminada")
+
+    @staticmethod
+    def _resultado_bulk(ids: List[int], resultados: dict, exito: str) -> OperacionBulkResultadoDTO:
+        return OperacionBulkResultadoDTO(
+            procesadas=sum(1 for r in resultados.values() if r == exito),
+            resultados=[ResultadoIdDTO(id_notificacion=str(i), resultado=resultados[i]) for i in ids]
+        )
+    
     def marcar_todas_leidas_usuario(self, session: Session, id_usuario: str) -> dict:
         """Marcar todas las notificaciones de un usuario como leídas"""
         notificaciones = self.notificacionRepository.get_no_leidas_by_usuario(session, id_usuario)
@@ -76,7 +257,7 @@ class NotificacionService:
                 "cantidad_actualizada": 0
             }
         
-        fecha_actual = datetime.now()
+        fecha_actual = datetime.utcnow()
         for notificacion in notificaciones:
             notificacion.leida = True
             notificacion.fecha_lectura = fecha_actual
@@ -98,7 +279,7 @@ class NotificacionService:
                 "cantidad_actualizada": 0
             }
         
-        fecha_actual = datetime.now()
+        fecha_actual = datetime.utcnow()
         for notificacion in notificaciones:
             notificacion.leida = True
             notificacion.fecha_lectura = fecha_actual
@@ -110,7 +291,7 @@ class NotificacionService:
             "cantidad_actualizada": len(notificaciones)
         }
 
-    def delete(self, session: Session, id_notificacion: UUID) -> None:  # UUID
+    def delete(self, session: Session, id_notificacion: int) -> None:
         entidad = self.notificacionRepository.get_by_id(session, id_notificacion)
         if not entidad:
             raise NotificacionNotFound(f"Notificación {id_notificacion} no encontrada.")
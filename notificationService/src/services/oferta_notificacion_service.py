@@ -1,64 +1,35 @@
 from sqlmodel import Session
-from typing import List, Dict, Any
-from dotenv import load_dotenv
-from httpx import QueryParams
-import httpx
+from typing import List, Dict, Any, Optional, Tuple
+from ..config.entorno import cargar_entorno
 import re
 import os
+import time
 
 from ..repositories.notificacion_repo import NotificacionRepository
 from ..repositories.oferta_notificada_repo import OfertaNotificadaRepository
 from ..repositories.oferta_analitycs_repo import OfertaAnalyticsRepository
-from ..models.notificacionInt import NotificacionInt
 from ..dto.oferta_dto import OfertaDTO
+from ..models.notificacion import PrioridadNotificacion
+from ..clients.perfiles_client import PerfilesClient, get_perfiles_client
+from ..repositories.perfil_features_repo import PerfilFeaturesRepository
+from ..repositories.oferta_skills_repo import OfertaSkillsRepository
+from .motor_relevancia import get_motor_relevancia
+from .pipeline_ofertas import PipelineOfertas
+from .rendimiento_escritura import get_rendimiento_escritura
+from .cola_escritura import SolicitudEscritura, get_cola_escritura
 
-# Lista completa de skills (de tu seed)
-SKILLS_CONOCIDAS = [
-    # Blandas
-    "Pensamiento creativo", "Comunicación asertiva", "Gestión emocional",
-    "Manejo de conflictos", "Empoderamiento personal", "Disciplina laboral",
-    "Capacidad de análisis", "Responsabilidad social", "Etica profesional",
-    "Honestidad", "Tolerancia a la frustración", "Aprendizaje continuo",
-    "Orientación al servicio", "Paciencia", "Confianza interpersonal",
-    "Cortesía", "Pensamiento lógico", "Sensibilidad cultural",
-    "Autonomía", "Capacidad de adaptación", "Trabajo bajo presión",
-    "Capacidad de escucha", "Planeación personal", "Gestión del cambio",
-    "Toma de iniciativa", "Orientación al cliente", "Pensamiento positivo",
-    "Capacidad de observación", "Confidencialidad", "Influencia y persuasión",
-    "Manejo de prioridades", "Pensamiento organizado", "Gestión del tiempo personal",
-    "Trabajo colaborativo", "Sentido de pertenencia", "Optimismo",
-    "Autocontrol", "Capacidad de concentración", "Empatía social",
-    "Escucha empática", "Respeto a la diversidad", "Manejo de la frustración",
-    "Pensamiento sistémico", "Colaboración interdepartamental", "Gestión del conflicto",
-    "Orientación a resultados", "Manejo del cambio organizacional", "Tolerancia",
-    "Capacidad de negociación", "Capacidad de aprendizaje rápido", "Motivación personal",
-    "Capacidad de liderazgo", "Asertividad", "Capacidad de autocrítica",
-    "Trabajo ético", "Desarrollo personal", "Pensamiento estratégico personal",
-    "Capacidad de mediación", "Respeto por las normas", "Responsabilidad colectiva",
-    "Compromiso organizacional", "Solidaridad",
-    # Duras
-    "Programación en Java", "Programación en Python", "SQL",
-    "Git / Control de versiones", "Linux", "Docker", "Kubernetes",
-    "HTML / CSS", "Spring Boot", "React.js", "Contabilidad financiera",
-    "Análisis de estados financieros", "Gestión de presupuestos",
-    "Auditoría interna", "Control de inventarios", "Planeación financiera",
-    "Gestión de nómina", "Tributación básica", "Evaluación de proyectos",
-    "Costos y presupuestos", "Marketing digital", "Copywriting",
-    "SEO (posicionamiento en buscadores)", "Análisis de mercado",
-    "Branding", "Relaciones públicas", "Planificación de campañas publicitarias",
-    "Email marketing", "Gestión de redes sociales", "Atención al cliente",
-    # ... (resto de skills)
-]
-
+# Status de la oferta -> prioridad de la notificación
 PRIORIDAD_MAP = {
-    "BAJA": 1,
-    "MEDIA": 2,
-    "ALTA": 3,
-    "URGENTE": 3
+    "BAJA": PrioridadNotificacion.BAJA.value,
+    "MEDIA": PrioridadNotificacion.MEDIA.value,
+    "ALTA": PrioridadNotificacion.ALTA.value,
+    "URGENTE": PrioridadNotificacion.ALTA.value
 }
 
-dotenv = dotenv_path = os.path.join(os.path.dirname(__file__), '../../.env')
-load_dotenv(dotenv)
+cargar_entorno()
+
+# Máximo que una ejecución espera a la cola de escritura (para todas sus ofertas)
+ESPERA_ESCRITURA_SEGUNDOS = float(os.getenv("COLA_ESCRITURA_ESPERA_MAX_SEGUNDOS", "300"))
 
 
 class OfertaNotificacionService:
@@ -71,22 +42,37 @@ class OfertaNotificacionService:
         notificacion_repo: NotificacionRepository,
         oferta_notificada_repo: OfertaNotificadaRepository,
         oferta_analytics_repo: OfertaAnalyticsRepository,
-        profiles_api_url: str = os.getenv('PROFILE_URL') or "",
-        token: str = ""
+        perfiles_client: Optional[PerfilesClient] = None,
+        perfil_features_repo: Optional[PerfilFeaturesRepository] = None,
+        oferta_skills_repo: Optional[OfertaSkillsRepository] = None
     ):
         self.notificacion_repo = notificacion_repo
         self.oferta_notificada_repo = oferta_notificada_repo
         self.oferta_analytics_repo = oferta_analytics_repo
-        self.profiles_api_url = profiles_api_url
-        self.token = token
+        self.perfil_features_repo = perfil_features_repo
+        self.oferta_skills_repo = oferta_skills_repo
+        # Cliente compartido: conserva el token entre requests
+        self.perfiles_client = perfiles_client or get_perfiles_client()
     
-    def procesar_nuevas_ofertas(self, session: Session, dias_atras: int = 7) -> Dict[str, Any]:
+    def procesar_nuevas_ofertas(
+        self,
+        session: Session,
+        dias_atras: int = 7,
+        min_coincidencias: int = 1,
+        usar_relevancia: bool = False,
+        top_k: Optional[int] = None,
+        umbral_relevancia: float = 0.0
+    ) -> Dict[str, Any]:
         """
         Procesa ofertas recientes y notifica a usuarios compatibles.
         
         Args:
             session: Sesión de base de datos
             dias_atras: Ventana de tiempo para buscar ofertas nuevas
+            min_coincidencias: Mínimo de skills de la oferta que debe tener el usuario
+            usar_relevancia: Puntuar localmente contra perfiles_features en lugar del API
+            top_k: Con relevancia, notificar solo a los K perfiles con mejor puntaje
+            umbral_relevancia: Con relevancia, puntaje mínimo (0-1) para notificar
             
         Returns:
             Resumen del procesamiento
@@ -117,67 +103,48 @@ class OfertaNotificacionService:
                 "ofertas_procesadas": 0
             }
         
-        # 3. Procesar cada oferta
-        total_notificaciones = 0
-        detalles = []
-        errores = []
-        
-        for oferta_data in ofertas_nuevas:
-            try:
-                # Extraer skills de los requirements
-                skills = self._extraer_skills(oferta_data['requirements'])
-                
-                if not skills:
-                    print(f"⚠️  Oferta {oferta_data['id']} sin skills reconocibles, skip")
-                    continue
-                
-                # Limitar a las primeras 10 skills para evitar URLs muy largas
-                skills_limitadas = skills[:10]
-                if len(skills) > 10:
-                    print(f"⚠️  Oferta {oferta_data['id']} tiene {len(skills)} skills, usando solo las primeras 10")
-                
-                # Buscar usuarios compatibles
-                usuarios_compatibles = self._buscar_usuarios_compatibles(skills_limitadas)
-                
-                if usuarios_compatibles:
-                    # Crear notificaciones para cada usuario
-                    notificaciones_creadas = self._crear_notificaciones_oferta(
-                        oferta_data,
-                        usuarios_compatibles
-                    )
-                    
-                    total_notificaciones += notificaciones_creadas
-                    
-                    # Marcar oferta como notificada
-                    self.oferta_notificada_repo.marcar_como_notificada(
-                        id_oferta=oferta_data['id'],
-                        id_empresa=str(oferta_data['company_id']),
-                        titulo=oferta_data['title'],
-                        fecha_publicacion=oferta_data['publication_date'],
-                        usuarios_notificados=notificaciones_creadas
-                    )
-                    
-                    detalles.append({
-                        "id_oferta": oferta_data['id'],
-                        "titulo": oferta_data['title'],
-                        "skills_encontradas": len(skills),
-                        "skills_usadas": len(skills_limitadas),
-                        "usuarios_notificados": notificaciones_creadas
-                    })
-                else:
-                    print(f"ℹ️  Oferta {oferta_data['id']}: No se encontraron usuarios compatibles")
-                    
-            except Exception as e:
-                error_msg = f"Error procesando oferta {oferta_data.get('id', 'unknown')}: {str(e)}"
-                print(f"❌ {error_msg}")
-                errores.append(error_msg)
-                continue
+        motor, resolver_audiencia = self._resolutor_audiencia(
+            usar_relevancia, min_coincidencias, top_k, umbral_relevancia
+        )
+
+        cola = get_cola_escritura()
+        escrituras = []
+
+        def escribir_notificaciones(oferta_data: Dict, skills: List[str], audiencia) -> None:
+            usuarios_compatibles = [id_usuario for id_usuario, _ in audiencia]
+
+            if not usuarios_compatibles:
+                print(f"ℹ️  Oferta {oferta_data['id']}: No se encontraron usuarios compatibles")
+                return
+
+            # Encolar el fan-out: la cola lo escribe por lotes, por prioridad y con límite de filas/s
+            filas, prioridad = self._filas_notificaciones_oferta(oferta_data, usuarios_compatibles)
+            escrituras.append((oferta_data, skills, audiencia, cola.encolar(filas, prioridad)))
+
+        # 3. Procesar las ofertas: extracción (procesos) -> audiencia (hilos) -> encolado.
+        #    Las ofertas sin cambios desde la última extracción reutilizan sus skills
+        pipeline = PipelineOfertas()
+        errores = pipeline.ejecutar(
+            ofertas_nuevas,
+            resolver=resolver_audiencia,
+            escribir=escribir_notificaciones,
+            al_omitir=lambda o: print(f"⚠️  Oferta {o['id']} sin skills reconocibles, skip"),
+            previas=self._skills_previas(ofertas_nuevas)
+        )
+        self._guardar_skills(pipeline)
+
+        # 4. Esperar la escritura de cada oferta y marcarla como notificada
+        total_notificaciones, detalles = self._confirmar_escrituras(escrituras, motor, errores)
+
+        orden = {o['id']: i for i, o in enumerate(ofertas_nuevas)}
+        detalles.sort(key=lambda d: orden[d["id_oferta"]])
         
         resultado = {
             "mensaje": f"Se procesaron {len(ofertas_nuevas)} ofertas nuevas",
             "notificaciones_creadas": total_notificaciones,
             "ofertas_procesadas": len(ofertas_nuevas),
             "ofertas_con_usuarios": len(detalles),
+            "ofertas_sin_reextraer": len(pipeline.reutilizadas),
             "detalle": detalles
         }
         
@@ -186,145 +153,258 @@ class OfertaNotificacionService:
         
         return resultado
     
-    def _extraer_skills(self, requirements_text: str) -> List[str]:
+    def _confirmar_escrituras(
+        self,
+        escrituras: List[Tuple[Dict, List[str], Any, SolicitudEscritura]],
+        motor,
+        errores: List[str]
+    ) -> Tuple[int, List[Dict[str, Any]]]:
         """
-        Extrae skills conocidas del texto de requirements.
-        Busca coincidencias con la lista de skills del seed.
+        Espera la escritura de cada oferta (a lo sumo ESPERA_ESCRITURA_SEGUNDOS en
+        total) y marca como notificadas las que crearon notificaciones.
+        Devuelve (notificaciones creadas, detalle por oferta)
         """
-        if not requirements_text:
-            return []
-        
-        skills_encontradas = []
-        requirements_lower = requirements_text.lower()
-        
-        for skill in SKILLS_CONOCIDAS:
-            # Búsqueda case-insensitive
-            if skill.lower() in requirements_lower:
-                skills_encontradas.append(skill)
-        
-        return skills_encontradas
-    
-    def _login(self) -> str:
-        profile_auth = os.getenv("PROFILE_AUTH")
-        url = f"{profile_auth}/login"
+        total_notificaciones = 0
+        detalles = []
+        limite_espera = time.monotonic() + ESPERA_ESCRITURA_SEGUNDOS
+        for oferta_data, skills, audiencia, solicitud in escrituras:
+            notificaciones_creadas = self._esperar_escritura(oferta_data, solicitud, limite_espera, errores)
+            if not notificaciones_creadas:
+                # Sin marcar: se reintenta en la próxima ejecución
+                continue
+            total_notificaciones += notificaciones_creadas
 
-        payload = {
-            "email": str(os.getenv("PROFILE_USER")),
-            "password": str(os.getenv("PROFILE_PASS"))
-        }
+            try:
+                self.oferta_notificada_repo.marcar_como_notificada(
+                    id_oferta=oferta_data['id'],
+                    id_empresa=str(oferta_data['company_id']),
+                    titulo=oferta_data['title'],
+                    fecha_publicacion=oferta_data['publication_date'],
+                    usuarios_notificados=notificaciones_creadas
+                )
+            except Exception as e:
+                self.oferta_notificada_repo.session.rollback()
+                errores.append(f"Error procesando oferta {oferta_data['id']} (marcado): {str(e)}")
+
+            detalles.append({
+                "id_oferta": oferta_data['id'],
+                "titulo": oferta_data['title'],
+                "skills_encontradas": len(skills),
+                "consultas_api": 0 if motor else len(self.perfiles_client.lotes_skills(skills)),
+                "mejor_puntaje" if motor else "max_coincidencias": audiencia[0][1],
+                "usuarios_notificados": notificaciones_creadas
+            })
+        return total_notificaciones, detalles
+
+    @staticmethod
+    def _esperar_escritura(
+        oferta_data: Dict,
+        solicitud: SolicitudEscritura,
+        limite_espera: float,
+        errores: List[str]
+    ) -> int:
+        """
+        Notificaciones escritas para la oferta (0 si no se escribieron todas); un
+        timeout o filas fallidas quedan en `errores`.
+        Al vencer la espera se cancelan las filas que la cola aún no tomó, para que no
+        se escriban después sin marcar la oferta (la próxima ejecución las duplicaría).
+        Si ya se están escribiendo, se espera ese resultado.
+        """
+        try:
+            notificaciones_creadas = solicitud.esperar(max(0.0, limite_espera - time.monotonic()))
+        except TimeoutError as e:
+            if solicitud.cancelar():
+                errores.append(f"Error procesando oferta {oferta_data['id']} (escritura): {e}")
+                return 0
+            notificaciones_creadas = solicitud.esperar()
+        if solicitud.fallidas:
+            errores.append(
+                f"Error procesando oferta {oferta_data['id']} (escritura): "
+                f"{solicitud.fallidas} notificaciones fallidas: {solicitud.errores[0]}"
+            )
+            # Solo se marca la oferta si se escribieron todas sus notificaciones
+            return 0
+        return notificaciones_creadas
+
+    def simular_procesamiento(
+        self,
+        session: Session,
+        dias_atras: int = 7,
+        min_coincidencias: int = 1,
+        usar_relevancia: bool = False,
+        top_k: Optional[int] = None,
+        umbral_relevancia: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Modo sombra: ejecuta el pipeline completo (extracción y resolución de
+        audiencia) pero no escribe en `notificaciones` ni en `ofertas_notificadas`.
+        Devuelve el costo que tendría la ejecución real.
 
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(url, json=payload)
-            response.raise_for_status()
+        Returns:
+            Reporte con audiencia por oferta, filas estimadas, llamadas HTTP
+            y tiempo de escritura proyectado según el throughput reciente
+        """
+        inicio = time.perf_counter()
+        ofertas_recientes = self.oferta_analytics_repo.get_ofertas_activas_recientes(dias_atras)
+        ids_ofertas = [o['id'] for o in ofertas_recientes]
+        ids_ya_notificados = self.oferta_notificada_repo.get_ids_ya_notificados(ids_ofertas)
+        ofertas_nuevas = [o for o in ofertas_recientes if o['id'] not in ids_ya_notificados]
 
-            data = response.json()
-            token = data.get("token")
+        motor, resolver_audiencia = self._resolutor_audiencia(
+            usar_relevancia, min_coincidencias, top_k, umbral_relevancia
+        )
 
-            if not token:
-                raise Exception("Login exitoso pero no llegó token.")
+        def resolver_medido(oferta_data: Dict, skills: List[str]):
+            t0 = time.perf_counter()
+            audiencia = resolver_audiencia(oferta_data, skills)
+            return audiencia, time.perf_counter() - t0
 
-            print("🔐 Nuevo token obtenido por login.")
-            return token
+        detalles = []
 
-    
-    def _buscar_usuarios_compatibles(self, skills: List[str]) -> List[str]:
-        if not skills:
-            return []
-        
-        if not self.token:
-            print("🔐 No hay token. Haciendo login inicial...")
-            self.token = self._login()
-
-        # Generamos params como una lista de tuplas repetidas:
-        # [("names", "SQL"), ("names", "Docker")]
-        params = QueryParams([("names", s) for s in skills])
-
-        base_url = f"{self.profiles_api_url}/skill"
-
-        def _do_request(token):
-            with httpx.Client(timeout=60.0) as client:
-                return client.get(
-                    base_url,
-                    params=params,  # <- AQUI LA MAGIA
-                    headers={"Authorization": f"Bearer {token}"},
-                )
+        def registrar_costo(oferta_data: Dict, skills: List[str], resultado) -> None:
+            audiencia, segundos = resultado
+            detalles.append({
+                "id_oferta": oferta_data['id'],
+                "titulo": oferta_data['title'],
+                "skills_encontradas": len(skills),
+                "audiencia": len(audiencia),
+                "consultas_api": 0 if motor else len(self.perfiles_client.lotes_skills(skills)),
+                "resolucion_ms": round(segundos * 1000, 1)
+            })
 
-        try:
-            response = _do_request(self.token)
+        pipeline = PipelineOfertas()
+        errores = pipeline.ejecutar(
+            ofertas_nuevas,
+            resolver=resolver_medido,
+            escribir=registrar_costo,
+            previas=self._skills_previas(ofertas_nuevas)
+        )
+        self._guardar_skills(pipeline)
 
-            # Si el token expiró
-            if response.status_code == 403:
-                print("🔄 Token expirado. Intentando login...")
-                self.token = self._login()
-                response = _do_request(self.token)
+        orden = {o['id']: i for i, o in enumerate(ofertas_nuevas)}
+        detalles.sort(key=lambda d: orden[d["id_oferta"]])
 
-            response.raise_for_status()
-            data = response.json()
+        filas_notificaciones = sum(d["audiencia"] for d in detalles)
+        ofertas_con_usuarios = sum(1 for d in detalles if d["audiencia"])
+        medido = get_rendimiento_escritura().filas_por_segundo()
+        filas_por_segundo = medido or float(os.getenv("SOMBRA_FILAS_POR_SEGUNDO", "50"))
+        # La cola de escritura no supera su límite aunque la BD lo permita
+        limite_cola = get_cola_escritura().bucket.tasa
+        limitado_por_cola = filas_por_segundo > limite_cola
+        filas_por_segundo = min(filas_por_segundo, limite_cola)
 
-            print(f"✅ API respondió con {len(data) if isinstance(data, list) else 'datos'}")
+        resultado = {
+            "mensaje": f"Simulación de {len(ofertas_nuevas)} ofertas (sin escribir)",
+            "ofertas_procesadas": len(ofertas_nuevas),
+            "ofertas_con_usuarios": ofertas_con_usuarios,
+            "ofertas_sin_reextraer": len(pipeline.reutilizadas),
+            "filas_estimadas": {
+                "notificaciones": filas_notificaciones,
+                "ofertas_notificadas": ofertas_con_usuarios
+            },
+            "consultas_api": sum(d["consultas_api"] for d in detalles),
+            "escritura_proyectada": {
+                "segundos": round(filas_notificaciones / filas_por_segundo, 2),
+                "filas_por_segundo": round(filas_por_segundo, 2),
+                "fuente": (
+                    "COLA_ESCRITURA_FILAS_POR_SEGUNDO" if limitado_por_cola
+                    else "medido" if medido else "SOMBRA_FILAS_POR_SEGUNDO"
+                )
+            },
+            "duracion_simulacion_segundos": round(time.perf_counter() - inicio, 3),
+            "detalle": detalles
+        }
 
-            if isinstance(data, list):
-                return [x.get("id") for x in data if x.get("id")]
+        if errores:
+            resultado["errores"] = errores
 
-            if isinstance(data, dict) and "profiles" in data:
-                return [x.get("id") for x in data["profiles"] if x.get("id")]
+        return resultado
 
-            print(f"⚠️ Formato inesperado: {type(data)}")
-            return []
+    def _resolutor_audiencia(
+        self,
+        usar_relevancia: bool,
+        min_coincidencias: int,
+        top_k: Optional[int],
+        umbral_relevancia: float
+    ):
+        """
+        Devuelve (motor, resolver): el motor de relevancia local si se pidió y hay
+        perfiles cargados (si no, None) y la función (oferta, skills) -> audiencia.
+        """
+        motor = None
+        if usar_relevancia and self.perfil_features_repo is not None:
+            motor = get_motor_relevancia(self.perfil_features_repo.get_all_filas)
+            if not len(motor):
+                print("⚠️  perfiles_features vacía, se usa el API de perfiles")
+                motor = None
 
-        except httpx.HTTPStatusError as e:
-            print(f"❌ Error HTTP: {e}")
-            print(f"Token: {self.token}")
-            return []
+        def resolver_audiencia(oferta_data: Dict, skills: List[str]):
+            if motor is not None:
+                # Relevancia local: puntaje por skills, modalidad, ubicación, experiencia y salario
+                return motor.puntuar(oferta_data, skills, top_k, umbral_relevancia)
+            # Buscar usuarios compatibles con todas las skills (consultas por lotes en paralelo),
+            # ordenados por cantidad de skills coincidentes
+            return self.perfiles_client.buscar_audiencia(skills, min_coincidencias)
+
+        return motor, resolver_audiencia
+
+    def _skills_previas(self, ofertas: List[Dict]) -> Dict[int, Any]:
+        """Skills guardadas de ejecuciones anteriores para las ofertas dadas"""
+        if self.oferta_skills_repo is None:
+            return {}
+        return self.oferta_skills_repo.get_por_ids([o['id'] for o in ofertas])
+
+    def _guardar_skills(self, pipeline: PipelineOfertas) -> None:
+        """Persiste las skills recién extraídas (también las ofertas sin skills)"""
+        if self.oferta_skills_repo is None or not pipeline.extraidas:
+            return
+        try:
+            self.oferta_skills_repo.guardar_muchos(pipeline.extraidas, pipeline.matcher.version)
         except Exception as e:
-            print(f"❌ Error inesperado: {e}")
-            return []
+            # Sin el registro solo se pierde la reutilización en la próxima ejecución
+            self.oferta_skills_repo.session.rollback()
+            print(f"⚠️  No se pudieron guardar las skills extraídas: {e}")
 
-    def _crear_notificaciones_oferta(
+    def _filas_notificaciones_oferta(
         self,
         oferta_data: Dict,
         usuarios_ids: List[str]  # UUIDs como strings
-    ) -> int:
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Crea notificaciones para cada usuario compatible.
+        Arma las filas de notificación de una oferta para cada usuario compatible.
         
         Returns:
-            Cantidad de notificaciones creadas
+            (filas para insertar_lote, prioridad de la oferta)
         """
-        notificaciones_creadas = 0
-        
         # Determinar prioridad basada en status
         prioridad = PRIORIDAD_MAP.get(
             oferta_data.get('status', '').upper(), 
-            2  # MEDIA por defecto
+            PrioridadNotificacion.MEDIA.value
         )
         
         # Convertir company_id a string (UUID)
         id_empresa = str(oferta_data['company_id'])
         
-        for usuario_id in usuarios_ids:
-            try:
-                notificacion = NotificacionInt(
-                    id_usuario=usuario_id,  # Ya es string (UUID)
-                    id_empresa=id_empresa,  # Convertido a string
-                    tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
-                    asunto=f"Nueva oferta: {oferta_data['title']}",
-                    mensaje=f"Hay una nueva oferta que coincide con tu perfil: '{oferta_data['title']}' en {oferta_data['location']}.&Salario: ${oferta_data['salary']}",
-                    id_oferta=oferta_data['id'],
-                    prioridad=prioridad,
-                    datos_adicionales=f"modalidad:{oferta_data['modality']}&ubicacion:{oferta_data['location']}",
-                    leida=False
-                )
-                
-                # Crear la notificación (gestiona su propia sesión)
-                self.notificacion_repo.create_(notificacion)
-                notificaciones_creadas += 1
-                
-            except Exception as e:
-                print(f"Error al crear notificación para usuario {usuario_id}: {e}")
-                continue
+        filas = [
+            {
+                "id_usuario": usuario_id,  # Ya es string (UUID)
+                "id_empresa": id_empresa,  # Convertido a string
+                "tipo_notificacion": "NUEVA_OFERTA_COMPATIBLE",
+                "asunto": f"Nueva oferta: {oferta_data['title']}",
+                "mensaje": (
+                    f"Hay una nueva oferta que coincide con tu perfil: '{oferta_data['title']}' "
+                    f"en {oferta_data['location']}.&Salario: ${oferta_data['salary']}"
+                ),
+                "id_oferta": oferta_data['id'],
+                "prioridad": prioridad,
+                "datos_adicionales": f"modalidad:{oferta_data['modality']}&ubicacion:{oferta_data['location']}",
+                "leida": False,
+                "fecha_lectura": None
+            }
+            for usuario_id in usuarios_ids
+        ]
         
-        return notificaciones_creadas
+        return filas, prioridad
     
     def analizar_ofertas_sin_notificar(self, session: Session, dias_atras: int = 7) -> Dict[str, Any]:
         """
@@ -353,23 +433,29 @@ class OfertaNotificacionService:
         analisis = []
         total_skills = 0
         
-        for oferta_data in ofertas_nuevas:
-            skills = self._extraer_skills(oferta_data['requirements'])
+        pipeline = PipelineOfertas()
+        for oferta_data, skills in pipeline.extraer(ofertas_nuevas, self._skills_previas(ofertas_nuevas)):
             total_skills += len(skills)
             
             analisis.append({
                 "id_oferta": oferta_data['id'],
                 "titulo": oferta_data['title'],
                 "company_id": oferta_data['company_id'],
-                "requirements_preview": oferta_data['requirements'][:200] + "..." if len(oferta_data['requirements']) > 200 else oferta_data['requirements'],
+                "requirements_preview": (
+                    oferta_data['requirements'][:200] + "..." if len(oferta_data['requirements']) > 200
+                    else oferta_data['requirements']
+                ),
                 "skills_encontradas": len(skills),
                 "skills": skills[:10],  # Solo las primeras 10
                 "total_skills": len(skills)
             })
         
+        self._guardar_skills(pipeline)
+
         return {
             "mensaje": f"Análisis completado (sin notificar)",
             "ofertas_analizadas": len(ofertas_nuevas),
+            "ofertas_sin_reextraer": len(pipeline.reutilizadas),
             "total_skills_encontradas": total_skills,
             "promedio_skills_por_oferta": round(total_skills / len(ofertas_nuevas), 2) if ofertas_nuevas else 0,
             "ofertas": analisis
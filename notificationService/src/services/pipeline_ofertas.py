@@ -0,0 +1,230 @@
+import os
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ..config.entorno import cargar_entorno
+
+from .extraccion_skills import MatcherSkills, extraer_skills, hash_requirements, instalar_matcher
+from .catalogo_skills import get_catalogo_skills
+
+cargar_entorno()
+
+# Marca de fin de stream entre etapas
+_FIN = object()
+
+
+def _env_int(nombre: str, default: int) -> int:
+    valor = os.getenv(nombre)
+    return int(valor) if valor else default
+
+
+class _Errores:
+    """Mensajes de error de una ejecución; los agregan varios hilos"""
+
+    def __init__(self):
+        self.mensajes: List[str] = []
+        self._lock = threading.Lock()
+
+    def agregar(self, mensaje: str) -> None:
+        with self._lock:
+            self.mensajes.append(mensaje)
+
+    def de_oferta(self, oferta: Dict[str, Any], etapa: str, e: Exception) -> None:
+        mensaje = f"Error procesando oferta {oferta.get('id', 'unknown')} ({etapa}): {str(e)}"
+        print(f"❌ {mensaje}")
+        self.agregar(mensaje)
+
+
+class PipelineOfertas:
+    """
+    Pipeline de tres etapas para procesar backlogs de ofertas:
+
+    1. Extracción de skills en un ProcessPoolExecutor (CPU), con envío por chunks
+    2. Resolución de audiencia en varios hilos (HTTP / motor de relevancia)
+    3. Escritura en un único hilo (la sesión de BD no es thread-safe)
+
+    Las etapas se conectan con colas acotadas: si la escritura se atrasa, la
+    resolución se bloquea, y si esta se atrasa, deja de consumirse la extracción.
+    Así extracción, HTTP y BD se solapan en lugar de ir oferta por oferta.
+    """
+
+    def __init__(
+        self,
+        procesos: Optional[int] = None,
+        hilos_resolucion: Optional[int] = None,
+        tamano_cola: Optional[int] = None,
+        min_ofertas_pool: Optional[int] = None,
+        matcher: Optional[MatcherSkills] = None
+    ):
+        self.procesos = procesos or _env_int("PIPELINE_PROCESOS", os.cpu_count() or 1)
+        self.hilos_resolucion = hilos_resolucion or _env_int("PIPELINE_HILOS_RESOLUCION", 4)
+        self.tamano_cola = tamano_cola or _env_int("PIPELINE_TAMANO_COLA", 32)
+        # Por debajo de este tamaño no compensa levantar procesos
+        self.min_ofertas_pool = min_ofertas_pool if min_ofertas_pool is not None else _env_int("PIPELINE_MIN_OFERTAS_POOL", 50)
+        # Versión del catálogo fijada para toda la ejecución (una recarga no la cambia a mitad)
+        self.matcher = matcher if matcher is not None else get_catalogo_skills().vigente()
+
+    def extraer(
+        self,
+        ofertas: List[Dict[str, Any]],
+        previas: Optional[Dict[int, Tuple[str, str, List[str]]]] = None
+    ) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+        """
+        Etapa 1: produce (oferta, skills) en el mismo orden que `ofertas`.
+
+        Con `previas` ({id_oferta: (hash, versión de catálogo, skills)}) reutiliza
+        las skills de las ofertas cuyo texto y catálogo no cambiaron; solo las
+        demás se extraen y quedan en `self.extraidas` para persistirlas.
+        """
+        previas = previas or {}
+        self.reutilizadas: Set[Any] = set()
+        self.extraidas: List[Tuple[Any, str, List[str]]] = []
+
+        hashes = [hash_requirements(o.get('requirements') or "") for o in ofertas]
+        guardadas: Dict[int, List[str]] = {}
+        pendientes: List[str] = []
+        for i, (oferta, hash_req) in enumerate(zip(ofertas, hashes)):
+            previa = previas.get(oferta.get('id'))  # type: ignore[arg-type]
+            if previa and previa[0] == hash_req and previa[1] == self.matcher.version:
+                guardadas[i] = previa[2]
+            else:
+                pendientes.append(oferta.get('requirements') or "")
+
+        extraidas = self._extraer_textos(pendientes)
+        for i, oferta in enumerate(ofertas):
+            if i in guardadas:
+                self.reutilizadas.add(oferta.get('id'))
+                yield oferta, guardadas[i]
+                continue
+            skills = next(extraidas)
+            self.extraidas.append((oferta.get('id'), hashes[i], skills))
+            yield oferta, skills
+
+    def _extraer_textos(self, textos: List[str]) -> Iterator[List[str]]:
+        """Skills de cada texto, en orden; en procesos si el volumen lo justifica"""
+        if len(textos) < self.min_ofertas_pool or self.procesos <= 1:
+            for texto in textos:
+                yield self.matcher.extraer(texto)
+            return
+
+        procesos = min(self.procesos, len(textos))
+        chunksize = max(1, len(textos) // (procesos * 4))
+        # spawn: los workers no heredan hilos ni conexiones abiertas del servidor
+        contexto = multiprocessing.get_context("spawn")
+        # Cada worker recibe el matcher ya compilado al arrancar
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            mp_context=contexto,
+            initializer=instalar_matcher,
+            initargs=(self.matcher,)
+        ) as pool:
+            yield from pool.map(extraer_skills, textos, chunksize=chunksize)
+
+    def ejecutar(
+        self,
+        ofertas: List[Dict[str, Any]],
+        resolver: Callable[[Dict[str, Any], List[str]], Any],
+        escribir: Callable[[Dict[str, Any], List[str], Any], None],
+        al_omitir: Optional[Callable[[Dict[str, Any]], None]] = None,
+        previas: Optional[Dict[int, Tuple[str, str, List[str]]]] = None
+    ) -> List[str]:
+        """
+        Ejecuta las tres etapas.
+
+        Args:
+            ofertas: Ofertas a procesar
+            resolver: (oferta, skills) -> audiencia. Se llama desde varios hilos
+            escribir: (oferta, skills, audiencia) -> None. Se llama desde un solo hilo
+            al_omitir: Callback para ofertas sin skills reconocibles (no se llama
+                para las que ya se sabía que no tenían, según `previas`)
+            previas: Skills guardadas por oferta (ver extraer)
+
+        Returns:
+            Mensajes de error por oferta
+        """
+        cola_resolucion: "queue.Queue[Any]" = queue.Queue(maxsize=self.tamano_cola)
+        cola_escritura: "queue.Queue[Any]" = queue.Queue(maxsize=self.tamano_cola)
+        errores = _Errores()
+
+        hilos = [
+            threading.Thread(
+                target=self._etapa_resolucion,
+                args=(cola_resolucion, cola_escritura, resolver, errores),
+                name=f"pipeline-resolucion-{i}",
+                daemon=True
+            )
+            for i in range(self.hilos_resolucion)
+        ]
+        escritor = threading.Thread(
+            target=self._etapa_escritura,
+            args=(cola_escritura, escribir, errores),
+            name="pipeline-escritura",
+            daemon=True
+        )
+        for hilo in hilos:
+            hilo.start()
+        escritor.start()
+
+        try:
+            self._etapa_extraccion(ofertas, previas, cola_resolucion, al_omitir)
+        except Exception as e:
+            errores.agregar(f"Error en la extracción de skills: {str(e)}")
+        finally:
+            for _ in hilos:
+                cola_resolucion.put(_FIN)
+            for hilo in hilos:
+                hilo.join()
+            cola_escritura.put(_FIN)
+            escritor.join()
+
+        return errores.mensajes
+
+    def _etapa_extraccion(
+        self,
+        ofertas: List[Dict[str, Any]],
+        previas: Optional[Dict[int, Tuple[str, str, List[str]]]],
+        salida: "queue.Queue[Any]",
+        al_omitir: Optional[Callable[[Dict[str, Any]], None]]
+    ) -> None:
+        for oferta, skills in self.extraer(ofertas, previas):
+            if not skills:
+                if al_omitir and oferta.get('id') not in self.reutilizadas:
+                    al_omitir(oferta)
+                continue
+            salida.put((oferta, skills))
+
+    @staticmethod
+    def _etapa_resolucion(
+        entrada: "queue.Queue[Any]",
+        salida: "queue.Queue[Any]",
+        resolver: Callable[[Dict[str, Any], List[str]], Any],
+        errores: _Errores
+    ) -> None:
+        while True:
+            item = entrada.get()
+            if item is _FIN:
+                return
+            oferta, skills = item
+            try:
+                salida.put((oferta, skills, resolver(oferta, skills)))
+            except Exception as e:
+                errores.de_oferta(oferta, "audiencia", e)
+
+    @staticmethod
+    def _etapa_escritura(
+        entrada: "queue.Queue[Any]",
+        escribir: Callable[[Dict[str, Any], List[str], Any], None],
+        errores: _Errores
+    ) -> None:
+        while True:
+            item = entrada.get()
+            if item is _FIN:
+                return
+            oferta, skills, audiencia = item
+            try:
+                escribir(oferta, skills, audiencia)
+            except Exception as e:
+                errores.de_oferta(oferta, "escritura", e)
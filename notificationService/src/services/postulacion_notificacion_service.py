@@ -5,15 +5,9 @@ from datetime import datetime
 from ..repositories.notificacion_repo import NotificacionRepository
 from ..repositories.convocatoria_snapshot_repo import ConvocatoriaSnapshotRepository
 from ..repositories.analytic_repo import NotificacionAnalyticsRepository
-from ..models.notificacion import Notificacion
+from ..models.notificacion import Notificacion, PrioridadNotificacion
 from ..dto.postulacion_dto import IncrementoPostulacionesDTO
-from ..models.notificacionInt import NotificacionInt
 
-PRIORIDAD_MAP = {
-    "BAJA": 1,
-    "MEDIA": 2,
-    "ALTA": 3
-}
 
 class PostulacionNotificacionService:
     def __init__(
@@ -26,7 +20,7 @@ class PostulacionNotificacionService:
         self.snapshot_repo = snapshot_repo
         self.analytics_repo = analytics_repo
     
-    def procesar_nuevas_postulaciones(self, session: Session) -> Dict[str, Any]:
+    def procesar_nuevas_postulaciones(self, session: Session, limpiar_inactivos: bool = False) -> Dict[str, Any]:
         convocatorias_actuales = self.analytics_repo.get_postulados_por_convocatoria()
         
         if not convocatorias_actuales:
@@ -64,13 +58,51 @@ class PostulacionNotificacionService:
         
         self._actualizar_snapshots(convocatorias_actuales)
         
-        return {
+        resultado = {
             "mensaje": f"Se procesaron {len(convocatorias_actuales)} convocatorias activas",
             "notificaciones_creadas": notificaciones_creadas,
             "convocatorias_procesadas": len(convocatorias_actuales),
             "convocatorias_con_incremento": len([i for i in incrementos if i.nuevas_postulaciones > 0]),
             "detalle": detalles
         }
+        
+        if limpiar_inactivos:
+            # Se reutilizan las convocatorias activas y los snapshots ya leídos
+            eliminados = self.snapshot_repo.eliminar_inactivos(
+                (c['id_convocatoria'] for c in convocatorias_actuales),
+                ids_existentes=set(snapshots_previos)
+            )
+            resultado["snapshots_inactivos_eliminados"] = len(eliminados)
+        
+        return resultado
+    
+    def limpiar_snapshots_inactivos(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Elimina (o solo cuenta, con dry_run) los snapshots de convocatorias que
+        ya no están en la vista activa, con borrados por lotes.
+        """
+        convocatorias_activas = self.analytics_repo.get_postulados_por_convocatoria()
+        ids_existentes = self.snapshot_repo.get_ids_convocatorias()
+        
+        inactivos = self.snapshot_repo.eliminar_inactivos(
+            (c['id_convocatoria'] for c in convocatorias_activas),
+            ids_existentes=ids_existentes,
+            dry_run=dry_run
+        )
+        
+        if dry_run:
+            return {
+                "mensaje": f"Se limpiarían {len(inactivos)} snapshots de convocatorias inactivas (dry run)",
+                "snapshots_a_eliminar": len(inactivos),
+                "snapshots_restantes": len(ids_existentes) - len(inactivos),
+                "ids_convocatoria": inactivos[:100]  # Muestra
+            }
+        
+        return {
+            "mensaje": f"Se limpiaron {len(inactivos)} snapshots de convocatorias inactivas",
+            "snapshots_eliminados": len(inactivos),
+            "snapshots_restantes": len(ids_existentes) - len(inactivos)
+        }
     
     def _detectar_incrementos(
         self, 
@@ -105,7 +137,7 @@ class PostulacionNotificacionService:
     def _crear_notificacion_incremento(
         self, 
         incremento: IncrementoPostulacionesDTO
-    ) -> NotificacionInt | None:
+    ) -> Notificacion | None:
         
         cantidad = incremento.nuevas_postulaciones
         titulo = incremento.titulo
@@ -115,14 +147,14 @@ class PostulacionNotificacionService:
         else:
             mensaje = f"Tienes {cantidad} nuevas postulaciones en '{titulo}'. Total: {incremento.total_actual}"
         
-        notificacion = NotificacionInt(
+        notificacion = Notificacion(
             id_usuario='0', 
             id_empresa=str(incremento.id_empresa),
             tipo_notificacion="NUEVA_POSTULACION",
             asunto=f"Nuevas postulaciones en {titulo}",
             mensaje=mensaje,
             id_oferta=incremento.id_convocatoria, 
-            prioridad=PRIORIDAD_MAP.get("MEDIA", 2),
+            prioridad=PrioridadNotificacion.MEDIA.value,
             datos_adicionales=f"nuevas:{cantidad},total:{incremento.total_actual}",
             leida=False
         )
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class RendimientoEscritura:
+    """
+    Throughput reciente de escritura de notificaciones (filas/segundo) sobre
+    las últimas `ventana` escrituras. Lo usa el modo sombra para proyectar
+    cuánto tardaría en BD una ejecución real.
+    """
+
+    def __init__(self, ventana: int = 50):
+        self._muestras: Deque[Tuple[int, float, float]] = deque(maxlen=ventana)
+        self._lock = threading.Lock()
+
+    def registrar(self, filas: int, segundos: float) -> None:
+        if filas <= 0 or segundos <= 0:
+            return
+        with self._lock:
+            self._muestras.append((filas, segundos, time.time()))
+
+    def filas_por_segundo(self) -> Optional[float]:
+        """Filas por segundo de la ventana, o None si aún no hay muestras"""
+        with self._lock:
+            filas = sum(m[0] for m in self._muestras)
+            segundos = sum(m[1] for m in self._muestras)
+        return filas / segundos if segundos else None
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            muestras = len(self._muestras)
+            ultima = self._muestras[-1][2] if self._muestras else None
+        throughput = self.filas_por_segundo()
+        return {
+            "muestras": muestras,
+            "filas_por_segundo": round(throughput, 2) if throughput else None,
+            "ultima_muestra_epoch": ultima
+        }
+
+
+_rendimiento = RendimientoEscritura()
+
+
+def get_rendimiento_escritura() -> RendimientoEscritura:
+    """Medidor compartido del proceso"""
+    return _rendimiento
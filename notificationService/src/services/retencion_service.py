@@ -0,0 +1,90 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+
+from ..repositories.retencion_repo import RetencionRepository
+from ..dto.retencion_dto import PoliticaRetencionDTO, ResultadoRetencionDTO
+
+# Evita dos ejecuciones simultáneas de la retención en el mismo proceso
+_ejecucion_lock = threading.Lock()
+
+
+class RetencionEnCurso(Exception):
+    pass
+
+
+class RetencionService:
+    """
+    Aplica la política de retención sobre `notificaciones`: retira en lotes acotados
+    las notificaciones antiguas (archivándolas o eliminándolas) para que las
+    consultas del día a día solo recorran el conjunto de trabajo reciente.
+    """
+
+    def __init__(self, retencion_repo: RetencionRepository):
+        self.retencion_repo = retencion_repo
+
+    @staticmethod
+    def en_curso() -> bool:
+        return _ejecucion_lock.locked()
+
+    @staticmethod
+    def _cortes(politica: PoliticaRetencionDTO, ahora: Optional[datetime] = None):
+        ahora = ahora or datetime.utcnow()
+        corte_leidas = ahora - timedelta(days=politica.dias_leidas) if politica.dias_leidas else None
+        corte_no_leidas = ahora - timedelta(days=politica.dias_no_leidas) if politica.dias_no_leidas else None
+        return corte_leidas, corte_no_leidas
+
+    def contar_pendientes(self, politica: PoliticaRetencionDTO) -> Dict[str, Any]:
+        """Cuenta cuántas notificaciones retiraría la política, sin modificar nada"""
+        corte_leidas, corte_no_leidas = self._cortes(politica)
+        return {
+            "modo": politica.modo,
+            "corte_leidas": corte_leidas,
+            "corte_no_leidas": corte_no_leidas,
+            "notificaciones_a_retirar": self.retencion_repo.contar_candidatas(corte_leidas, corte_no_leidas)
+        }
+
+    def ejecutar(self, politica: PoliticaRetencionDTO) -> ResultadoRetencionDTO:
+        """
+        Ejecuta la política lote a lote hasta agotar candidatas o alcanzar max_lotes.
+        Cada lote es una transacción corta con una pausa entre lotes para no
+        acaparar la base de datos frente al tráfico interactivo.
+        """
+        if not _ejecucion_lock.acquire(blocking=False):
+            raise RetencionEnCurso("Ya hay una ejecución de retención en curso.")
+
+        try:
+            inicio = time.perf_counter()
+            corte_leidas, corte_no_leidas = self._cortes(politica)
+            archivar = politica.modo == "archivar"
+
+            lotes = 0
+            total = 0
+            completado = False
+
+            while lotes < politica.max_lotes:
+                procesadas = self.retencion_repo.procesar_lote(
+                    corte_leidas, corte_no_leidas, politica.tamano_lote, archivar
+                )
+                if procesadas:
+                    lotes += 1
+                    total += procesadas
+                if procesadas < politica.tamano_lote:
+                    completado = True
+                    break
+                if politica.pausa_entre_lotes_ms:
+                    time.sleep(politica.pausa_entre_lotes_ms / 1000)
+
+            duracion = round(time.perf_counter() - inicio, 3)
+            print(f"🧹 Retención ({politica.modo}): {total} notificaciones en {lotes} lotes, {duracion}s")
+
+            return ResultadoRetencionDTO(
+                modo=politica.modo,
+                lotes=lotes,
+                filas_procesadas=total,
+                completado=completado,
+                duracion_segundos=duracion
+            )
+        finally:
+            _ejecucion_lock.release()
@@ -0,0 +1,184 @@
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.db import get_engine
+from ..config.shards import get_shard_router
+from ..config.entorno import cargar_entorno
+from sqlmodel import Session
+
+from ..repositories.rollup_repo import (
+    RollupRepository, BUCKETS_SEGUNDOS, BUCKET_DESBORDE, WATERMARK_CREADAS, WATERMARK_LECTURAS
+)
+
+cargar_entorno()
+
+
+def percentil_histograma(buckets: List[Tuple[int, int]], p: float) -> Optional[float]:
+    """
+    Percentil aproximado desde un histograma [(limite_superior, cantidad)],
+    interpolando linealmente dentro del bucket. Para el bucket de desborde
+    devuelve su borde inferior.
+    """
+    total = sum(cantidad for _, cantidad in buckets)
+    if not total:
+        return None
+
+    objetivo = p * total
+    acumulado = 0
+    inferior = 0
+    for limite, cantidad in sorted(buckets):
+        if cantidad and acumulado + cantidad >= objetivo:
+            if limite == BUCKET_DESBORDE:
+                return float(inferior)
+            return inferior + (limite - inferior) * (objetivo - acumulado) / cantidad
+        acumulado += cantidad
+        inferior = limite
+    return float(inferior)
+
+
+class RollupNotificacionesService:
+    """
+    Analytics de notificaciones sobre rollups horarios: volúmenes por tipo y día,
+    tasa de lectura y tiempo hasta la lectura (p50/p90). Los endpoints solo leen
+    los rollups; `actualizar` los alimenta desde `notificaciones` por watermark.
+    """
+
+    def __init__(self, repo: RollupRepository):
+        self.repo = repo
+
+    def actualizar(self, tamano_lote: int = 5000, max_lotes: int = 100) -> Dict[str, Any]:
+        """Procesa lotes nuevos de creaciones y lecturas hasta ponerse al día (o max_lotes)"""
+        margen = timedelta(seconds=int(os.getenv("ROLLUP_MARGEN_SEGUNDOS", "60")))
+        # Margen: no se procesan filas tan recientes que otra transacción aún pueda estar confirmando
+        # fecha_creacion y fecha_lectura se registran en UTC
+        corte = datetime.utcnow() - margen
+
+        creadas = lecturas = 0
+        for _ in range(max_lotes):
+            n = self.repo.procesar_lote_creadas(corte, tamano_lote)
+            creadas += n
+            if n < tamano_lote:
+                break
+        for _ in range(max_lotes):
+            n = self.repo.procesar_lote_lecturas(corte, tamano_lote)
+            lecturas += n
+            if n < tamano_lote:
+                break
+
+        return {
+            "creadas_procesadas": creadas,
+            "lecturas_procesadas": lecturas,
+            **self.estado()
+        }
+
+    def estado(self) -> Dict[str, Any]:
+        watermarks = {w.nombre: w for w in self.repo.get_watermarks()}
+        creadas = watermarks.get(WATERMARK_CREADAS)
+        lecturas = watermarks.get(WATERMARK_LECTURAS)
+        return {
+            "watermark_id_notificacion": creadas.ultimo_id if creadas else 0,
+            "watermark_fecha_lectura": lecturas.ultima_fecha if lecturas else None,
+            "ultima_actualizacion": max(
+                (w.fecha_actualizacion for w in watermarks.values()), default=None
+            )
+        }
+
+    def volumenes_por_dia(self, desde: datetime, hasta: datetime, tipo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Creadas y leídas por día de creación y tipo"""
+        dias: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0])
+        for hora, tipo_notificacion, creadas, leidas in self.repo.get_horas(desde, hasta, tipo):
+            conteo = dias[(hora.date().isoformat(), tipo_notificacion)]
+            conteo[0] += creadas
+            conteo[1] += leidas
+        return [
+            {
+                "dia": dia,
+                "tipo_notificacion": tipo_notificacion,
+                "creadas": creadas,
+                "leidas": leidas,
+                "tasa_lectura": round(leidas / creadas, 4) if creadas else None
+            }
+            for (dia, tipo_notificacion), (creadas, leidas) in sorted(dias.items())
+        ]
+
+    def lectura(self, desde: datetime, hasta: datetime, tipo: Optional[str] = None) -> Dict[str, Any]:
+        """Tasa de lectura y p50/p90 del tiempo hasta la lectura, en total y por tipo"""
+        totales: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for _, tipo_notificacion, creadas, leidas in self.repo.get_horas(desde, hasta, tipo):
+            totales[tipo_notificacion][0] += creadas
+            totales[tipo_notificacion][1] += leidas
+
+        histogramas: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        for tipo_notificacion, limite, cantidad in self.repo.get_histograma(desde, hasta, tipo):
+            histogramas[tipo_notificacion][limite] += cantidad
+
+        def _resumen(creadas: int, leidas: int, histograma: Dict[int, int]) -> Dict[str, Any]:
+            buckets = list(histograma.items())
+            p50 = percentil_histograma(buckets, 0.5)
+            p90 = percentil_histograma(buckets, 0.9)
+            return {
+                "creadas": creadas,
+                "leidas": leidas,
+                "tasa_lectura": round(leidas / creadas, 4) if creadas else None,
+                "p50_segundos_hasta_lectura": round(p50, 1) if p50 is not None else None,
+                "p90_segundos_hasta_lectura": round(p90, 1) if p90 is not None else None
+            }
+
+        global_histograma: Dict[int, int] = defaultdict(int)
+        for histograma in histogramas.values():
+            for limite, cantidad in histograma.items():
+                global_histograma[limite] += cantidad
+
+        return {
+            **_resumen(
+                sum(c for c, _ in totales.values()),
+                sum(l for _, l in totales.values()),
+                global_histograma
+            ),
+            "buckets_segundos": list(BUCKETS_SEGUNDOS),
+            "por_tipo": {
+                tipo_notificacion: _resumen(creadas, leidas, histogramas.get(tipo_notificacion, {}))
+                for tipo_notificacion, (creadas, leidas) in sorted(totales.items())
+            }
+        }
+
+
+def _ciclo_rollup(engine, intervalo: int, detener: threading.Event) -> None:
+    while not detener.wait(intervalo):
+        with Session(engine) as session:
+            try:
+                RollupNotificacionesService(RollupRepository(session)).actualizar()
+            except Exception as e:
+                session.rollback()
+                print(f"⚠️  Error actualizando rollups de notificaciones: {e}")
+
+
+_detener_rollup: Optional[threading.Event] = None
+
+
+def iniciar_rollup_periodico() -> None:
+    """Arranca el job de rollups cada ROLLUP_INTERVALO_SEGUNDOS (0 lo desactiva)"""
+    global _detener_rollup
+    intervalo = int(os.getenv("ROLLUP_INTERVALO_SEGUNDOS", "300"))
+    if intervalo <= 0 or _detener_rollup is not None:
+        return
+    if get_shard_router() is not None:
+        print("ℹ️  Rollups de notificaciones desactivados: no están disponibles con SHARDS")
+        return
+    _detener_rollup = threading.Event()
+    threading.Thread(
+        target=_ciclo_rollup,
+        args=(get_engine(), intervalo, _detener_rollup),
+        name="rollup-notificaciones",
+        daemon=True
+    ).start()
+
+
+def detener_rollup_periodico() -> None:
+    global _detener_rollup
+    if _detener_rollup is not None:
+        _detener_rollup.set()
+        _detener_rollup = None
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from ..src import models  # noqa: F401  (registra las tablas en el metadata)
+from ..src.models.oferta_notificada import OfertaNotificada  # noqa: F401
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def zona_horaria(monkeypatch):
+    """Cambia la zona horaria local del proceso (TZ) durante el test"""
+    def cambiar(tz: str) -> None:
+        monkeypatch.setenv("TZ", tz)
+        time.tzset()
+
+    yield cambiar
+    monkeypatch.undo()
+    time.tzset()
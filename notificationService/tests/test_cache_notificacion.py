@@ -0,0 +1,109 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+import pytest
+
+from ..src.cache import CacheLectura, MemoriaLRUCache, EscriturasRecientes, clave_notificacion, NO_LEIDAS_USUARIO
+from ..src.models import Notificacion
+from ..src.repositories.notificacion_repo import NotificacionRepository
+from ..src.routes import notificacion_router as rutas
+from ..src.routes.deps import db_session
+from ..src.routes.deps.db_session import get_db, get_db_lectura
+from ..src.services.notificacion_service import NotificacionService
+
+
+@pytest.fixture
+def cache():
+    return CacheLectura(MemoriaLRUCache())
+
+
+@pytest.fixture
+def cliente(engine, cache):
+    def sesion():
+        with Session(engine) as session:
+            yield session
+
+    def servicio(session: Session = Depends(get_db)) -> NotificacionService:
+        escrituras = EscriturasRecientes(MemoriaLRUCache(), activo=False)
+        return NotificacionService(NotificacionRepository(session, cache=cache, escrituras=escrituras))
+
+    app = FastAPI()
+    app.include_router(rutas.router)
+    app.dependency_overrides[get_db] = sesion
+    app.dependency_overrides[get_db_lectura] = sesion
+    app.dependency_overrides[rutas.get_notificacion_service] = servicio
+    return TestClient(app)
+
+
+def test_leer_marcar_leida_y_volver_a_leer(session, cliente, cache):
+    notificacion = Notificacion(
+        id_usuario="u1", id_empresa="e1", tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+        asunto="Nueva oferta", mensaje="m", id_oferta=1, leida=False
+    )
+    session.add(notificacion)
+    session.commit()
+    url = f"/notificaciones/{notificacion.id_notificacion}"
+
+    assert cliente.get(url).json()["leida"] is False
+    assert cache.metricas()["notificacion"]["misses"] == 1
+
+    respuesta = cliente.patch(f"{url}/marcar-leida")
+    assert respuesta.status_code == 200
+    assert respuesta.json()["leida"] is True
+
+    # La marca invalida la misma clave que usó la lectura: no se sirve la copia vieja
+    assert cliente.get(url).json()["leida"] is True
+    assert cache.metricas()["notificacion"]["invalidaciones"] == 1
+
+
+def test_id_no_numerico_es_422(cliente):
+    assert cliente.get("/notificaciones/no-es-un-id").status_code == 422
+
+
+def test_marca_de_escritura_reciente_coincide_con_el_id_de_la_ruta(monkeypatch):
+    escrituras = EscriturasRecientes(MemoriaLRUCache())
+    monkeypatch.setattr(db_session, "get_escrituras_recientes", lambda: escrituras)
+    escrituras.registrar("notificacion", [clave_notificacion(7)])
+
+    assert escrituras.alguna(db_session._claves_escritura({"id_notificacion": "007"}))
+    assert db_session._claves_escritura({"id_notificacion": "siete"}) == []
+
+
+def test_no_leidas_con_fields_lee_solo_esas_columnas(session, cliente, cache, monkeypatch):
+    session.add(Notificacion(
+        id_usuario="u1", id_empresa="e1", tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+        asunto="Nueva oferta", mensaje="m", id_oferta=1, leida=False
+    ))
+    session.commit()
+    consultas = []
+    original = NotificacionRepository.get_filas_no_leidas_by_usuario
+
+    def registrar(self, session, id_usuario, campos):
+        consultas.append(campos)
+        return original(self, session, id_usuario, campos)
+
+    monkeypatch.setattr(NotificacionRepository, "get_filas_no_leidas_by_usuario", registrar)
+
+    respuesta = cliente.get("/notificaciones/u1/user/no-leidas", params={"fields": "asunto"})
+    assert respuesta.json() == [{"id_notificacion": "1", "asunto": "Nueva oferta"}]
+    assert consultas == [("id_notificacion", "asunto")]
+    assert NO_LEIDAS_USUARIO not in cache.metricas()
+
+
+def test_etag_cambia_con_la_lectura_y_con_la_consulta(session, cliente):
+    for _ in range(2):
+        session.add(Notificacion(
+            id_usuario="u1", id_empresa="e1", tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+            asunto="Nueva oferta", mensaje="m", id_oferta=1, leida=False
+        ))
+    session.commit()
+    url = "/notificaciones/u1/user/all"
+    etag = cliente.get(url).headers["etag"]
+
+    assert cliente.get(url, headers={"If-None-Match": etag}).status_code == 304
+    # Otra consulta sobre la misma bandeja no reutiliza el ETag de la completa
+    assert cliente.get(url, params={"since_id": 1}, headers={"If-None-Match": etag}).status_code == 200
+    assert cliente.get(url, params={"fields": "asunto"}, headers={"If-None-Match": etag}).status_code == 200
+
+    cliente.patch("/notificaciones/1/marcar-leida")
+    assert cliente.get(url, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from sqlmodel import Session, func, select
+
+from ..src.exception.insercion_parcial import InsercionParcial
+from ..src.models.notificacion import Notificacion
+from ..src.repositories.notificacion_repo import NotificacionRepository
+from ..src.services.cola_escritura import ColaEscrituraNotificaciones
+from ..src.services.oferta_notificacion_service import OfertaNotificacionService
+
+
+def _filas(n):
+    return [
+        {
+            "id_usuario": f"u{i}", "id_empresa": "e1", "tipo_notificacion": "NUEVA_OFERTA_COMPATIBLE",
+            "asunto": "Nueva oferta", "mensaje": "m", "id_oferta": 1, "leida": False
+        }
+        for i in range(n)
+    ]
+
+
+def _contar(engine):
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(Notificacion)).one()
+
+
+@pytest.fixture
+def escritor_lento(monkeypatch):
+    """insertar_lote bloquea hasta `liberar`; `escribiendo` avisa que tomó un lote"""
+    original = NotificacionRepository.insertar_lote
+    escribiendo, liberar = threading.Event(), threading.Event()
+
+    def lento(self, session, filas):
+        escribiendo.set()
+        liberar.wait(5)
+        return original(self, session, filas)
+
+    monkeypatch.setattr(NotificacionRepository, "insertar_lote", lento)
+    yield escribiendo, liberar
+    liberar.set()
+
+
+@pytest.fixture
+def cola(engine):
+    cola = ColaEscrituraNotificaciones(engine, filas_por_segundo=10000, tamano_lote=10, espera_lote=0.01).iniciar()
+    yield cola
+    cola.cerrar(5)
+
+
+def test_fallo_despues_de_insertar_no_detiene_la_cola(cola, monkeypatch):
+    def falla(self, *args):
+        raise RuntimeError("cache caído")
+
+    monkeypatch.setattr(NotificacionRepository, "invalidar_cache_usuarios", falla)
+    assert cola.encolar(_filas(5), prioridad=1).esperar(5) == 5
+
+    monkeypatch.undo()
+    assert cola.encolar(_filas(3), prioridad=1).esperar(5) == 3
+    assert cola._hilo.is_alive()
+
+
+def test_lote_fallido_completa_las_solicitudes_como_fallidas(cola, monkeypatch):
+    def falla(self, session, filas):
+        raise RuntimeError("BD caída")
+
+    monkeypatch.setattr(NotificacionRepository, "insertar_lote", falla)
+    solicitud = cola.encolar(_filas(4), prioridad=1)
+    assert solicitud.esperar(5) == 0
+    assert solicitud.fallidas == 4
+    assert solicitud.errores == ["BD caída"]
+    assert cola._hilo.is_alive()
+
+
+def test_timeout_cancela_las_filas_no_tomadas(cola, engine, escritor_lento):
+    escribiendo, liberar = escritor_lento
+    en_curso = cola.encolar(_filas(10), prioridad=1)
+    assert escribiendo.wait(5)
+    encolada = cola.encolar(_filas(3), prioridad=1)
+
+    errores = []
+    vencido = time.monotonic() + 0.05
+    assert OfertaNotificacionService._esperar_escritura({"id": 7}, encolada, vencido, errores) == 0
+    assert encolada.cancelada and "Escritura pendiente" in errores[0]
+
+    # La que ya se estaba escribiendo no se cancela: se espera su resultado
+    liberar.set()
+    assert OfertaNotificacionService._esperar_escritura({"id": 8}, en_curso, vencido, errores) == 10
+    cola.cerrar(5)
+    assert _contar(engine) == 10
+
+
+def test_fila_invalida_solo_hace_fallar_a_su_solicitud(engine):
+    cola = ColaEscrituraNotificaciones(engine, filas_por_segundo=10000, tamano_lote=10, espera_lote=0.01)
+    valida = cola.encolar(_filas(3), prioridad=1)
+    invalida = cola.encolar(_filas(2) + [{**_filas(1)[0], "asunto": None}], prioridad=1)
+    cola.iniciar()  # ambas en el mismo lote
+
+    assert valida.esperar(5) == 3 and not valida.errores
+    assert invalida.esperar(5) == 0 and invalida.fallidas == 3
+
+    errores = []
+    assert OfertaNotificacionService._esperar_escritura({"id": 9}, invalida, time.monotonic() + 5, errores) == 0
+    assert "3 notificaciones fallidas" in errores[0]
+    cola.cerrar(5)
+    assert _contar(engine) == 3
+
+
+def test_con_shards_no_reintenta_las_solicitudes_confirmadas(engine, monkeypatch):
+    escrituras = []
+
+    def un_shard_falla(self, session, filas):
+        # Simula dos shards: confirma las filas de e1 y falla el de e2
+        if any(f["id_empresa"] == "e2" for f in filas):
+            ids = [None if f["id_empresa"] == "e2" else 1 for f in filas]
+            escrituras.extend(f["id_empresa"] for f in filas if f["id_empresa"] == "e1")
+            raise InsercionParcial(ids, RuntimeError("shard caído"))
+        escrituras.extend(f["id_empresa"] for f in filas)
+        return [1] * len(filas)
+
+    monkeypatch.setattr(NotificacionRepository, "insertar_lote", un_shard_falla)
+    cola = ColaEscrituraNotificaciones(engine, filas_por_segundo=10000, tamano_lote=10, espera_lote=0.01)
+    confirmada = cola.encolar(_filas(3), prioridad=1)
+    caida = cola.encolar([{**fila, "id_empresa": "e2"} for fila in _filas(2)], prioridad=1)
+    cola.iniciar()
+
+    assert confirmada.esperar(5) == 3
+    assert caida.esperar(5) == 0 and caida.errores == ["shard caído"]
+    cola.cerrar(5)
+    assert escrituras.count("e1") == 3
@@ -0,0 +1,14 @@
+from ..src.repositories.estadisticas_repo import EstadisticasRepository, TOP_K
+
+
+def test_top_de_ofertas_conserva_las_k_mayores(session):
+    repo = EstadisticasRepository(session)
+    usuarios = [5, 40, 1, 33, 8, 21, 13, 2, 55, 34, 3, 89]
+    for id_oferta, n in enumerate(usuarios, start=1):
+        repo.registrar_oferta_notificada(id_oferta, f"Oferta {id_oferta}", n)
+        session.commit()
+
+    estadisticas = repo.get_estadisticas_ofertas()
+    assert estadisticas["total_ofertas_notificadas"] == len(usuarios)
+    assert estadisticas["total_usuarios_notificados"] == sum(usuarios)
+    assert [o["usuarios_notificados"] for o in estadisticas["top_10_ofertas"]] == sorted(usuarios, reverse=True)[:TOP_K]
@@ -0,0 +1,28 @@
+from ..src.services.motor_relevancia import MotorRelevancia
+
+PERFILES = [
+    {"id_usuario": "a", "skills": "python|sql", "modalidad": "Remoto", "ubicacion": "Cali",
+     "anios_experiencia": 5, "salario_esperado": 4_000_000},
+    {"id_usuario": "b", "skills": "python", "modalidad": "Presencial", "ubicacion": "Bogotá",
+     "anios_experiencia": 1, "salario_esperado": 9_000_000},
+    {"id_usuario": "c", "skills": "java", "modalidad": "Remoto", "ubicacion": "Cali",
+     "anios_experiencia": 5, "salario_esperado": 0},
+    {"id_usuario": "d", "skills": "python|sql", "modalidad": "Remoto", "ubicacion": "Cali",
+     "anios_experiencia": 5, "salario_esperado": 4_000_000},
+]
+OFERTA = {"modality": "Remoto", "location": "Cali", "years_experience": 3, "salary": 5_000_000}
+
+
+def test_puntua_solo_perfiles_con_skills_en_comun():
+    resultado = MotorRelevancia(PERFILES).puntuar(OFERTA, ["Python", "SQL"])
+    assert [u for u, _ in resultado] == ["d", "a", "b"]  # empate a/d: primero el perfil posterior
+    assert resultado[0][1] == 1.0
+    assert 0 < resultado[2][1] < resultado[1][1]
+
+
+def test_top_k_y_umbral():
+    motor = MotorRelevancia(PERFILES)
+    assert motor.puntuar(OFERTA, ["python", "sql"], top_k=1) == [("d", 1.0)]
+    assert motor.puntuar(OFERTA, ["python", "sql"], top_k=0) == []
+    assert [u for u, _ in motor.puntuar(OFERTA, ["python", "sql"], umbral=0.9)] == ["d", "a"]
+    assert motor.puntuar(OFERTA, ["rust"]) == []
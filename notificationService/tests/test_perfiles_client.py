@@ -0,0 +1,38 @@
+import httpx
+import pytest
+
+from ..src.clients.perfiles_client import PerfilesClient
+
+
+def _cliente(perfiles_por_skill, fallas):
+    """Cliente contra un API simulado; `fallas[skill]` respuestas 503 antes de contestar"""
+    consultas = []
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/login"):
+            return httpx.Response(200, json={"token": "t"})
+        skill = request.url.params["names"]
+        consultas.append(skill)
+        if fallas.get(skill, 0) > 0:
+            fallas[skill] -= 1
+            return httpx.Response(503)
+        return httpx.Response(200, json=[{"id": u} for u in perfiles_por_skill[skill]])
+
+    cliente = PerfilesClient(
+        "http://perfiles", "http://auth", "u", "p", skills_por_lote=1, reintentos=2, espera_reintento=0
+    )
+    cliente._http = httpx.Client(transport=httpx.MockTransport(responder))
+    return cliente, consultas
+
+
+def test_lote_con_fallo_transitorio_se_reintenta():
+    cliente, consultas = _cliente({"SQL": ["u1"], "Docker": ["u1", "u2"]}, {"Docker": 2})
+    assert dict(cliente.buscar_audiencia(["SQL", "Docker"])) == {"u1": 2, "u2": 1}
+    assert consultas.count("Docker") == 3
+
+
+def test_lote_que_sigue_fallando_no_deja_audiencia_parcial():
+    cliente, consultas = _cliente({"SQL": ["u1"], "Docker": ["u2"]}, {"Docker": 10})
+    with pytest.raises(httpx.HTTPStatusError):
+        cliente.buscar_audiencia(["SQL", "Docker"])
+    assert consultas.count("Docker") == 3
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ..src.cache import CacheLectura, EscriturasRecientes, MemoriaLRUCache
+from ..src.exception.notificacion_not_found import NotificacionNotFound
+from ..src.models import Notificacion
+from ..src.repositories.notificacion_repo import NotificacionRepository
+from ..src.repositories.retencion_repo import RetencionRepository
+from ..src.services.notificacion_service import NotificacionService
+
+
+def test_retencion_invalida_cache_y_marca_escrituras(session):
+    vieja = Notificacion(
+        id_usuario="u1", id_empresa="e1", tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+        asunto="Nueva oferta", mensaje="m", id_oferta=1, leida=True,
+        fecha_creacion=datetime.utcnow() - timedelta(days=120)
+    )
+    session.add(vieja)
+    session.commit()
+
+    escrituras = EscriturasRecientes(MemoriaLRUCache())
+    repo = NotificacionRepository(session, cache=CacheLectura(MemoriaLRUCache()), escrituras=escrituras)
+    service = NotificacionService(repo)
+    assert service.get_by_id(session, vieja.id_notificacion).leida is True  # queda en cache
+
+    retiradas = RetencionRepository(session, repo).procesar_lote(
+        datetime.utcnow() - timedelta(days=90), None, tamano_lote=100, archivar=True
+    )
+    assert retiradas == 1
+
+    with pytest.raises(NotificacionNotFound):
+        service.get_by_id(session, vieja.id_notificacion)
+    assert escrituras.alguna([escrituras.clave("usuario", "u1"), escrituras.clave("empresa", "e1")])
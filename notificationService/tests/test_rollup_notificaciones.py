@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from ..src.models import Notificacion
+from ..src.repositories.notificacion_repo import NotificacionRepository
+from ..src.repositories.rollup_repo import RollupRepository
+from ..src.services.notificacion_service import NotificacionService
+from ..src.services.rollup_notificaciones_service import RollupNotificacionesService
+from ..src.cache import CacheLectura, MemoriaLRUCache
+
+
+def test_tiempo_hasta_lectura_no_depende_de_la_zona_horaria(session, zona_horaria, monkeypatch):
+    zona_horaria("America/Bogota")
+    monkeypatch.setenv("ROLLUP_MARGEN_SEGUNDOS", "0")
+
+    creada = datetime.utcnow() - timedelta(minutes=10)
+    notificacion = Notificacion(
+        id_usuario="u1", id_empresa="e1", tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+        asunto="Nueva oferta", mensaje="m", id_oferta=1, leida=False, fecha_creacion=creada
+    )
+    session.add(notificacion)
+    session.commit()
+
+    repo = NotificacionRepository(session, cache=CacheLectura(MemoriaLRUCache()))
+    leida = NotificacionService(repo).marcar_como_leida(session, notificacion.id_notificacion)
+    assert leida.fecha_lectura is not None
+    assert abs((leida.fecha_lectura - datetime.utcnow()).total_seconds()) < 5
+
+    servicio = RollupNotificacionesService(RollupRepository(session))
+    resultado = servicio.actualizar()
+    assert resultado["lecturas_procesadas"] == 1
+
+    resumen = servicio.lectura(creada - timedelta(days=1), datetime.utcnow() + timedelta(hours=1))
+    # 10 minutos cae en el bucket (300, 900]; con la hora local mezclada daba 30 s
+    assert 300 < resumen["p50_segundos_hasta_lectura"] <= 900
+
+
+def test_creadas_no_salta_ids_posteriores_al_corte(session):
+    ahora = datetime.utcnow()
+    for creada in (ahora - timedelta(hours=1), ahora, ahora - timedelta(hours=1)):
+        session.add(Notificacion(
+            id_usuario="u1", id_empresa="e1", tipo_notificacion="NUEVA_OFERTA_COMPATIBLE",
+            asunto="Nueva oferta", mensaje="m", id_oferta=1, leida=False, fecha_creacion=creada
+        ))
+    session.commit()
+
+    repo = RollupRepository(session)
+    assert repo.procesar_lote_creadas(ahora - timedelta(minutes=1), 10) == 1
+    assert repo.get_watermark("rollup_creadas").ultimo_id == 1
+    # Cuando el corte alcanza a la segunda se cuentan las dos restantes
+    assert repo.procesar_lote_creadas(ahora + timedelta(minutes=1), 10) == 2
+    assert sum(fila.creadas for fila in repo.get_horas(ahora - timedelta(days=1), ahora + timedelta(days=1))) == 3
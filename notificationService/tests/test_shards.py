@@ -0,0 +1,105 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from ..src.cache import CacheLectura, MemoriaLRUCache
+from ..src.config.shards import ShardRouter, instalar_shard_router
+from ..src.exception.no_soportado_con_shards import NoSoportadoConShards
+from ..src.models.notificacion import Notificacion
+from ..src.repositories.notificacion_repo import NotificacionRepository
+from ..src.repositories.estadisticas_repo import EstadisticasRepository
+from ..src.repositories.exportacion_repo import ExportacionRepository
+from ..src.repositories.retencion_repo import RetencionRepository
+from ..src.repositories.rollup_repo import RollupRepository
+from ..src.services.notificacion_service import NotificacionService
+
+
+def _engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def router():
+    router = ShardRouter({"a": _engine(), "b": _engine()}, directorio=_engine(), max_usuarios_registrados=3)
+    yield router
+    router.cerrar()
+
+
+def test_usuarios_registrados_acotados(router):
+    router.registrar_usuarios([(f"u{i}", "a") for i in range(10)])
+    assert len(router._usuarios_registrados) == 3
+    # Los olvidados se vuelven a registrar sin duplicar el directorio
+    router.registrar_usuarios([("u0", "a")])
+    assert router.shards_de_usuario("u0") == ["a"]
+
+
+def test_dialecto_sin_soporte_falla(router, monkeypatch):
+    monkeypatch.setattr(router.engines["b"].dialect, "name", "postgresql")
+    with pytest.raises(RuntimeError, match="postgresql"):
+        router.preparar_identidades()
+
+
+@pytest.fixture
+def con_shards(router):
+    instalar_shard_router(router)
+    yield router
+    instalar_shard_router(None)
+
+
+def test_operaciones_sobre_la_primaria_no_corren_con_shards(con_shards):
+    with pytest.raises(NoSoportadoConShards):
+        RetencionRepository(Session(con_shards.directorio))
+    with pytest.raises(NoSoportadoConShards):
+        RollupRepository(Session(con_shards.directorio))
+    with pytest.raises(NoSoportadoConShards):
+        ExportacionRepository(Session(con_shards.directorio))
+    with pytest.raises(NoSoportadoConShards):
+        EstadisticasRepository(Session(con_shards.directorio)).reconstruir()
+
+
+def test_endpoints_de_mantenimiento_responden_501_con_shards(con_shards):
+    from ..src.main import app
+    from ..src.routes.deps.db_session import get_db
+
+    def sesion():
+        with Session(con_shards.directorio) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = sesion
+    cliente = TestClient(app)  # sin lifespan: no crea engines
+    for metodo, url in [
+        ("post", "/mantenimiento/retencion"),
+        ("post", "/mantenimiento/estadisticas/reconstruir"),
+        ("post", "/exportaciones/notificaciones/parquet"),
+        ("post", "/analytics/notificaciones/rollup/actualizar"),
+    ]:
+        assert getattr(cliente, metodo)(url).status_code == 501, url
+    app.dependency_overrides.clear()
+
+
+def _empresa_en(router, shard):
+    return next(f"e{i}" for i in range(1000) if router.shard_de_empresa(f"e{i}") == shard)
+
+
+def test_create_many_no_reinserta_en_shards_que_confirmaron(router):
+    empresa_a, empresa_b = _empresa_en(router, "a"), _empresa_en(router, "b")
+    items = [
+        {"id_usuario": f"u{i}", "id_empresa": empresa, "tipo_notificacion": "T",
+         "asunto": "Asunto", "mensaje": "m", "id_oferta": 1}
+        for i, empresa in enumerate([empresa_a, empresa_b, empresa_a, empresa_b])
+    ]
+    with router.engines["b"].begin() as conexion:
+        conexion.execute(text("DROP TABLE notificaciones"))
+
+    with Session(router.directorio) as session:
+        repo = NotificacionRepository(session, cache=CacheLectura(MemoriaLRUCache()), shards=router)
+        resultado = NotificacionService(repo).create_many(session, items)
+
+    assert resultado.creadas == 2
+    assert [e.indice for e in resultado.errores] == [1, 3]
+    with router.sesion("a") as s:
+        assert s.exec(select(func.count()).select_from(Notificacion)).one() == 2